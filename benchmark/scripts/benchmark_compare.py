@@ -0,0 +1,108 @@
+"""Benchmark of the comparison of FROG reports.
+
+Compares `FrogComparison.compare_reports` against the previous implementation,
+which compared the tables of all N x N pairs of reports by position, for
+synthetic FVA tables of many reports.
+
+    python benchmark_compare.py [reports] [rows]
+"""
+import sys
+from timeit import default_timer
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from fbc_curation import EXAMPLE_DIR
+from fbc_curation.compare import FrogComparison
+from fbc_curation.frog import (
+    CuratorConstants,
+    FrogDiagnostics,
+    FrogFVA,
+    FrogReport,
+    StatusCode,
+)
+
+
+def compare_previous(reports: Dict[str, FrogReport]) -> bool:
+    """Previous implementation comparing all pairs of tables by position."""
+    dfs: List[pd.DataFrame] = [report.fva.to_df() for report in reports.values()]
+    mat_equal = np.zeros(shape=(len(dfs), len(dfs)))
+    for p, df1 in enumerate(dfs):
+        for q, df2 in enumerate(dfs):
+            equal = True
+            for field in ["flux", "minimum", "maximum"]:
+                equal = equal and np.allclose(
+                    df1[field].values,
+                    df2[field].values,
+                    atol=FrogComparison.absolute_tolerance,
+                    rtol=FrogComparison.relative_tolerance,
+                    equal_nan=True,
+                )
+            mat_equal[p, q] = int(equal)
+    return bool(mat_equal.sum() == len(dfs) * len(dfs))
+
+
+def fva_reports(num_reports: int, rows: int) -> Dict[str, FrogReport]:
+    """Create reports with random FVA tables, every second report differs."""
+    rng = np.random.default_rng(42)
+    flux = rng.normal(size=rows)
+    df = pd.DataFrame(
+        {
+            "model": "model",
+            "objective": "obj",
+            "reaction": [f"R_{k:06d}" for k in range(rows)],
+            "flux": flux,
+            "status": StatusCode.OPTIMAL.value,
+            "minimum": flux - 1.0,
+            "maximum": flux + 1.0,
+            "fraction_optimum": 1.0,
+        }
+    )
+    report = FrogComparison.read_reports_from_omex(
+        EXAMPLE_DIR / "frogs" / "e_coli_core_FROG.omex"
+    )["./e_coli_core.xml"]["cobrapy"].load()
+    report.set_diagnostics(FrogDiagnostics())
+    reports: Dict[str, FrogReport] = {}
+    for k in range(num_reports):
+        df_k = df.copy()
+        if k % 2:
+            changed = rng.choice(rows, size=rows // 100, replace=False)
+            df_k.loc[changed, "maximum"] += 1.0
+        reports[f"report{k}"] = report.copy(update={"fva": FrogFVA.from_df(df_k)})
+    return reports
+
+
+def best_time(f: Callable[[], None], repeats: int) -> float:
+    """Get best execution time of repeats."""
+    times = []
+    for _ in range(repeats):
+        t_start = default_timer()
+        f()
+        times.append(default_timer() - t_start)
+    return min(times)
+
+
+def benchmark(num_reports: int, rows: int, repeats: int = 3) -> None:
+    """Run benchmark for reports with FVA tables of rows."""
+    reports = fva_reports(num_reports, rows)
+    print(f"{num_reports} reports x {rows} rows")
+    t_previous = best_time(lambda: compare_previous(reports), repeats)
+    print(f"{'previous':<10} {t_previous:.4f} [s]")
+
+    keys = [CuratorConstants.FVA_KEY]
+    t_keyed = best_time(
+        lambda: FrogComparison.compare_reports(reports, keys=keys), repeats
+    )
+    result = FrogComparison.compare_reports(reports, keys=keys)
+    print(
+        f"{'keyed':<10} {t_keyed:.4f} [s] "
+        f"({len(result.differences[CuratorConstants.FVA_KEY])} differences)"
+    )
+
+
+if __name__ == "__main__":
+    benchmark(
+        num_reports=int(sys.argv[1]) if len(sys.argv) > 1 else 24,
+        rows=int(sys.argv[2]) if len(sys.argv) > 2 else 20000,
+    )
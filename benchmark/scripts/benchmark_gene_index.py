@@ -0,0 +1,70 @@
+"""Benchmark of the gene to reaction index.
+
+Compares the `GeneReactionIndex` against the previous implementation of
+`Curator._knockout_reactions_for_genes`, which evaluated the GPR of every
+reaction for every gene.
+
+    python benchmark_gene_index.py [model.xml]
+"""
+import sys
+from collections import defaultdict
+from pathlib import Path
+from timeit import default_timer
+from typing import Dict, List
+
+from cobra.core import Model
+from cobra.io import read_sbml_model
+
+from fbc_curation.curator.gene_index import GeneReactionIndex
+
+
+def knockout_reactions_quadratic(model: Model) -> Dict[str, List[str]]:
+    """Previous implementation with O(reactions x genes) GPR evaluations."""
+    knockout_reactions = defaultdict(list)
+    for reaction in model.reactions:
+        gpr = reaction.gpr
+        gpr_genes = gpr.genes
+        for gene in model.genes:
+            if gene.id not in gpr_genes:
+                gene_essential = False
+            else:
+                gene_essential = not gpr.eval(knockouts={gene.id})
+            if gene_essential:
+                knockout_reactions[gene.id].append(reaction.id)
+
+    return knockout_reactions
+
+
+def knockout_reactions_index(model: Model) -> Dict[str, List[str]]:
+    """Implementation with the inverted gene index."""
+    return GeneReactionIndex(model).knockouts(g.id for g in model.genes)
+
+
+def benchmark(model_path: Path, repeats: int = 5) -> None:
+    """Run benchmark for model."""
+    model = read_sbml_model(str(model_path))
+    print(
+        f"{model_path.name}: {len(model.reactions)} reactions, {len(model.genes)} genes"
+    )
+
+    results = {}
+    for f in [knockout_reactions_quadratic, knockout_reactions_index]:
+        times = []
+        for _ in range(repeats):
+            t_start = default_timer()
+            results[f.__name__] = f(model)
+            times.append(default_timer() - t_start)
+        print(f"{f.__name__:<30} {min(times):.4f} [s] (best of {repeats})")
+
+    assert dict(results["knockout_reactions_quadratic"]) == dict(
+        results["knockout_reactions_index"]
+    )
+
+
+if __name__ == "__main__":
+    path = (
+        Path(sys.argv[1])
+        if len(sys.argv) > 1
+        else Path(__file__).parent.parent / "models" / "e_coli_core.xml"
+    )
+    benchmark(path)
@@ -0,0 +1,126 @@
+"""Benchmark of the TSV input/output of FROG reports.
+
+Compares `FrogReport.to_tsv` and `FrogReport.from_tsv` against the previous
+implementation, which parsed the TSVs with type inference and validated every
+row with pydantic, for plain and gzip compressed TSVs.
+
+    python benchmark_tsv.py [model.omex|model.xml]
+"""
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from timeit import default_timer
+from typing import Callable, Dict, List
+
+import orjson
+import pandas as pd
+from pymetadata.omex import Omex
+
+from fbc_curation import EXAMPLE_DIR
+from fbc_curation.curator.cameo_curator import CuratorCameo
+from fbc_curation.frog import (
+    CuratorConstants,
+    FrogFVASingle,
+    FrogGeneDeletion,
+    FrogMetaData,
+    FrogObjective,
+    FrogReactionDeletion,
+    FrogReport,
+)
+
+
+def to_tsv_previous(report: FrogReport, output_dir: Path) -> None:
+    """Previous implementation writing the DataFrames of the row models."""
+    with open(output_dir / CuratorConstants.METADATA_FILENAME, "w") as f_json:
+        f_json.write(report.metadata.json(indent=2))
+
+    for table, filename in report._tsv_tables():
+        df = pd.DataFrame([row.dict() for row in getattr(table, table._rows_key)])
+        df.sort_values(by=[table._sort_key], inplace=True)
+        df.to_csv(output_dir / filename, sep="\t", index=False, na_rep="NaN")
+
+
+def from_tsv_previous(path: Path) -> Dict[str, List]:
+    """Previous implementation with type inference and row validation."""
+    with open(path / CuratorConstants.METADATA_FILENAME, "r+b") as f_json:
+        results: Dict[str, List] = {
+            "metadata": [FrogMetaData(**orjson.loads(f_json.read()))]
+        }
+    for row_cls, filename in [
+        (FrogObjective, CuratorConstants.OBJECTIVE_FILENAME),
+        (FrogFVASingle, CuratorConstants.FVA_FILENAME),
+        (FrogReactionDeletion, CuratorConstants.REACTIONDELETIONS_FILENAME),
+        (FrogGeneDeletion, CuratorConstants.GENEDELETIONS_FILENAME),
+    ]:
+        try:
+            df = pd.read_csv(path / filename, sep="\t")
+        except pd.errors.EmptyDataError:
+            df = pd.DataFrame()
+        results[filename] = [row_cls(**item) for item in df.to_dict(orient="records")]
+    return results
+
+
+def sbml_path_for_model(model_path: Path, tmp_dir: Path) -> Path:
+    """Get SBML path, the master SBML of an OMEX is extracted."""
+    if model_path.suffix != ".omex":
+        return model_path
+    omex = Omex.from_omex(model_path)
+    for entry in omex.manifest.entries:
+        if entry.is_sbml():
+            sbml_path = tmp_dir / Path(entry.location).name
+            shutil.copy(omex.get_path(entry.location), sbml_path)
+            return sbml_path
+    raise ValueError(f"No SBML in '{model_path}'")
+
+
+def best_time(f: Callable[[], None], repeats: int) -> float:
+    """Get best execution time of repeats."""
+    times = []
+    for _ in range(repeats):
+        t_start = default_timer()
+        f()
+        times.append(default_timer() - t_start)
+    return min(times)
+
+
+def benchmark(model_path: Path, repeats: int = 5) -> None:
+    """Run benchmark for FROG report of model."""
+    with tempfile.TemporaryDirectory() as f_tmp:
+        tmp_dir = Path(f_tmp)
+        report = CuratorCameo(
+            model_path=sbml_path_for_model(model_path, tmp_dir),
+            frog_id="benchmark",
+            curators=[],
+        ).run()
+        rows = sum(len(table.df) for table, _ in report._tsv_tables())
+        print(f"{model_path.name}: {rows} rows")
+
+        for name, write, read in [
+            ("previous", to_tsv_previous, from_tsv_previous),
+            ("typed", FrogReport.to_tsv, FrogReport.from_tsv),
+            (
+                "typed gzip",
+                lambda r, path: r.to_tsv(path, compression="gzip"),
+                FrogReport.from_tsv,
+            ),
+        ]:
+            output_dir = tmp_dir / name.replace(" ", "_")
+            output_dir.mkdir()
+            t_write = best_time(lambda: write(report, output_dir), repeats)
+            t_read = best_time(lambda: read(output_dir), repeats)
+            size = sum(p.stat().st_size for p in output_dir.iterdir())
+            print(
+                f"{name:<12} write {t_write:.4f} [s] ({rows / t_write:>9.0f} rows/s)  "
+                f"read {t_read:.4f} [s] ({rows / t_read:>9.0f} rows/s)  "
+                f"{size / 1024:.0f} [kB]"
+            )
+
+
+if __name__ == "__main__":
+    path = (
+        Path(sys.argv[1])
+        if len(sys.argv) > 1
+        else EXAMPLE_DIR / "models" / "iJR904.omex"
+    )
+    benchmark(path)
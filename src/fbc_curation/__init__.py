@@ -9,6 +9,12 @@ RESOURCES_DIR = Path(__file__).parent / "resources"
 EXAMPLE_DIR = RESOURCES_DIR / "examples"
 
 FROG_SCHEMA_VERSION_1 = RESOURCES_DIR / "schema" / "frog-schema-version-1.json"
+FROG_COMPACT_SCHEMA_VERSION_1 = (
+    RESOURCES_DIR / "schema" / "frog-compact-schema-version-1.json"
+)
+FROG_DIAGNOSTICS_SCHEMA_VERSION_1 = (
+    RESOURCES_DIR / "schema" / "frog-diagnostics-schema-version-1.json"
+)
 FROG_DATA_DIR = Path(__file__).parent.parent / "frog_data"
 
 FROG_PATH_PREFIX = "FROG"
@@ -4,28 +4,56 @@ This provides basic functionality of running the model
 and returning the JSON representation based on fastAPI.
 """
 
+import os
 import tempfile
 import traceback
 import typing
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
+import httpx
 import orjson
-import requests
 import uvicorn
-from celery.result import AsyncResult
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, FilePath
 from pymetadata import log
-from starlette.responses import FileResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import FileResponse, JSONResponse, StreamingResponse
 
 from fbc_curation import EXAMPLE_DIR
-from fbc_curation.worker import frog_task
+from fbc_curation.events import COMPLETE_EVENT
+from fbc_curation.fetch import (
+    SizeLimitError,
+    UrlFetcher,
+    multipart_file_chunks,
+    stream_to_file,
+)
+from fbc_curation.worker import (
+    FINISHED_STATES,
+    FROG_STORAGE,
+    frog_from_cache,
+    frog_submit,
+    progress_events,
+    task_status,
+)
 
 
 logger = log.get_logger(__name__)
 
+# maximal size of uploaded models in bytes
+FROG_MAX_UPLOAD_SIZE: int = int(os.environ.get("FROG_MAX_UPLOAD_SIZE", 100 * 1024**2))
+
+# timeout in seconds for fetching models from URLs
+FROG_URL_TIMEOUT: float = float(os.environ.get("FROG_URL_TIMEOUT", 30))
+
+# time in seconds downloads of URLs are cached by URL and ETag
+FROG_URL_CACHE_TTL: float = float(os.environ.get("FROG_URL_CACHE_TTL", 300))
+
+# seconds between keep-alive comments in event streams without events
+FROG_EVENTS_KEEPALIVE: float = float(os.environ.get("FROG_EVENTS_KEEPALIVE", 15))
+
 
 class ORJSONResponse(JSONResponse):
     """JSON response."""
@@ -45,10 +73,21 @@ This service provides an API for running FROG analysis.
 
 After submission of a
 model for frog analysis a `task_id` is returned which allows to query the status
-of the FROG task and retrieve the FROG report after the task succeeded.
+of the FROG task and retrieve the FROG report after the task succeeded. The
+progress of the task is pushed as Server-Sent Events by
+`/api/task/events/{task_id}`.
 """
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Close pooled connections of the URL fetcher on shutdown."""
+    yield
+    await url_fetcher.aclose()
+
+
 api = FastAPI(
+    lifespan=lifespan,
     default_response_class=ORJSONResponse,
     title="FROG REST API",
     description=description,
@@ -94,6 +133,14 @@ api.add_middleware(
 )
 
 
+url_fetcher = UrlFetcher(
+    storage_dir=FROG_STORAGE,
+    max_size=FROG_MAX_UPLOAD_SIZE,
+    timeout=FROG_URL_TIMEOUT,
+    cache_ttl=FROG_URL_CACHE_TTL,
+)
+
+
 @api.get("/api")
 def get_api_information(request: Request) -> Dict[str, Any]:
     """Get API information."""
@@ -107,14 +154,62 @@ def get_api_information(request: Request) -> Dict[str, Any]:
 
 @api.get("/api/task/status/{task_id}", tags=["tasks"])
 def get_status_for_task(task_id: str) -> JSONResponse:
-    """Get status and results of FROG task with `task_id`."""
-    task_result = AsyncResult(task_id)
-    result = {
-        "task_id": task_id,
-        "task_status": task_result.status,
-        "task_result": task_result.result,
-    }
-    return JSONResponse(result)
+    """Get status and results of FROG task with `task_id`.
+
+    The status is aggregated over all sub-tasks of the FROG task.
+    """
+    return JSONResponse(task_status(task_id))
+
+
+@api.get("/api/task/events/{task_id}", tags=["tasks"])
+async def get_events_for_task(task_id: str) -> StreamingResponse:
+    """Stream progress events of FROG task with `task_id` as Server-Sent Events.
+
+    A 'progress' event is sent per finished stage (metadata, objectives, FVA,
+    reaction and gene deletions of every curator and SBML entry) with the number
+    of `done` and `total` stages, the stream ends with a 'complete' event with
+    the `task_status`. Events do not contain the reports, which are retrieved
+    once via `/api/task/status/{task_id}` or `/api/task/omex/{task_id}`.
+    """
+    return StreamingResponse(
+        _event_stream(task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _event_stream(task_id: str) -> AsyncIterator[str]:
+    """Stream events of task until the complete event.
+
+    The last published event is sent first (e.g. for subscriptions after the
+    task finished). Without events the task status is checked, i.e. for cached
+    results or lost events, and a keep-alive comment is sent.
+    """
+    events = progress_events()
+    subscription = await events.subscribe(task_id)
+    try:
+        event: Optional[Dict[str, Any]] = await run_in_threadpool(events.last, task_id)
+        while True:
+            if event is None:
+                event = await run_in_threadpool(_finished_event, task_id)
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                data = orjson.dumps(event).decode("utf-8")
+                yield f"event: {event['event']}\ndata: {data}\n\n"
+                if event["event"] == COMPLETE_EVENT:
+                    return
+            event = await subscription.get(timeout=FROG_EVENTS_KEEPALIVE)
+    finally:
+        await subscription.close()
+
+
+def _finished_event(task_id: str) -> Optional[Dict[str, Any]]:
+    """Get complete event from the status of a finished task, None otherwise."""
+    status: str = task_status(task_id)["task_status"]
+    if status not in FINISHED_STATES:
+        return None
+    return {"task_id": task_id, "event": COMPLETE_EVENT, "task_status": status}
 
 
 @api.get("/api/task/omex/{task_id}", tags=["tasks"])
@@ -135,71 +230,190 @@ async def get_combine_archive_for_task(task_id: str) -> FileResponse:
 
 
 @api.post("/api/frog/file", tags=["frog"])
-async def create_frog_from_file(request: Request) -> Dict[str, Any]:
+async def create_frog_from_file(
+    request: Request, compact: bool = False, cache: bool = True
+) -> Dict[str, Any]:
     """Upload file and create FROG.
 
-    Creates a task for the FROG report.
+    Creates a task for the FROG report. The multipart form data is parsed while
+    it arrives, the file in the field 'source' is streamed into the storage.
 
+    :param compact: reports in the task result in the compact FROG format.
+    :param cache: return the cached result for the same model, a fresh result
+        is created if False.
     :returns: `task_id`
     """
-    file_data = await request.form()
-    file_content = await file_data["source"].read()  # type: ignore
-    return frog_from_bytes(file_content)
+    _check_content_length(request)
+    path = await _save_upload(
+        multipart_file_chunks(
+            request.stream(),
+            content_type=request.headers.get("content-type", ""),
+            field="source",
+            max_size=FROG_MAX_UPLOAD_SIZE,
+        )
+    )
+    return await run_in_threadpool(frog_from_path, path, compact=compact, cache=cache)
 
 
 @api.post("/api/frog/content", tags=["frog"])
-async def create_frog_from_content(request: Request) -> Dict[str, Any]:
+async def create_frog_from_content(
+    request: Request, compact: bool = False, cache: bool = True
+) -> Dict[str, Any]:
     """Create FROG from file contents.
 
     Creates a task for the FROG report.
 
+    :param compact: reports in the task result in the compact FROG format.
+    :param cache: return the cached result for the same model, a fresh result
+        is created if False.
     :returns: `task_id`
     """
-    content: bytes = await request.body()
-    return frog_from_bytes(content)
+    _check_content_length(request)
+    path = await _save_upload(request.stream())
+    return await run_in_threadpool(frog_from_path, path, compact=compact, cache=cache)
 
 
 @api.get("/api/frog/url", tags=["frog"])
-def create_frog_from_url(url: str) -> Dict[str, Any]:
+async def create_frog_from_url(
+    url: str, compact: bool = False, cache: bool = True
+) -> Dict[str, Any]:
     """Create FROG via URL to SBML or COMBINE archive.
 
-    Creates a task for the FROG report.
+    Creates a task for the FROG report. The model is streamed into the storage,
+    downloads larger than the maximal upload size are rejected.
 
+    :param compact: reports in the task result in the compact FROG format.
+    :param cache: return the cached result for the same model, a fresh result
+        is created if False.
     :returns: `task_id`
     """
-    response = requests.get(url)
-    response.raise_for_status()
-    return frog_from_bytes(response.content)
+    try:
+        path = await url_fetcher.fetch(url)
+    except SizeLimitError as err:
+        raise HTTPException(status_code=413, detail=str(err))
+    except (httpx.InvalidURL, httpx.UnsupportedProtocol) as err:
+        raise HTTPException(status_code=400, detail=f"Invalid URL '{url}': {err}")
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail=f"Timeout fetching '{url}'")
+    except httpx.HTTPError as err:
+        raise HTTPException(status_code=502, detail=f"Error fetching '{url}': {err}")
+    return await run_in_threadpool(frog_from_path, path, compact=compact, cache=cache)
+
+
+def _check_content_length(request: Request) -> None:
+    """Reject upload early if the declared size exceeds the limit.
+
+    raises HTTPException (413), (400) for an invalid Content-Length header
+    """
+    content_length = request.headers.get("content-length")
+    if not content_length:
+        return
+    try:
+        size = int(content_length)
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid Content-Length '{content_length}'."
+        )
+    if size > FROG_MAX_UPLOAD_SIZE:
+        raise _upload_too_large()
+
+
+def _upload_too_large() -> HTTPException:
+    """Create exception for upload exceeding `FROG_MAX_UPLOAD_SIZE`."""
+    return HTTPException(
+        status_code=413,
+        detail=f"Upload exceeds maximal size of {FROG_MAX_UPLOAD_SIZE} bytes.",
+    )
+
+
+async def _save_upload(chunks: AsyncIterator[bytes]) -> str:
+    """Stream upload into a file in the storage accessible for the task queue.
+
+    The upload is never held in memory completely, the MD5 of the content is
+    calculated on the fly (see `fetch.stream_to_file`).
+
+    raises HTTPException (413) if the upload exceeds `FROG_MAX_UPLOAD_SIZE`,
+    (400) for invalid form data, the file is removed.
+
+    :return: path of the persistent temporary file cleaned up by the task.
+    """
+    try:
+        path, _ = await stream_to_file(
+            chunks, directory=FROG_STORAGE, max_size=FROG_MAX_UPLOAD_SIZE
+        )
+    except SizeLimitError:
+        raise _upload_too_large()
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    return path
 
 
-def frog_from_bytes(content: bytes) -> Dict[str, Any]:
+def frog_from_bytes(
+    content: bytes, compact: bool = False, cache: bool = True
+) -> Dict[str, Any]:
     """Start FROG task for given content.
 
     Necessary to serialize the content to a common location
-    accessible for the task queue.
+    accessible for the task queue (see `frog_from_path`).
 
+    :param compact: reports in the task result in the compact FROG format.
+    :param cache: return the cached result, a fresh result is created (and
+        cached) if False.
     :returns: `task_id`
     """
     try:
         # persistent temporary file cleaned up by task
-        _, path = tempfile.mkstemp(dir="/frog_data")
+        _, path = tempfile.mkstemp(dir=FROG_STORAGE)
 
         with open(path, "w+b") as f_tmp:
             f_tmp.write(content)
             f_tmp.close()
-        task = frog_task.delay(str(path))
-        return {"task_id": task.id}
 
     except Exception as e:
-        res = {
-            "errors": [
-                f"{e.__str__()}",
-                f"{''.join(traceback.format_exception(None, e, e.__traceback__))}",
-            ],
-        }
-        logger.error(res)
+        return _errors(e)
+
+    return frog_from_path(path, compact=compact, cache=cache)
+
+
+def frog_from_path(
+    path: str, compact: bool = False, cache: bool = True
+) -> Dict[str, Any]:
+    """Start FROG task for given file in the storage.
+
+    If the result for the content is cached, a finished task with the cached
+    result is returned without running FROG. The task of an identical in-flight
+    submission is returned instead of a new task.
+
+    :param path: persistent temporary file cleaned up by the task.
+    :param compact: reports in the task result in the compact FROG format.
+    :param cache: return the cached result, a fresh result is created (and
+        cached) if False.
+    :returns: `task_id`
+    """
+    try:
+        task_id = frog_from_cache(path, compact=compact) if cache else None
+        if task_id:
+            os.remove(path)
+            return {"task_id": task_id}
+
+        # identical in-flight submissions share the task
+        return {"task_id": frog_submit(path, compact=compact)}
+
+    except Exception as e:
+        return _errors(e)
+
+
+def _errors(e: Exception) -> Dict[str, Any]:
+    """Get errors response for exception."""
+    res = {
+        "errors": [
+            f"{e.__str__()}",
+            f"{''.join(traceback.format_exception(None, e, e.__traceback__))}",
+        ],
+    }
+    logger.error(res)
 
-        return res
+    return res
 
 
 class Example(BaseModel):
@@ -237,11 +451,15 @@ def get_examples() -> Dict[Any, Any]:
 
 
 @api.get("/api/examples/{example_id}", tags=["examples"])
-def create_frog_for_example(example_id: str) -> Dict[str, Any]:
+def create_frog_for_example(
+    example_id: str, compact: bool = False, cache: bool = True
+) -> Dict[str, Any]:
     """Get specific FROG example.
 
     Creates a task for the FROG report.
 
+    :param compact: reports in the task result in the compact FROG format.
+    :param cache: return the cached result, a fresh result is created if False.
     :returns: task_id
     """
 
@@ -250,7 +468,7 @@ def create_frog_for_example(example_id: str) -> Dict[str, Any]:
         source: Path = example.file
         with open(source, "rb") as f:
             content: bytes = f.read()
-            return frog_from_bytes(content)
+            return frog_from_bytes(content, compact=compact, cache=cache)
 
     else:
         return {"error": f"Example for id '{example_id}' does not exist."}
@@ -0,0 +1,340 @@
+"""Lazy reading of FROG reports from COMBINE archives (OMEX).
+
+The archive is not extracted. The manifest is read from the zip and reports are
+returned as `FrogReportProxy`, which reads a section (metadata, objectives, FVA,
+deletions) from the archive members on first access. E.g. comparing the
+objectives of the reports reads neither the FVA nor the deletion tables.
+
+A report is stored in multiple copies per location prefix (JSON, TSVs and
+Arrow). By default only a single copy is read in the order of preference of the
+formats.
+"""
+import gzip
+import xml.etree.ElementTree as ET
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+import orjson
+import pandas as pd
+from pydantic import BaseModel
+from pymetadata import log
+from pymetadata.omex import EntryFormat, ManifestEntry
+
+from fbc_curation.frog import (
+    CuratorConstants,
+    FrogDiagnostics,
+    FrogFVA,
+    FrogGeneDeletions,
+    FrogMetaData,
+    FrogObjectives,
+    FrogReactionDeletions,
+    FrogReport,
+    _import_pyarrow,
+)
+
+
+logger = log.get_logger(__name__)
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# formats of report copies in the archive
+FROG_FORMATS: Tuple[str, ...] = ("json", "tsv", "arrow")
+
+# TSV and Arrow filenames of the report tables
+_TABLE_FILENAMES: Dict[str, Dict[str, str]] = {
+    "tsv": {
+        "objectives": CuratorConstants.OBJECTIVE_FILENAME,
+        "fva": CuratorConstants.FVA_FILENAME,
+        "reaction_deletions": CuratorConstants.REACTIONDELETIONS_FILENAME,
+        "gene_deletions": CuratorConstants.GENEDELETIONS_FILENAME,
+    },
+    "arrow": {
+        "objectives": CuratorConstants.OBJECTIVE_ARROW_FILENAME,
+        "fva": CuratorConstants.FVA_ARROW_FILENAME,
+        "reaction_deletions": CuratorConstants.REACTIONDELETIONS_ARROW_FILENAME,
+        "gene_deletions": CuratorConstants.GENEDELETIONS_ARROW_FILENAME,
+    },
+}
+
+
+def _location(name: str) -> str:
+    """Get manifest location for name of zip member."""
+    return f"./{PurePosixPath(name).as_posix()}"
+
+
+def _is_format(entry_format: str, format: str) -> bool:
+    """Check if format of manifest entry is format, http and https are equal."""
+    return entry_format.replace("https://", "http://", 1) == format.replace(
+        "https://", "http://", 1
+    )
+
+
+def _location_prefix(location: str) -> str:
+    """Get directory of location with trailing slash, e.g. './FROG/a.xml/cobrapy/'."""
+    return location[: location.rfind("/") + 1]
+
+
+class FrogArchive:
+    """COMBINE archive with FROG reports read lazily from the zip."""
+
+    def __init__(self, omex_path: Path):
+        """Open archive at `omex_path` and read the manifest.
+
+        raises ValueError if the archive has no manifest.
+        """
+        self.omex_path: Path = Path(omex_path)
+        with zipfile.ZipFile(self.omex_path, "r") as zf:
+            self._members: Dict[str, str] = {
+                _location(name): name
+                for name in zf.namelist()
+                if not name.endswith("/")
+            }
+            if "./manifest.xml" not in self._members:
+                raise ValueError(f"No manifest.xml in archive: '{self.omex_path}'")
+            manifest_xml = zf.read(self._members["./manifest.xml"])
+
+        self.entries: List[ManifestEntry] = []
+        for content in ET.fromstring(manifest_xml):
+            self.entries.append(
+                ManifestEntry(
+                    location=content.attrib["location"],
+                    format=content.attrib["format"],
+                    master=content.attrib.get("master", "false") == "true",
+                )
+            )
+
+    def __contains__(self, location: str) -> bool:
+        """Check if location is a member of the archive."""
+        return location in self._members
+
+    @contextmanager
+    def open(self, location: str) -> Iterator[BinaryIO]:
+        """Open member at location, members with suffix '.gz' are decompressed."""
+        with zipfile.ZipFile(self.omex_path, "r") as zf:
+            with zf.open(self._members[location], "r") as f:
+                if location.endswith(".gz"):
+                    with gzip.GzipFile(fileobj=f, mode="rb") as f_gzip:
+                        yield cast(BinaryIO, f_gzip)
+                else:
+                    yield cast(BinaryIO, f)
+
+    def read(self, location: str) -> bytes:
+        """Read content of member at location."""
+        with self.open(location) as f:
+            return f.read()
+
+    def report_copies(self) -> Dict[str, Dict[str, str]]:
+        """Get locations of the report copies by location prefix and format.
+
+        The location of a JSON copy is the 'frog.json', of a TSV copy the
+        'metadata.json' and of an Arrow copy the objective table.
+        """
+        copies: Dict[str, Dict[str, str]] = {}
+        for entry in self.entries:
+            if _is_format(entry.format, EntryFormat.FROG_JSON_V1):
+                format = "json"
+            elif _is_format(entry.format, EntryFormat.FROG_METADATA_V1):
+                format = "tsv"
+            elif (
+                entry.format == CuratorConstants.ARROW_FORMAT
+                and PurePosixPath(entry.location).name
+                == CuratorConstants.OBJECTIVE_ARROW_FILENAME
+            ):
+                format = "arrow"
+            else:
+                continue
+            prefix = _location_prefix(entry.location)
+            copies.setdefault(prefix, {})[format] = entry.location
+        return copies
+
+    def reports(
+        self, formats: Sequence[str] = FROG_FORMATS, all_copies: bool = False
+    ) -> List["FrogReportProxy"]:
+        """Get proxies of the reports in the archive.
+
+        :param formats: formats of the copies to read in order of preference.
+        :param all_copies: read all copies in the formats instead of the first
+            copy per location prefix.
+        :return: report proxies, the sections are read on first access.
+        """
+        unsupported = set(formats) - set(FROG_FORMATS)
+        if unsupported:
+            raise ValueError(
+                f"Unsupported FROG formats {sorted(unsupported)}, supported formats: "
+                f"{list(FROG_FORMATS)}"
+            )
+
+        proxies: List[FrogReportProxy] = []
+        for prefix, locations in self.report_copies().items():
+            for format in formats:
+                if format not in locations:
+                    continue
+                if format == "arrow":
+                    try:
+                        _import_pyarrow()
+                    except ImportError as err:
+                        logger.warning(f"Arrow report '{prefix}' not read: {err}")
+                        continue
+                proxies.append(
+                    FrogReportProxy(self, location=locations[format], format=format)
+                )
+                if not all_copies:
+                    break
+        return proxies
+
+
+class FrogReportProxy:
+    """Proxy of a FrogReport in an archive.
+
+    The sections of the report are read from the archive on first access and
+    kept, the attributes are the same as for the `FrogReport`.
+    """
+
+    def __init__(self, archive: FrogArchive, location: str, format: str):
+        """Create proxy for report copy in format at location.
+
+        :param location: location of the copy, see `FrogArchive.report_copies`.
+        :param format: format of the copy, one of `FROG_FORMATS`.
+        """
+        self.archive: FrogArchive = archive
+        self.location: str = location
+        self.format: str = format
+        self.prefix: str = _location_prefix(location)
+        self._sections: Dict[str, BaseModel] = {}
+        self._diagnostics: Optional[FrogDiagnostics] = None
+
+    def __repr__(self) -> str:
+        """Get representation."""
+        return (
+            f"FrogReportProxy({self.archive.omex_path.name}:{self.location}, "
+            f"sections={list(self._sections)})"
+        )
+
+    @property
+    def metadata(self) -> FrogMetaData:
+        """Get metadata."""
+        return cast(FrogMetaData, self.section("metadata"))
+
+    @property
+    def objectives(self) -> FrogObjectives:
+        """Get objectives."""
+        return cast(FrogObjectives, self.section("objectives"))
+
+    @property
+    def fva(self) -> FrogFVA:
+        """Get FVA."""
+        return cast(FrogFVA, self.section("fva"))
+
+    @property
+    def reaction_deletions(self) -> FrogReactionDeletions:
+        """Get reaction deletions."""
+        return cast(FrogReactionDeletions, self.section("reaction_deletions"))
+
+    @property
+    def gene_deletions(self) -> FrogGeneDeletions:
+        """Get gene deletions."""
+        return cast(FrogGeneDeletions, self.section("gene_deletions"))
+
+    @property
+    def diagnostics(self) -> FrogDiagnostics:
+        """Get diagnostics shared by the copies of the report, read on first access.
+
+        Empty diagnostics if the archive has no diagnostics for the report.
+        """
+        if self._diagnostics is None:
+            location = f"{self.prefix}{CuratorConstants.DIAGNOSTICS_FILENAME}"
+            if location in self.archive:
+                self._diagnostics = FrogDiagnostics.parse_raw(
+                    self.archive.read(location)
+                )
+            else:
+                self._diagnostics = FrogDiagnostics()
+        return self._diagnostics
+
+    def section(self, key: str) -> BaseModel:
+        """Get section of the report, read on first access."""
+        return self.sections([key])[key]
+
+    def sections(self, keys: Optional[Iterable[str]] = None) -> Dict[str, BaseModel]:
+        """Get sections of the report, sections not accessed before are read.
+
+        raises ValidationError, ValueError
+
+        :param keys: section keys, i.e. FrogReport fields, all sections if None.
+        :return: section models by key in order of the keys.
+        """
+        keys = FrogReport._section_keys(keys)
+        missing = [key for key in keys if key not in self._sections]
+        if missing:
+            logger.debug(f"Read {missing}: '{self.location}'")
+            self._sections.update(self._read_sections(missing))
+        return {key: self._sections[key] for key in keys}
+
+    def _read_sections(self, keys: List[str]) -> Dict[str, BaseModel]:
+        """Read sections from the archive."""
+        if self.format == "json":
+            # only the selected sections are parsed, e.g. the metadata at the
+            # beginning is read without the tables
+            with self.archive.open(self.location) as f_json:
+                return FrogReport.sections_from_json_file(f_json, keys=keys)
+
+        sections: Dict[str, BaseModel] = {}
+        for key in keys:
+            if key == "metadata":
+                sections[key] = self._read_metadata()
+                continue
+            table_cls = FrogReport.__fields__[key].type_
+            location = f"{self.prefix}{_TABLE_FILENAMES[self.format][key]}"
+            if self.format == "arrow":
+                sections[key] = table_cls.from_arrow(self._read_arrow(location))
+                continue
+            if location not in self.archive and f"{location}.gz" in self.archive:
+                location = f"{location}.gz"
+            if location not in self.archive:
+                logger.error(
+                    f"Required file for fbc curation does not exist: '{location}'"
+                )
+                sections[key] = table_cls.from_df(pd.DataFrame())
+            else:
+                with self.archive.open(location) as f_tsv:
+                    sections[key] = table_cls.from_tsv(f_tsv)
+        return sections
+
+    def _read_metadata(self) -> FrogMetaData:
+        """Read metadata of a TSV or Arrow copy."""
+        if self.format == "tsv":
+            return FrogMetaData(**orjson.loads(self.archive.read(self.location)))
+        schema_metadata = self._read_arrow(self.location).schema.metadata
+        return FrogMetaData.parse_raw(
+            schema_metadata[CuratorConstants.ARROW_METADATA_KEY.encode()]
+        )
+
+    def _read_arrow(self, location: str) -> "pa.Table":
+        """Read table of Arrow IPC file member."""
+        pa = _import_pyarrow()
+        data = self.archive.read(location)
+        return pa.ipc.open_file(pa.py_buffer(data)).read_all()
+
+    def to_dfs(self) -> Dict[str, pd.DataFrame]:
+        """Create report DataFrames."""
+        return self.load().to_dfs()
+
+    def load(self) -> FrogReport:
+        """Read all sections and create the FrogReport."""
+        report = FrogReport(**self.sections())
+        report.set_diagnostics(self.diagnostics)
+        return report
@@ -0,0 +1,231 @@
+"""Persistent on-disk caches of parsed models and FROG results.
+
+Parsed cobra models are stored as pickles in a cache directory. Entries are keyed
+by the MD5 of the SBML file content and the cobra version, so a repeated run on
+the same model skips SBML parsing entirely.
+
+Results of FROG tasks are stored as JSON with the OMEX. Entries are keyed by the
+model content, the curators, the software and solver versions and the output
+options, so a repeated submission of a model skips the FROG entirely.
+
+The caches have a size limit, least recently used entries are evicted first.
+"""
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
+from cobra import __version__ as cobra_version
+from cobra.core import Model
+from pymetadata import log
+
+
+logger = log.get_logger(__name__)
+
+
+class DirectoryCache:
+    """Cache of entry files in a directory.
+
+    The modification time of an entry marks its last use, least recently used
+    entries are evicted if the cache exceeds its size.
+    """
+
+    suffix: str = ""
+
+    def __init__(self, cache_dir: Path, max_size: int = 2 * 1024**3):
+        """Create cache in `cache_dir`.
+
+        :param cache_dir: directory for cache files, created if not existing.
+        :param max_size: maximal size of the cache in bytes.
+        """
+        self.cache_dir: Path = Path(cache_dir)
+        self.max_size: int = max_size
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def __str__(self) -> str:
+        """Get string representation."""
+        return f"{self.__class__.__name__}({self.cache_dir}, max_size={self.max_size})"
+
+    def entries(self) -> List[Tuple[Path, Any]]:
+        """Get cache entries with stat results, least recently used first."""
+        entries = []
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        entries.sort(key=lambda item: item[1].st_mtime)
+        return entries
+
+    def size(self) -> int:
+        """Get total size of cache entries in bytes."""
+        return sum(self._entry_size(path, stat) for path, stat in self.entries())
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits its size."""
+        entries = [
+            (path, self._entry_size(path, stat)) for path, stat in self.entries()
+        ]
+        total = sum(size for _, size in entries)
+        for path, size in entries:
+            if total <= self.max_size:
+                break
+            logger.debug(f"Evict {self.__class__.__name__} entry: '{path.name}'")
+            self._remove_entry(path)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove all cache entries."""
+        for path, _ in self.entries():
+            self._remove_entry(path)
+
+    def _entry_size(self, path: Path, stat: Any) -> int:
+        """Get size of entry in bytes."""
+        return int(stat.st_size)
+
+    def _remove_entry(self, path: Path) -> None:
+        """Remove entry."""
+        self._remove(path)
+
+    def _write_atomic(self, path: Path, write: Callable[[Path], None]) -> None:
+        """Write file via temporary file, cache can be shared between processes.
+
+        :param write: function writing the content to the given path.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(Path(tmp_path))
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(Path(tmp_path))
+            raise
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Mark entry as recently used."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        """Remove file if existing."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class ModelCache(DirectoryCache):
+    """Cache of parsed models in a directory."""
+
+    suffix: str = ".pickle"
+
+    def path_for_md5(self, md5: str) -> Path:
+        """Get cache file for model with given MD5."""
+        return self.cache_dir / f"{md5}-cobra-{cobra_version}{self.suffix}"
+
+    def get(self, md5: str) -> Optional[Tuple[Model, Any]]:
+        """Get model and objective information for MD5 or None."""
+        path = self.path_for_md5(md5)
+        try:
+            with open(path, "rb") as f_cache:
+                model, objective_information = pickle.load(f_cache)
+        except FileNotFoundError:
+            return None
+        except Exception as err:
+            # corrupted or incompatible entry, is recreated
+            logger.warning(f"Invalid model cache entry '{path}': {err}")
+            self._remove(path)
+            return None
+
+        self._touch(path)
+        logger.debug(f"Model cache hit: '{path.name}'")
+        return model, objective_information
+
+    def put(self, md5: str, model: Model, objective_information: Any) -> None:
+        """Store model and objective information for MD5."""
+        path = self.path_for_md5(md5)
+        data: bytes = pickle.dumps(
+            (model, objective_information), protocol=pickle.HIGHEST_PROTOCOL
+        )
+        if len(data) > self.max_size:
+            logger.warning(f"Model '{md5}' exceeds model cache size, not cached.")
+            return
+
+        self._write_atomic(path, lambda tmp_path: tmp_path.write_bytes(data))
+        logger.debug(f"Model cached: '{path.name}'")
+        self.evict()
+
+
+class ResultCache(DirectoryCache):
+    """Cache of FROG task results in a directory.
+
+    An entry is the JSON of the task result with the OMEX of the task. The JSON
+    is written last, i.e., only complete entries are found.
+    """
+
+    suffix: str = ".json"
+
+    def path_for_key(self, key: str) -> Path:
+        """Get cache file of the task result for key."""
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def omex_path_for_key(self, key: str) -> Path:
+        """Get cache file of the OMEX for key."""
+        return self.cache_dir / f"{key}.omex"
+
+    def get(self, key: str, omex_path: Path) -> Optional[Dict[str, Any]]:
+        """Get task result for key or None.
+
+        :param omex_path: path the cached OMEX is copied to.
+        """
+        path = self.path_for_key(key)
+        try:
+            content: Dict[str, Any] = orjson.loads(path.read_bytes())
+            shutil.copyfile(self.omex_path_for_key(key), omex_path)
+        except FileNotFoundError:
+            # no entry or evicted by another process
+            return None
+        except Exception as err:
+            logger.warning(f"Invalid result cache entry '{path}': {err}")
+            self._remove_entry(path)
+            return None
+
+        self._touch(path)
+        logger.info(f"Result cache hit: '{path.name}'")
+        return content
+
+    def put(self, key: str, content: Dict[str, Any], omex_path: Path) -> None:
+        """Store task result and OMEX for key."""
+        path = self.path_for_key(key)
+        data: bytes = orjson.dumps(content)
+        if len(data) + omex_path.stat().st_size > self.max_size:
+            logger.warning(f"Result '{key}' exceeds result cache size, not cached.")
+            return
+
+        self._write_atomic(
+            self.omex_path_for_key(key),
+            lambda tmp_path: shutil.copyfile(omex_path, tmp_path),
+        )
+        self._write_atomic(path, lambda tmp_path: tmp_path.write_bytes(data))
+        logger.debug(f"Result cached: '{path.name}'")
+        self.evict()
+
+    def _entry_size(self, path: Path, stat: Any) -> int:
+        """Get size of task result and OMEX in bytes."""
+        try:
+            omex_size = self.omex_path_for_key(path.stem).stat().st_size
+        except FileNotFoundError:
+            omex_size = 0
+        return int(stat.st_size) + omex_size
+
+    def _remove_entry(self, path: Path) -> None:
+        """Remove task result and OMEX."""
+        self._remove(path)
+        self._remove(self.omex_path_for_key(path.stem))
@@ -0,0 +1,154 @@
+"""Compact columnar JSON variant of the FROG format.
+
+The rows of the FROG tables repeat the model, objective and status. In the
+compact layout fields with the same value in all rows are stored once per table
+and the remaining fields as parallel arrays. The status is stored as bitmap.
+Conversion to and from the `FrogReport` is lossless.
+"""
+from __future__ import annotations
+
+import base64
+from typing import Any, ClassVar, Dict, List, Optional, Type, Union
+
+import numpy as np
+import pandas as pd
+from pydantic import Field, StrictStr, root_validator
+
+from fbc_curation.frog import (
+    BaseModel,
+    FrogFVA,
+    FrogGeneDeletions,
+    FrogMetaData,
+    FrogObjectives,
+    FrogReactionDeletions,
+    FrogReport,
+    FrogTable,
+    StatusCode,
+)
+
+
+FROG_COMPACT_FORMAT_V1 = "frog-compact-version-1"
+
+Value = Union[StrictStr, float, None]
+
+
+class FrogCompactTable(BaseModel):
+    """Compact FROG table."""
+
+    rows: int = Field(description="Number of rows of the table.")
+    constants: Dict[str, Value] = Field(
+        description="Fields with the same value in all rows."
+    )
+    columns: Dict[str, List[Value]] = Field(
+        description="Parallel arrays of the fields which differ between rows."
+    )
+    status: str = Field(
+        description="Bitmap of the status of the rows, base64 encoded bits with "
+        "most significant bit first; set bits are 'optimal', unset bits "
+        "'infeasible'."
+    )
+
+    @root_validator(skip_on_failure=True)
+    def check_rows(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Check length of the columns and the status bitmap."""
+        rows: int = values["rows"]
+        for name, column in values["columns"].items():
+            if len(column) != rows:
+                raise ValueError(
+                    f"Column '{name}' has '{len(column)}' values for '{rows}' rows."
+                )
+        if len(base64.b64decode(values["status"])) != (rows + 7) // 8:
+            raise ValueError(f"Status bitmap does not match '{rows}' rows.")
+        return values
+
+    @staticmethod
+    def from_table(table: FrogTable) -> FrogCompactTable:
+        """Create compact table from FROG table."""
+        df = table.df
+        constants: Dict[str, Value] = {}
+        columns: Dict[str, List[Value]] = {}
+        for name in table._row_cls.__fields__:
+            if name == "status":
+                continue
+            column: pd.Series = df[name]
+            values = column.astype(object).where(column.notna(), None)
+            if len(df) > 0 and column.nunique(dropna=False) == 1:
+                constants[name] = values.iloc[0]
+            else:
+                columns[name] = values.tolist()
+
+        bits = (df.status == StatusCode.OPTIMAL.value).values
+        status = base64.b64encode(np.packbits(bits).tobytes()).decode()
+        return FrogCompactTable(
+            rows=len(df), constants=constants, columns=columns, status=status
+        )
+
+    def to_table(self, table_cls: Type[FrogTable]) -> FrogTable:
+        """Create FROG table of given class from compact table.
+
+        raises ValidationError
+        """
+        bits = np.unpackbits(
+            np.frombuffer(base64.b64decode(self.status), dtype=np.uint8),
+            count=self.rows,
+        ).astype(bool)
+        data: Dict[str, Any] = {}
+        for name, field in table_cls._row_cls.__fields__.items():
+            if name == "status":
+                values: Any = np.where(
+                    bits, StatusCode.OPTIMAL.value, StatusCode.INFEASIBLE.value
+                )
+            elif name in self.constants:
+                values = [self.constants[name]] * self.rows
+            else:
+                values = self.columns.get(name)
+            dtype: Optional[type] = float if field.type_ is float else object
+            data[name] = pd.Series(values, dtype=dtype)
+
+        return table_cls(**{table_cls._rows_key: pd.DataFrame(data)})
+
+
+class FrogCompactReport(BaseModel):
+    """Compact variant of the FROG report."""
+
+    format: str = Field(
+        FROG_COMPACT_FORMAT_V1,
+        const=True,
+        description="Format and version of the compact FROG report.",
+    )
+    metadata: FrogMetaData
+    objectives: FrogCompactTable
+    fva: FrogCompactTable
+    reaction_deletions: FrogCompactTable
+    gene_deletions: FrogCompactTable
+
+    _table_classes: ClassVar[Dict[str, Type[FrogTable]]] = {
+        "objectives": FrogObjectives,
+        "fva": FrogFVA,
+        "reaction_deletions": FrogReactionDeletions,
+        "gene_deletions": FrogGeneDeletions,
+    }
+
+    @classmethod
+    def from_report(cls, report: FrogReport) -> FrogCompactReport:
+        """Create compact report from FROG report."""
+        return FrogCompactReport(
+            metadata=report.metadata,
+            **{
+                key: FrogCompactTable.from_table(getattr(report, key))
+                for key in cls._table_classes
+            },
+        )
+
+    def to_report(self) -> FrogReport:
+        """Create FROG report from compact report.
+
+        raises ValidationError
+        """
+        return FrogReport(
+            metadata=self.metadata,
+            **{
+                key: getattr(self, key).to_table(table_cls)
+                for key, table_cls in self._table_classes.items()
+            },
+        )
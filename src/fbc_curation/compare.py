@@ -1,15 +1,25 @@
 """Comparison of FROG results."""
 from pathlib import Path
-from typing import Dict, List
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
 from pymetadata import log
 from pymetadata.console import console
-from pymetadata.omex import EntryFormat, Omex
 
 from fbc_curation import EXAMPLE_DIR
-from fbc_curation.frog import CuratorConstants, FrogReport
+from fbc_curation.archive import FROG_FORMATS, FrogArchive, FrogReportProxy
+from fbc_curation.frog import CuratorConstants, FrogReport, FrogTable
 
 
 logger = log.get_logger(__name__)
@@ -26,25 +36,28 @@ class FrogComparison:
     relative_tolerance: float = 1e-3
 
     @staticmethod
-    def read_reports_from_omex(omex_path: Path) -> Dict[str, Dict[str, FrogReport]]:
-        """Read all reports from JSON and TSVs.
+    def read_reports_from_omex(
+        omex_path: Path,
+        formats: Sequence[str] = FROG_FORMATS,
+        all_copies: bool = False,
+    ) -> Dict[str, Dict[str, FrogReportProxy]]:
+        """Read reports from JSON, TSVs and Arrow files lazily.
+
+        The archive is not extracted, only the metadata of the reports is read.
+        The other sections are read from the archive on first access (see
+        `FrogReportProxy`).
 
         Returns dictionary of {model_location: ...}
 
+        :param formats: formats of the report copies in order of preference,
+            by default the TSVs are skipped if the JSON of a report exists.
+        :param all_copies: read all copies of the reports, e.g. to compare the
+            JSON with the TSVs.
         """
-        reports: List[FrogReport] = []
-        omex = Omex.from_omex(omex_path)
-        for entry in omex.manifest.entries:
-            if entry.format == EntryFormat.FROG_JSON_V1:
-                report = FrogReport.from_json(path=omex.get_path(entry.location))
-                reports.append(report)
-            elif entry.format == EntryFormat.FROG_METADATA_V1:
-                path = omex.get_path(entry.location).parent
-                report = FrogReport.from_tsv(path)
-                reports.append(report)
+        reports = FrogArchive(omex_path).reports(formats=formats, all_copies=all_copies)
 
         # get model reports per model
-        model_reports: Dict[str, Dict[str, FrogReport]] = {}
+        model_reports: Dict[str, Dict[str, FrogReportProxy]] = {}
         for report in reports:
             model_location = report.metadata.model_location
             d = model_reports.get(model_location, {})
@@ -61,105 +74,302 @@ class FrogComparison:
 
         return model_reports
 
-    # TODO: implement comparison result and return results
+    @staticmethod
+    def fingerprints_equal(
+        reports: Mapping[str, Union[FrogReport, FrogReportProxy]], section: str
+    ) -> bool:
+        """Check if the fingerprints of a table are equal for all reports.
+
+        Equal fingerprints imply that the tables are equal within the tolerances,
+        the tables are not read. False if a report has no fingerprints or the
+        fingerprints are quantized with a step larger than the absolute tolerance,
+        i.e., the tables must be compared.
+
+        :param section: FrogReport field of the table, e.g. 'fva'.
+        """
+        fingerprints = [report.diagnostics.fingerprints for report in reports.values()]
+        if not fingerprints:
+            return False
+        tolerances = set()
+        values = set()
+        for fingerprint in fingerprints:
+            if fingerprint is None:
+                return False
+            tolerances.add(fingerprint.tolerance)
+            values.add(getattr(fingerprint, section))
+        return (
+            len(tolerances) == 1
+            and tolerances.pop() <= FrogComparison.absolute_tolerance
+            and len(values) == 1
+        )
 
     @staticmethod
-    def compare_reports(reports: Dict[str, FrogReport]) -> bool:
+    def compare_reports(
+        reports: Mapping[str, Union[FrogReport, FrogReportProxy]],
+        keys: Optional[Iterable[str]] = None,
+    ) -> "FrogComparisonResult":
         """Compare results against each other.
 
-        Compare all matrices pairwise, i.e., comparison matrix for
+        Compare all reports pairwise, i.e., comparison matrix for
         - objective
         - FVA
         - gene deletions
         - reaction deletions
+
+        The tables are aligned by the objective, reaction or gene ids. The values
+        of all pairs of reports are compared vectorized, every pair once. Rows
+        missing in one of the reports are differences. Tables with equal
+        fingerprints are not compared.
+
+        :param keys: keys of the compared results, e.g. `CuratorConstants.FVA_KEY`,
+            all results if None. Only these sections of report proxies are read.
+        :return: comparison result, true if all reports are equal.
         """
-        console.rule("Comparison of FROGReports", style="white")
+        sections: Dict[str, str] = {
+            CuratorConstants.OBJECTIVE_KEY: "objectives",
+            CuratorConstants.FVA_KEY: "fva",
+            CuratorConstants.REACTIONDELETIONS_KEY: "reaction_deletions",
+            CuratorConstants.GENEDELETIONS_KEY: "gene_deletions",
+        }
+        keys = list(sections) if keys is None else list(keys)
+        for key in keys:
+            if key not in sections:
+                raise ValueError(
+                    f"Unknown comparison key '{key}', supported keys: "
+                    f"{list(sections)}"
+                )
+
+        # tables with equal fingerprints are not compared (and not read)
+        equal_keys: List[str] = [
+            key
+            for key in keys
+            if FrogComparison.fingerprints_equal(reports, section=sections[key])
+        ]
+        compared_keys: List[str] = [key for key in keys if key not in equal_keys]
+        for report in reports.values():
+            if isinstance(report, FrogReportProxy) and compared_keys:
+                # read all compared sections at once
+                report.sections([sections[key] for key in compared_keys])
+
+        result = FrogComparisonResult(report_keys=list(reports))
+        for key in keys:
+            table_cls: Type[FrogTable] = FrogReport.__fields__[sections[key]].type_
+            if key in equal_keys:
+                result.add(
+                    key,
+                    equal=np.ones(shape=(len(reports), len(reports)), dtype=bool),
+                    differences=_empty_differences(table_cls),
+                )
+            else:
+                tables: List[FrogTable] = [
+                    getattr(report, sections[key]) for report in reports.values()
+                ]
+                result.add(key, *FrogComparison._compare_tables(table_cls, tables))
 
-        num_reports = len(reports)
-        all_equal: bool = True
-        # only comparing comparison between two data frames
-
-        data: Dict[str, Dict[str, pd.DataFrame]] = {}
-
-        # DataFrames for report
-        report_keys = list(reports.keys())
-        for report_key, report in reports.items():
-            # all DataFrames for single report
-            frog_dfs: Dict[str, pd.DataFrame] = report.to_dfs()
-            data[report_key] = frog_dfs
-
-        # Perform comparisons between all reports
-        for key in [
-            CuratorConstants.OBJECTIVE_KEY,
-            CuratorConstants.FVA_KEY,
-            CuratorConstants.REACTIONDELETIONS_KEY,
-            CuratorConstants.GENEDELETIONS_KEY,
-        ]:
-            mat_equal = np.zeros(shape=(num_reports, num_reports))
-
-            # do all pairwise comparisons
-            dfs: List[pd.DataFrame] = [
-                data[report_key][key] for report_key in reports.keys()
+        return result
+
+    @staticmethod
+    def _compare_tables(
+        table_cls: Type[FrogTable], tables: List[FrogTable]
+    ) -> Tuple[np.ndarray, pd.DataFrame]:
+        """Compare values of tables pairwise.
+
+        :return: matrix of equal tables and differences of the values.
+        """
+        if not tables:
+            return np.ones(shape=(0, 0), dtype=bool), _empty_differences(table_cls)
+        id_column: str = table_cls._sort_key
+        fields: List[str] = table_cls._infeasible_columns
+        # empty tables have no rows to align
+        dfs: List[pd.DataFrame] = [
+            df if len(df) else pd.DataFrame(columns=[id_column, *fields])
+            for df in (table.to_df() for table in tables)
+        ]
+
+        # align values of all tables by id: (tables, ids, fields), the ids of
+        # tables of the same model are mostly equal and not hashed again
+        ids: pd.Index = pd.Index(dfs[0][id_column].values)
+        aligned: List[bool] = [
+            len(df) == len(ids) and np.array_equal(df[id_column].values, ids.values)
+            for df in dfs
+        ]
+        if not (all(aligned) and ids.is_unique):
+            ids = pd.Index(
+                pd.unique(np.concatenate([df[id_column].values for df in dfs]))
+            ).sort_values()
+            aligned = [False] * len(dfs)
+        values = np.full(shape=(len(dfs), len(ids), len(fields)), fill_value=np.nan)
+        present = np.zeros(shape=(len(dfs), len(ids)), dtype=bool)
+        for k, df in enumerate(dfs):
+            if aligned[k]:
+                values[k] = df[fields].values
+                present[k] = True
+                continue
+            if not df[id_column].is_unique:
+                logger.warning(
+                    f"Duplicate ids in '{id_column}' of table '{k}', last row used."
+                )
+            positions = ids.get_indexer(df[id_column])
+            values[k, positions] = df[fields].values
+            present[k, positions] = True
+
+        # tables with equal values (e.g. of the same solver) are compared once
+        groups: Dict[bytes, int] = {}
+        group = np.array(
+            [
+                groups.setdefault(values[k].tobytes() + present[k].tobytes(), k)
+                for k in range(len(dfs))
             ]
-            for p, df1 in enumerate(dfs):
-                for q, df2 in enumerate(dfs):
-
-                    fields: List[str]
-                    equal = True
-                    if key in [
-                        CuratorConstants.OBJECTIVE_KEY,
-                        CuratorConstants.REACTIONDELETIONS_KEY,
-                        CuratorConstants.GENEDELETIONS_KEY,
-                    ]:
-                        fields = ["value"]
-                    elif key == CuratorConstants.FVA_KEY:
-                        fields = ["flux", "minimum", "maximum"]
-
-                    for field in fields:
-                        if field in df1.columns and field in df2.columns:
-                            equal_field = np.allclose(
-                                df1[field].values,
-                                df2[field].values,
-                                atol=FrogComparison.absolute_tolerance,
-                                rtol=FrogComparison.relative_tolerance,
-                                equal_nan=True,
-                            )
-                            equal = equal and equal_field
-
-                    mat_equal[p, q] = int(equal)
-
-                    if not equal:
-                        logger.warning(
-                            f"difference: '{report_keys[p]}' vs '{report_keys[q]}'"
-                        )
-                        equal_vec = np.isclose(
-                            df1[field].values,
-                            df2[field].values,
-                            atol=FrogComparison.absolute_tolerance,
-                            rtol=FrogComparison.relative_tolerance,
-                            equal_nan=True,
-                        )
-                        df_diff = pd.concat([df1[~equal_vec], df2[~equal_vec]])
-                        if "reaction" in df_diff.columns:
-                            df_diff.sort_values(by=["reaction"], inplace=True)
-                        elif "gene" in df_diff.columns:
-                            df_diff.sort_values(by=["gene"], inplace=True)
-                        console.print(df_diff)
-
-            df_equal = pd.DataFrame(
-                mat_equal, columns=list(report_keys), index=list(report_keys), dtype=int
+        )
+        unique = np.unique(group)
+        equal_unique, unequal_rows = FrogComparison._compare_values(
+            values[unique], present[unique]
+        )
+        position = np.searchsorted(unique, group)
+        equal = equal_unique[np.ix_(position, position)]
+
+        pairs: List[Tuple[int, int]] = list(zip(*np.nonzero(np.triu(~equal))))
+        unequal: List[Tuple[np.ndarray, np.ndarray]] = [
+            unequal_rows[tuple(sorted((position[p], position[q])))] for p, q in pairs
+        ]
+        report1, report2, row, field = (
+            np.concatenate(arrays + [np.empty(0, dtype=int)])
+            for arrays in (
+                [np.full(len(r), p) for (p, _), (r, _) in zip(pairs, unequal)],
+                [np.full(len(r), q) for (_, q), (r, _) in zip(pairs, unequal)],
+                [r for r, _ in unequal],
+                [f for _, f in unequal],
             )
+        )
+        differences = pd.DataFrame(
+            {
+                id_column: ids.values[row],
+                "report1": report1,
+                "report2": report2,
+                "field": np.asarray(fields, dtype=object)[field],
+                "value1": values[report1, row, field],
+                "value2": values[report2, row, field],
+            }
+        )
+
+        return equal, differences
+
+    @staticmethod
+    def _compare_values(
+        values: np.ndarray, present: np.ndarray
+    ) -> Tuple[np.ndarray, Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]]]:
+        """Compare aligned values of tables pairwise.
+
+        Every table is compared with all following tables in a single pass,
+        i.e., the upper triangle of the comparisons. Values are close as for
+        `np.isclose(a, b)` with b of the later table. Infinite values and NaN
+        (infeasible or missing rows) are equal to themselves.
+
+        :param values: values of the tables (tables, ids, fields).
+        :param present: rows of the tables (tables, ids).
+        :return: matrix of equal tables and rows and fields of the unequal values
+            for the pairs of unequal tables.
+        """
+        num_tables = len(values)
+        tolerance = FrogComparison.absolute_tolerance + (
+            FrogComparison.relative_tolerance * np.abs(values)
+        )
+        nan = np.isnan(values)
+        inf = np.isinf(values)
+        (nan_rows,) = np.nonzero(nan.any(axis=(0, 2)))
+        (inf_rows,) = np.nonzero(inf.any(axis=(0, 2)))
+        missing = not present.all()
+
+        equal = np.eye(num_tables, dtype=bool)
+        unequal_rows: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+        delta = np.empty_like(values[1:])
+        close = np.empty(delta.shape, dtype=bool)
+        for p in range(num_tables - 1):
+            n = num_tables - p - 1
+            with np.errstate(invalid="ignore"):
+                np.subtract(values[p], values[p + 1 :], out=delta[:n])
+                np.abs(delta[:n], out=delta[:n])
+                np.less_equal(delta[:n], tolerance[p + 1 :], out=close[:n])
+            close[:n, nan_rows] |= nan[p, nan_rows] & nan[p + 1 :, nan_rows]
+            close[:n, inf_rows] |= inf[p, inf_rows] & (
+                values[p, inf_rows] == values[p + 1 :, inf_rows]
+            )
+            if missing:
+                close[:n] &= (present[p] == present[p + 1 :])[:, :, np.newaxis]
+            equal[p, p + 1 :] = close[:n].all(axis=(1, 2))
+
+            for q in np.nonzero(~equal[p, p + 1 :])[0]:
+                unequal_rows[(p, p + 1 + q)] = np.nonzero(~close[q])
+
+        return equal | equal.T, unequal_rows
+
+
+def _empty_differences(table_cls: Type[FrogTable]) -> pd.DataFrame:
+    """Create differences without rows."""
+    return pd.DataFrame(
+        {
+            table_cls._sort_key: pd.Series(dtype=object),
+            "report1": pd.Series(dtype=int),
+            "report2": pd.Series(dtype=int),
+            "field": pd.Series(dtype=object),
+            "value1": pd.Series(dtype=float),
+            "value2": pd.Series(dtype=float),
+        }
+    )
+
+
+class FrogComparisonResult:
+    """Result of the comparison of FROG reports.
+
+    For every compared key (e.g. `CuratorConstants.FVA_KEY`) the matrix of
+    equal reports and the differences of the values, i.e., the id of the row,
+    the keys of both reports, the field and both values. Values of rows
+    missing in a report are NaN. The result is true if all reports are equal.
+    """
+
+    def __init__(self, report_keys: List[str]):
+        """Create empty result for reports."""
+        self.report_keys: List[str] = report_keys
+        self.equal: Dict[str, pd.DataFrame] = {}
+        self.differences: Dict[str, pd.DataFrame] = {}
+
+    def add(self, key: str, equal: np.ndarray, differences: pd.DataFrame) -> None:
+        """Add result for key.
+
+        :param equal: matrix of equal reports.
+        :param differences: differences with indices of the reports.
+        """
+        self.equal[key] = pd.DataFrame(
+            equal.astype(int), columns=self.report_keys, index=self.report_keys
+        )
+        report_keys = np.asarray(self.report_keys, dtype=object)
+        differences["report1"] = report_keys[differences["report1"].values]
+        differences["report2"] = report_keys[differences["report2"].values]
+        self.differences[key] = differences
+
+    @property
+    def all_equal(self) -> bool:
+        """Check if all reports are equal for all keys."""
+        return all(bool(df.values.all()) for df in self.equal.values())
+
+    def __bool__(self) -> bool:
+        """Get if all reports are equal."""
+        return self.all_equal
+
+    def print(self) -> None:
+        """Print comparison matrices and differences."""
+        console.rule("Comparison of FROGReports", style="white")
+        for key, df_equal in self.equal.items():
+            differences = self.differences[key]
+            if not differences.empty:
+                logger.warning(f"{len(differences)} differences in '{key}'")
+                console.print(differences)
             console.print(f"--- {key} ---")
             console.print(df_equal)
-            all_equal = (
-                all_equal
-                and np.sum(np.sum(df_equal.values)) == num_reports * num_reports
-            )
 
         console.rule(style="white")
-        console.print(f"Equal: {all_equal}")
+        console.print(f"Equal: {self.all_equal}")
         console.rule(style="white")
-        return bool(all_equal)
 
 
 if __name__ == "__main__":
@@ -168,4 +378,4 @@ if __name__ == "__main__":
     model_reports = FrogComparison.read_reports_from_omex(omex_path=omex_path)
     for model_location, reports in model_reports.items():
         print(model_location)
-        FrogComparison.compare_reports(reports)
+        FrogComparison.compare_reports(reports).print()
@@ -5,7 +5,7 @@ Too many issues with package compatibility.
 """
 
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import pandas as pd
 from cameo import __version__ as cameo_version
@@ -14,12 +14,12 @@ from cameo.flux_analysis.analysis import (
     FluxVariabilityResult,
     flux_variability_analysis,
 )
-from cobra.core import Model
-from cobra.io import read_sbml_model
 from pymetadata import log
 from swiglpk import GLP_MAJOR_VERSION, GLP_MINOR_VERSION
 
+from fbc_curation.cache import ModelCache
 from fbc_curation.curator import Curator
+from fbc_curation.curator.deletions import DeletionEngine
 from fbc_curation.frog import (
     Creator,
     CuratorConstants,
@@ -49,16 +49,26 @@ class CuratorCameo(Curator):
     https://pythonhosted.org/cameo/
     """
 
-    def __init__(self, model_path: Path, frog_id: str, curators: List[Creator]):
+    def __init__(
+        self,
+        model_path: Path,
+        frog_id: str,
+        curators: List[Creator],
+        model_cache: Optional[ModelCache] = None,
+        processes: int = 1,
+        prune: bool = True,
+    ):
         """Create instance."""
         Curator.__init__(
-            self, model_path=model_path, frog_id=frog_id, curators=curators
+            self,
+            model_path=model_path,
+            frog_id=frog_id,
+            curators=curators,
+            model_cache=model_cache,
+            processes=processes,
+            prune=prune,
         )
 
-    def read_model(self) -> Model:
-        """Read SBML model."""
-        return read_sbml_model(str(self.model_path), f_replace={})
-
     def set_metadata(self) -> FrogMetaData:
         """Create metadata dictionary."""
         software = Tool(
@@ -73,162 +83,154 @@ class CuratorCameo(Curator):
 
     def objectives(self) -> FrogObjectives:
         """Perform objectives."""
-        model = self.read_model()
-        try:
-            result = fba(model)
-            df = pd.DataFrame(
-                {
-                    "model": self.model_location,
-                    "objective": self.objective_id,
-                    "status": StatusCode.OPTIMAL,
-                    "value": result.objective_value,
-                },
-                index=[0],
-            )
-        except Exception:
-            df = pd.DataFrame(
-                {
-                    "model": self.model_location,
-                    "objective": self.objective_id,
-                    "status": StatusCode.INFEASIBLE,
-                    "value": CuratorConstants.VALUE_INFEASIBLE,
-                },
-                index=[0],
-            )
+        with self.session.pristine() as model:
+            try:
+                result = fba(model)
+                df = pd.DataFrame(
+                    {
+                        "model": self.model_location,
+                        "objective": self.objective_id,
+                        "status": StatusCode.OPTIMAL,
+                        "value": result.objective_value,
+                    },
+                    index=[0],
+                )
+            except Exception:
+                df = pd.DataFrame(
+                    {
+                        "model": self.model_location,
+                        "objective": self.objective_id,
+                        "status": StatusCode.INFEASIBLE,
+                        "value": CuratorConstants.VALUE_INFEASIBLE,
+                    },
+                    index=[0],
+                )
 
         return FrogObjectives.from_df(df)
 
     def fva(self, fraction_of_optimum: float = 1.0) -> FrogFVA:
         """Perform FVA."""
-        model = self.read_model()
-        result = fba(model)
-        objective_value = result.objective_value
-        try:
-            fva_result: FluxVariabilityResult = flux_variability_analysis(
-                model,
-                reactions=model.reactions,
-                fraction_of_optimum=fraction_of_optimum,
-            )
-            df = fva_result.data_frame
-            df_out = pd.DataFrame(
-                {
-                    "model": self.model_location,
-                    "objective": self.objective_id,
-                    "reaction": df.index,
-                    "flux": objective_value * fraction_of_optimum,
-                    "status": StatusCode.OPTIMAL,
-                    "minimum": df.lower_bound,
-                    "maximum": df.upper_bound,
-                    "fraction_optimum": fraction_of_optimum,
-                }
-            )
-        except Exception as e:
-            logger.error(f"{e}")
-            df_out = pd.DataFrame(
-                {
-                    "model": self.model_location,
-                    "objective": self.objective_id,
-                    "reaction": [r.id for r in model.reactions],
-                    "flux": CuratorConstants.VALUE_INFEASIBLE,
-                    "status": StatusCode.INFEASIBLE,
-                    "minimum": CuratorConstants.VALUE_INFEASIBLE,
-                    "maximum": CuratorConstants.VALUE_INFEASIBLE,
-                    "fraction_optimum": 1.0,
-                }
-            )
+        with self.session.pristine() as model:
+            result = fba(model)
+            objective_value = result.objective_value
+            try:
+                fva_result: FluxVariabilityResult = flux_variability_analysis(
+                    model,
+                    reactions=model.reactions,
+                    fraction_of_optimum=fraction_of_optimum,
+                )
+                df = fva_result.data_frame
+                df_out = pd.DataFrame(
+                    {
+                        "model": self.model_location,
+                        "objective": self.objective_id,
+                        "reaction": df.index,
+                        "flux": objective_value * fraction_of_optimum,
+                        "status": StatusCode.OPTIMAL,
+                        "minimum": df.lower_bound,
+                        "maximum": df.upper_bound,
+                        "fraction_optimum": fraction_of_optimum,
+                    }
+                )
+            except Exception as e:
+                logger.error(f"{e}")
+                df_out = pd.DataFrame(
+                    {
+                        "model": self.model_location,
+                        "objective": self.objective_id,
+                        "reaction": [r.id for r in model.reactions],
+                        "flux": CuratorConstants.VALUE_INFEASIBLE,
+                        "status": StatusCode.INFEASIBLE,
+                        "minimum": CuratorConstants.VALUE_INFEASIBLE,
+                        "maximum": CuratorConstants.VALUE_INFEASIBLE,
+                        "fraction_optimum": 1.0,
+                    }
+                )
 
         return FrogFVA.from_df(df_out)
 
-    def gene_deletions(self) -> FrogGeneDeletions:
-        """Perform gene deletions."""
-        model = self.read_model()
-        gene_status = []
-        gene_values = []
-
-        knockout_reactions = self._knockout_reactions_for_genes(self.model_path)
-
-        for gene in model.genes:
-            reaction_bounds = dict()
-            # knockout all reactions affected by gene by setting bounds zero
-            for rid in knockout_reactions[gene.id]:
-                reaction = model.reactions.get_by_id(rid)
-                reaction_bounds[reaction.id] = (
-                    reaction.lower_bound,
-                    reaction.upper_bound,
+    def gene_deletions(
+        self,
+        objectives: Optional[FrogObjectives] = None,
+        reaction_deletions: Optional[FrogReactionDeletions] = None,
+        gene_ids: Optional[List[str]] = None,
+    ) -> FrogGeneDeletions:
+        """Perform gene deletions.
+
+        Every distinct set of knocked out reactions is solved once in a
+        warm-started sweep.
+        """
+        with self.session.pristine() as model:
+            if gene_ids is None:
+                gene_ids = [gene.id for gene in model.genes]
+            with DeletionEngine(model) as engine:
+                results = self._memoized_gene_deletions(
+                    gene_ids,
+                    solve=engine.sweep,
+                    objectives=objectives,
+                    reaction_deletions=reaction_deletions,
                 )
-                reaction.bounds = (0, 0)
-            try:
-                # run fba
-                result = fba(model)
-                value = result.objective_value
-                status = StatusCode.OPTIMAL
-            except Exception:
-                value = CuratorConstants.VALUE_INFEASIBLE
-                status = StatusCode.INFEASIBLE
-            gene_status.append(status)
-            gene_values.append(value)
 
-            # restore bounds
-            for rid, bounds in reaction_bounds.items():
-                model.reactions.get_by_id(rid).bounds = bounds[:]
+            if model.genes:
+                df = pd.DataFrame(
+                    {
+                        "model": self.model_location,
+                        "objective": self.objective_id,
+                        "gene": gene_ids,
+                        "status": [results[gid].status for gid in gene_ids],
+                        "value": [results[gid].value for gid in gene_ids],
+                    }
+                )
+            else:
+                logger.error("no genes in model")
+                df = pd.DataFrame(
+                    columns=[
+                        "model",
+                        "objective",
+                        "gene",
+                        "status",
+                        "value",
+                    ]
+                )
+
+        return FrogGeneDeletions.from_df(df)
+
+    def reaction_deletions(
+        self, fva: Optional[FrogFVA] = None, reaction_ids: Optional[List[str]] = None
+    ) -> FrogReactionDeletions:
+        """Perform reaction deletions.
+
+        Reactions which cannot change the optimum are pruned, the remaining
+        reactions are knocked out in a warm-started sweep.
+        """
+        with self.session.pristine() as model:
+            if reaction_ids is None:
+                reaction_ids = [r.id for r in model.reactions]
+            wildtype_value, pruned = self._prune_reaction_deletions(
+                model, fva, reaction_ids
+            )
+            with DeletionEngine(model) as engine:
+                results = engine.sweep(
+                    (rid, [rid]) for rid in reaction_ids if rid not in pruned
+                )
+            self._set_statistics(
+                CuratorConstants.REACTIONDELETIONS_KEY,
+                lp_count=len(results),
+                knockout_count=len(reaction_ids),
+                iterations={rid: r.iterations for rid, r in results.items()},
+                pruned=pruned,
+            )
+            for rid in pruned:
+                results[rid] = self._knockout_result(StatusCode.OPTIMAL, wildtype_value)
 
-        if model.genes:
             df = pd.DataFrame(
                 {
                     "model": self.model_location,
                     "objective": self.objective_id,
-                    "gene": [gene.id for gene in model.genes],
-                    "status": gene_status,
-                    "value": gene_values,
+                    "reaction": reaction_ids,
+                    "status": [results[rid].status for rid in reaction_ids],
+                    "value": [results[rid].value for rid in reaction_ids],
                 }
             )
-        else:
-            logger.error("no genes in model")
-            df = pd.DataFrame(
-                columns=[
-                    "model",
-                    "objective",
-                    "gene",
-                    "status",
-                    "value",
-                ]
-            )
-
-        return FrogGeneDeletions.from_df(df)
-
-    def reaction_deletions(self) -> FrogReactionDeletions:
-        """Perform reaction deletions."""
-        model = self.read_model()
-        reaction_status = []
-        reaction_values = []
-
-        for reaction in model.reactions:
-            reaction_bounds = (reaction.lower_bound, reaction.upper_bound)
-            reaction.bounds = (0, 0)
-
-            # run fba
-            try:
-                result = fba(model)
-                value = result.objective_value
-                status = StatusCode.OPTIMAL
-            except Exception:
-                value = CuratorConstants.VALUE_INFEASIBLE
-                status = StatusCode.INFEASIBLE
-
-            reaction_status.append(status)
-            reaction_values.append(value)
-
-            # restore bounds
-            reaction.bounds = reaction_bounds[:]
-
-        df = pd.DataFrame(
-            {
-                "model": self.model_location,
-                "objective": self.objective_id,
-                "reaction": [r.id for r in model.reactions],
-                "status": reaction_status,
-                "value": reaction_values,
-            }
-        )
 
         return FrogReactionDeletions.from_df(df)
@@ -1,9 +1,9 @@
 """Provide cobrapy fbc curator."""
 
+import multiprocessing
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import cobra
 import pandas as pd
 from cobra import __version__ as cobra_version
 from cobra.core import Model
@@ -13,11 +13,16 @@ from cobra.flux_analysis import (
     single_gene_deletion,
     single_reaction_deletion,
 )
-from cobra.io import read_sbml_model
 from pymetadata import log
 from swiglpk import GLP_MAJOR_VERSION, GLP_MINOR_VERSION
 
+from fbc_curation.cache import ModelCache
 from fbc_curation.curator import Curator
+from fbc_curation.curator.deletions import (
+    DeletionEngine,
+    KnockoutResult,
+    reset_basis,
+)
 from fbc_curation.frog import (
     Creator,
     CuratorConstants,
@@ -31,25 +36,143 @@ from fbc_curation.frog import (
 )
 
 
-# use a single core
-configuration = cobra.Configuration()
-configuration.processes = 1
-
 logger = log.get_logger(__name__)
 
+# model of the worker process (set via initializer)
+_worker_model: Optional[Model] = None
+
+
+def _init_worker(model: Optional[Model]) -> None:
+    """Initialize worker with model."""
+    global _worker_model
+    _worker_model = model
+
+
+def _reset_worker_model() -> Model:
+    """Get worker model with solver in a reproducible state.
+
+    GLPK warm starts from the basis of the previous solve, so results depend on
+    the solve history. Every chunk starts from the standard basis, which makes the
+    results independent of the assignment of chunks to processes.
+    """
+    model: Model = _worker_model  # type: ignore
+    reset_basis(model)
+    model.slim_optimize()
+    return model
+
+
+def _fva_worker(task: Tuple[List[str], float]) -> pd.DataFrame:
+    """Run FVA for chunk of reactions."""
+    reaction_ids, fraction_of_optimum = task
+    model = _reset_worker_model()
+    return flux_variability_analysis(
+        model, reaction_ids, fraction_of_optimum=fraction_of_optimum, processes=1
+    )
+
+
+def _deletion_worker(task: Tuple[List[str], str]) -> pd.DataFrame:
+    """Run single deletions for chunk of genes or reactions.
+
+    Results are ordered like the ids.
+    """
+    ids, entity = task
+    model = _reset_worker_model()
+    deletion = single_gene_deletion if entity == "gene" else single_reaction_deletion
+    df = deletion(model, ids, processes=1)
+    df.index = [set(ids).pop() for ids in df.ids]
+    df = df.loc[ids, ["growth", "status"]]
+    df["iterations"] = None
+    return df
+
+
+def _knockout_worker(task: Tuple[List[Tuple[str, List[str]]]]) -> pd.DataFrame:
+    """Run warm-started knockouts for chunk of (id, reaction_ids).
+
+    Results are ordered like the knockouts.
+    """
+    (knockouts,) = task
+    model = _reset_worker_model()
+    with DeletionEngine(model) as engine:
+        results = engine.sweep(knockouts)
+    return pd.DataFrame(
+        {
+            "growth": [r.value for r in results.values()],
+            "status": [r.status for r in results.values()],
+            "iterations": [r.iterations for r in results.values()],
+        },
+        index=list(results.keys()),
+    )
+
 
 class CuratorCobrapy(Curator):
-    """FBC curator based on cobrapy."""
+    """FBC curator based on cobrapy.
+
+    FVA and deletions are calculated in chunks of fixed size which are distributed
+    over `processes` processes. Results do not depend on the number of processes.
+
+    With `warm_start` the deletions are solved with the `DeletionEngine` from the
+    wild-type optimal basis instead of the cobrapy deletion functions.
+    """
+
+    chunk_size: int = 128
+
+    def __init__(
+        self,
+        model_path: Path,
+        frog_id: str,
+        curators: List[Creator],
+        model_cache: Optional[ModelCache] = None,
+        processes: int = 1,
+        prune: bool = True,
+        warm_start: bool = False,
+    ):
+        """Create instance.
 
-    def __init__(self, model_path: Path, frog_id: str, curators: List[Creator]):
-        """Create instance."""
+        :param warm_start: solve deletions warm-started from the wild-type basis.
+        """
         Curator.__init__(
-            self, model_path=model_path, frog_id=frog_id, curators=curators
+            self,
+            model_path=model_path,
+            frog_id=frog_id,
+            curators=curators,
+            model_cache=model_cache,
+            processes=processes,
+            prune=prune,
         )
+        self.warm_start: bool = warm_start
+
+    def _map_chunks(
+        self, model: Model, worker: Callable, ids: List[str], *args: Any
+    ) -> List[Any]:
+        """Map worker over chunks of ids.
+
+        The results are returned in the order of the chunks.
+        """
+        tasks = [
+            (ids[k : k + self.chunk_size], *args)
+            for k in range(0, len(ids), self.chunk_size)
+        ]
+        processes = min(self.processes, len(tasks))
+        if processes > 1 and multiprocessing.current_process().daemon:
+            logger.warning(
+                "Daemonic processes cannot create processes, running in single process."
+            )
+            processes = 1
 
-    def read_model(self) -> Model:
-        """Read the model."""
-        return read_sbml_model(str(self.model_path), f_replace={})
+        if processes > 1:
+            context = multiprocessing.get_context(
+                "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+            )
+            with context.Pool(
+                processes, initializer=_init_worker, initargs=(model,)
+            ) as pool:
+                return pool.map(worker, tasks, chunksize=1)
+
+        _init_worker(model)
+        try:
+            return [worker(task) for task in tasks]
+        finally:
+            _init_worker(None)
 
     def set_metadata(self) -> FrogMetaData:
         """Create metadata dictionary."""
@@ -70,28 +193,28 @@ class CuratorCobrapy(Curator):
 
         see https://cobrapy.readthedocs.io/en/latest/simulating.html
         """
-        model = self.read_model()
-        try:
-            solution = model.optimize()
-            df = pd.DataFrame(
-                {
-                    "model": self.model_location,
-                    "objective": self.objective_id,
-                    "status": StatusCode.OPTIMAL,
-                    "value": solution.objective_value,
-                },
-                index=[0],
-            )
-        except Exception:
-            df = pd.DataFrame(
-                {
-                    "model": self.model_location,
-                    "objective": self.objective_id,
-                    "status": StatusCode.INFEASIBLE,
-                    "value": CuratorConstants.VALUE_INFEASIBLE,
-                },
-                index=[0],
-            )
+        with self.session.pristine() as model:
+            try:
+                solution = model.optimize()
+                df = pd.DataFrame(
+                    {
+                        "model": self.model_location,
+                        "objective": self.objective_id,
+                        "status": StatusCode.OPTIMAL,
+                        "value": solution.objective_value,
+                    },
+                    index=[0],
+                )
+            except Exception:
+                df = pd.DataFrame(
+                    {
+                        "model": self.model_location,
+                        "objective": self.objective_id,
+                        "status": StatusCode.INFEASIBLE,
+                        "value": CuratorConstants.VALUE_INFEASIBLE,
+                    },
+                    index=[0],
+                )
         return FrogObjectives.from_df(df)
 
     def fva(self, fraction_of_optimum: float = 1.0) -> FrogFVA:
@@ -100,96 +223,156 @@ class CuratorCobrapy(Curator):
         Runs flux variability analysis.
         see https://cobrapy.readthedocs.io/en/latest/simulating.html#Running-FVA
         """
-        model = self.read_model()
-        solution = model.optimize()
-        objective_value = solution.objective_value
-        try:
-            df = flux_variability_analysis(
-                model, model.reactions, fraction_of_optimum=fraction_of_optimum
-            )
-            df_out = pd.DataFrame(
-                {
-                    "model": self.model_location,
-                    "objective": self.objective_id,
-                    "reaction": df.index,
-                    "flux": objective_value * fraction_of_optimum,
-                    "status": StatusCode.OPTIMAL,
-                    "minimum": df.minimum,
-                    "maximum": df.maximum,
-                    "fraction_optimum": fraction_of_optimum,
-                }
-            )
-        except OptimizationError as e:
-            logger.error(f"{e}")
-            df_out = pd.DataFrame(
-                {
-                    "model": self.model_location,
-                    "objective": self.objective_id,
-                    "reaction": [r.id for r in model.reactions],
-                    "flux": CuratorConstants.VALUE_INFEASIBLE,
-                    "status": StatusCode.INFEASIBLE,
-                    "minimum": CuratorConstants.VALUE_INFEASIBLE,
-                    "maximum": CuratorConstants.VALUE_INFEASIBLE,
-                    "fraction_optimum": 1.0,
-                }
-            )
+        with self.session.pristine() as model:
+            solution = model.optimize()
+            objective_value = solution.objective_value
+            try:
+                df = pd.concat(
+                    self._map_chunks(
+                        model,
+                        _fva_worker,
+                        [r.id for r in model.reactions],
+                        fraction_of_optimum,
+                    )
+                )
+                df_out = pd.DataFrame(
+                    {
+                        "model": self.model_location,
+                        "objective": self.objective_id,
+                        "reaction": df.index,
+                        "flux": objective_value * fraction_of_optimum,
+                        "status": StatusCode.OPTIMAL,
+                        "minimum": df.minimum,
+                        "maximum": df.maximum,
+                        "fraction_optimum": fraction_of_optimum,
+                    }
+                )
+            except OptimizationError as e:
+                logger.error(f"{e}")
+                df_out = pd.DataFrame(
+                    {
+                        "model": self.model_location,
+                        "objective": self.objective_id,
+                        "reaction": [r.id for r in model.reactions],
+                        "flux": CuratorConstants.VALUE_INFEASIBLE,
+                        "status": StatusCode.INFEASIBLE,
+                        "minimum": CuratorConstants.VALUE_INFEASIBLE,
+                        "maximum": CuratorConstants.VALUE_INFEASIBLE,
+                        "fraction_optimum": 1.0,
+                    }
+                )
         return FrogFVA.from_df(df_out)
 
-    def gene_deletions(self) -> FrogGeneDeletions:
+    def gene_deletions(
+        self,
+        objectives: Optional[FrogObjectives] = None,
+        reaction_deletions: Optional[FrogReactionDeletions] = None,
+        gene_ids: Optional[List[str]] = None,
+    ) -> FrogGeneDeletions:
         """Create pd.DataFrame with results of gene deletion.
 
+        Every distinct set of knocked out reactions is solved once.
         https://cobrapy.readthedocs.io/en/latest/deletions.html
         :return: pandas.DataFrame
         """
-        model = self.read_model()
-        df = single_gene_deletion(model, model.genes)
-        df = pd.DataFrame(
-            {
-                "model": self.model_location,
-                "objective": self.objective_id,
-                "gene": [set(ids).pop() for ids in df.ids],
-                "status": df.status,
-                "value": df.growth,
-            }
-        )
-        df.loc[
-            df.status == StatusCode.INFEASIBLE, "value"
-        ] = CuratorConstants.VALUE_INFEASIBLE
-
-        if not model.genes:
-            logger.error("no genes in model")
+        with self.session.pristine() as model:
+            if gene_ids is None:
+                gene_ids = [g.id for g in model.genes]
+            results = self._memoized_gene_deletions(
+                gene_ids,
+                solve=lambda knockouts: self._knockouts(model, knockouts, "gene"),
+                objectives=objectives,
+                reaction_deletions=reaction_deletions,
+            )
             df = pd.DataFrame(
-                columns=[
-                    "model",
-                    "objective",
-                    "gene",
-                    "status",
-                    "value",
-                ]
+                {
+                    "model": self.model_location,
+                    "objective": self.objective_id,
+                    "gene": gene_ids,
+                    "status": [results[gid].status for gid in gene_ids],
+                    "value": [results[gid].value for gid in gene_ids],
+                }
             )
 
+            if not model.genes:
+                logger.error("no genes in model")
+                df = pd.DataFrame(
+                    columns=[
+                        "model",
+                        "objective",
+                        "gene",
+                        "status",
+                        "value",
+                    ]
+                )
+
         return FrogGeneDeletions.from_df(df)
 
-    def reaction_deletions(self) -> FrogReactionDeletions:
+    def reaction_deletions(
+        self, fva: Optional[FrogFVA] = None, reaction_ids: Optional[List[str]] = None
+    ) -> FrogReactionDeletions:
         """Create pd.DataFrame with results of reaction deletion.
 
+        Reactions which cannot change the optimum are pruned.
         https://cobrapy.readthedocs.io/en/latest/deletions.html
         :return: pandas.
         """
-        model = self.read_model()
-        df = single_reaction_deletion(model, model.reactions)
-
-        df = pd.DataFrame(
-            {
-                "model": self.model_location,
-                "objective": self.objective_id,
-                "reaction": [set(ids).pop() for ids in df.ids],
-                "status": df.status,
-                "value": df.growth,
-            }
-        )
-        df.loc[
-            df.status == StatusCode.INFEASIBLE, "value"
-        ] = CuratorConstants.VALUE_INFEASIBLE
+        with self.session.pristine() as model:
+            if reaction_ids is None:
+                reaction_ids = [r.id for r in model.reactions]
+            wildtype_value, pruned = self._prune_reaction_deletions(
+                model, fva, reaction_ids
+            )
+            results = self._knockouts(
+                model,
+                [(rid, [rid]) for rid in reaction_ids if rid not in pruned],
+                entity="reaction",
+            )
+            self._set_statistics(
+                CuratorConstants.REACTIONDELETIONS_KEY,
+                lp_count=len(results),
+                knockout_count=len(reaction_ids),
+                iterations={rid: r.iterations for rid, r in results.items()},
+                pruned=pruned,
+            )
+            for rid in pruned:
+                results[rid] = self._knockout_result(StatusCode.OPTIMAL, wildtype_value)
+
+            df = pd.DataFrame(
+                {
+                    "model": self.model_location,
+                    "objective": self.objective_id,
+                    "reaction": reaction_ids,
+                    "status": [results[rid].status for rid in reaction_ids],
+                    "value": [results[rid].value for rid in reaction_ids],
+                }
+            )
 
         return FrogReactionDeletions.from_df(df)
+
+    def _knockouts(
+        self, model: Model, knockouts: List[Tuple[str, List[str]]], entity: str
+    ) -> Dict[str, KnockoutResult]:
+        """Solve knockouts of genes or reactions given as (id, reaction_ids).
+
+        With `warm_start` the knocked out reactions are solved with the
+        `DeletionEngine`, otherwise the gene or reaction is deleted with cobrapy.
+
+        :return: results by id in order of the knockouts.
+        """
+        if not knockouts:
+            return {}
+        if self.warm_start:
+            df = pd.concat(self._map_chunks(model, _knockout_worker, knockouts))
+        else:
+            ids = [k for k, _ in knockouts]
+            df = pd.concat(self._map_chunks(model, _deletion_worker, ids, entity))
+
+        results: Dict[str, KnockoutResult] = {}
+        for k, status, value, iterations in zip(
+            df.index, df.status, df.growth, df.iterations
+        ):
+            results[k] = self._knockout_result(status, value)._replace(
+                iterations=iterations
+            )
+        return results
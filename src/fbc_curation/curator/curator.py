@@ -1,52 +1,78 @@
 """Base class for all FBC curators."""
 import os
 import platform
-from collections import defaultdict, namedtuple
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 import cobra
-import libsbml
-from cobra.io import read_sbml_model
+import numpy as np
+from cobra.core import Model
 from pymetadata import log
 from pymetadata.console import console
 
 from fbc_curation import __citation__, __software__, __version__
+from fbc_curation.cache import ModelCache
+from fbc_curation.curator.deletions import KnockoutResult, reset_basis
+from fbc_curation.curator.gene_index import GeneReactionIndex
+from fbc_curation.curator.session import ModelSession
 from fbc_curation.frog import (
     Creator,
+    CuratorConstants,
     FrogFVA,
     FrogGeneDeletions,
     FrogMetaData,
     FrogObjectives,
     FrogReactionDeletions,
     FrogReport,
+    FrogStageStatistics,
+    PruningReason,
+    StatusCode,
     Tool,
 )
 
 
-ObjectiveInformation = namedtuple(
-    "ObjectiveInformation", "active_objective objective_ids"
-)
-
 logger = log.get_logger(__name__)
 
 
 class Curator:
     """Base class of all Curator implementations."""
 
-    def __init__(self, model_path: Path, frog_id: str, curators: List[Creator]):
-        """Create instance."""
+    def __init__(
+        self,
+        model_path: Path,
+        frog_id: str,
+        curators: List[Creator],
+        model_cache: Optional[ModelCache] = None,
+        processes: int = 1,
+        prune: bool = True,
+    ):
+        """Create instance.
+
+        :param model_cache: optional cache of parsed models, on a cache hit SBML
+            parsing is skipped.
+        :param processes: number of processes for FVA and deletions (if supported
+            by the curator); results are independent of the number of processes.
+        :param prune: fill in reaction deletions which provably do not change the
+            optimum without solving an LP (see `_prune_reaction_deletions`).
+        """
         if not model_path.exists():
             raise ValueError(f"model_path does not exist: '{model_path}'")
+        if processes < 1:
+            raise ValueError(f"processes must be >= 1: '{processes}'")
 
         self.frog_id: str = frog_id
         self.curators = curators
         self.model_path: Path = model_path
         self.model_location: str = f"./{self.model_path.name}"
-        active_objective, objective_ids = Curator._read_objective_information(
-            model_path
+        self.session: ModelSession = ModelSession(
+            model_path=model_path, model_cache=model_cache
         )
-        self.objective_id = active_objective
+        self.objective_id = self.session.objective_information.active_objective
+        self.processes: int = processes
+        self.prune: bool = prune
+        self.statistics: Dict[str, FrogStageStatistics] = {}
+        self._gene_index: Optional[GeneReactionIndex] = None
 
     def __str__(self) -> str:
         """Create string representation."""
@@ -54,12 +80,18 @@ class Curator:
             f"--- {self.__class__.__name__} ---",
             f"\tmodel_path: {self.model_path}",
             f"\tobjective_id: {self.objective_id}",
+            f"\tprocesses: {self.processes}",
+            f"\tprune: {self.prune}",
         ]
         return "\n".join(lines)
 
-    def read_model(self) -> None:
-        """Read the model."""
-        raise NotImplementedError
+    def read_model(self) -> Model:
+        """Get the model of the curator session.
+
+        The model is parsed once and shared between all stages, changes must
+        be done within a model context (see `ModelSession.pristine`).
+        """
+        return self.session.model
 
     def metadata(self, software: Tool, solver: Tool) -> FrogMetaData:
         """Create metadata."""
@@ -92,12 +124,30 @@ class Curator:
         """Perform FVA."""
         raise NotImplementedError
 
-    def gene_deletions(self) -> FrogGeneDeletions:
-        """Perform gene deletions."""
+    def gene_deletions(
+        self,
+        objectives: Optional[FrogObjectives] = None,
+        reaction_deletions: Optional[FrogReactionDeletions] = None,
+        gene_ids: Optional[List[str]] = None,
+    ) -> FrogGeneDeletions:
+        """Perform gene deletions.
+
+        :param objectives: objective results reused for genes without effect.
+        :param reaction_deletions: reaction deletion results reused for genes
+            knocking out a single reaction.
+        :param gene_ids: genes to knock out (e.g. a shard), all genes if None.
+        """
         raise NotImplementedError
 
-    def reaction_deletions(self) -> FrogReactionDeletions:
-        """Perform reaction deletions."""
+    def reaction_deletions(
+        self, fva: Optional[FrogFVA] = None, reaction_ids: Optional[List[str]] = None
+    ) -> FrogReactionDeletions:
+        """Perform reaction deletions.
+
+        :param fva: FVA results of the model used for pruning.
+        :param reaction_ids: reactions to knock out (e.g. a shard), all reactions
+            if None.
+        """
         raise NotImplementedError
 
     def run(self) -> FrogReport:
@@ -114,77 +164,212 @@ class Curator:
         fva = self.fva()
 
         logger.info("* reactiondeletions")
-        reaction_deletions = self.reaction_deletions()
+        reaction_deletions = self.reaction_deletions(fva=fva)
 
         logger.info("* genedeletions")
-        gene_deletions = self.gene_deletions()
+        gene_deletions = self.gene_deletions(
+            objectives=objectives, reaction_deletions=reaction_deletions
+        )
 
-        return FrogReport(
+        report = FrogReport(
             metadata=metadata,
             objectives=objectives,
             fva=fva,
             gene_deletions=gene_deletions,
             reaction_deletions=reaction_deletions,
         )
+        report.set_statistics(self.statistics)
+        return report
+
+    @property
+    def gene_index(self) -> GeneReactionIndex:
+        """Get index of genes to reactions of the model.
+
+        The index is created once per curator and shared between the stages.
+        """
+        if self._gene_index is None:
+            self._gene_index = GeneReactionIndex(self.read_model())
+        return self._gene_index
 
-    @staticmethod
     def _knockout_reactions_for_genes(
-        model_path: Path, genes: Optional[List[str]] = None
+        self, genes: Optional[List[cobra.core.Gene]] = None
     ) -> Dict[str, List[str]]:
         """Calculate mapping of genes to affected reactions.
 
         Which reactions are knocked out by a given gene.
         A single gene knockout can affect multiple reactions.
-        Uses GPR mappings.
+        Uses GPR mappings via the `gene_index`.
         """
-        model: cobra.core.Model = read_sbml_model(str(model_path), f_replace={})
         if genes is None:
-            genes = model.genes
-
-        knockout_reactions = defaultdict(list)
-        for reaction in model.reactions:  # type: cobra.core.Reaction
-            gpr = reaction.gene_reaction_rule
-            tree, gpr_genes = cobra.core.gene.parse_gpr(gpr)
-            gene: cobra.core.Gene
-            for gene in genes:
-                if gene.id not in gpr_genes:
-                    gene_essential = False
-                else:
-                    # eval_gpr: True if the gene reaction rule is true with
-                    # the given knockouts otherwise false
-                    gene_essential = not cobra.core.gene.eval_gpr(
-                        tree, knockouts={gene.id}
-                    )
-                if gene_essential:
-                    knockout_reactions[gene.id].append(reaction.id)
+            genes = self.read_model().genes
 
+        knockout_reactions: Dict[str, List[str]] = defaultdict(list)
+        knockout_reactions.update(self.gene_index.knockouts(g.id for g in genes))
         return knockout_reactions
 
+    def _prune_reaction_deletions(
+        self,
+        model: Model,
+        fva: Optional[FrogFVA] = None,
+        reaction_ids: Optional[List[str]] = None,
+    ) -> Tuple[Optional[float], Dict[str, PruningReason]]:
+        """Find reaction deletions which cannot change the optimum.
+
+        A knockout keeps the wild-type objective value if an optimal solution
+        with zero flux through the reaction exists. This is the case if the
+        reaction has zero flux in the wild-type optimal solution, or if the FVA
+        range at fraction_of_optimum=1.0 contains zero.
+
+        :param model: model in the state of the reaction deletions.
+        :param fva: FVA results of the model.
+        :param reaction_ids: reactions to prune, all reactions if None.
+        :return: wild-type objective value and reasons by pruned reaction id in
+            order of the reactions.
+        """
+        pruned: Dict[str, PruningReason] = {}
+        if not self.prune:
+            return None, pruned
+
+        reset_basis(model)
+        solution = model.optimize()
+        if solution.status != "optimal":
+            return None, pruned
+        primals = model.solver.primal_values
+        for reaction in model.reactions:
+            if primals[reaction.id] == 0.0 and primals[reaction.reverse_id] == 0.0:
+                pruned[reaction.id] = PruningReason.ZERO_FLUX
+
+        if fva is not None:
+            df = fva.df
+            zero_in_range = (
+                (df.status == StatusCode.OPTIMAL.value)
+                & (df.fraction_optimum == 1.0)
+                & (df.minimum <= 0.0)
+                & (df.maximum >= 0.0)
+            )
+            for rid in df.reaction[zero_in_range]:
+                if rid not in pruned:
+                    pruned[rid] = PruningReason.FVA_RANGE
+
+        if reaction_ids is None:
+            reaction_ids = [r.id for r in model.reactions]
+        pruned = {rid: pruned[rid] for rid in reaction_ids if rid in pruned}
+        return solution.objective_value, pruned
+
+    def _memoized_gene_deletions(
+        self,
+        gene_ids: List[str],
+        solve: Callable[[List[Tuple[str, List[str]]]], Dict[str, KnockoutResult]],
+        objectives: Optional[FrogObjectives] = None,
+        reaction_deletions: Optional[FrogReactionDeletions] = None,
+    ) -> Dict[str, KnockoutResult]:
+        """Run gene deletions solving every distinct knockout set once.
+
+        Genes are grouped by the set of reactions they knock out. Genes without
+        knocked out reactions get the wild-type objective, genes knocking out a
+        single reaction the result of the reaction deletion. For all other sets
+        a single representative gene is solved. The statistics of the stage are
+        stored.
+
+        :param gene_ids: genes to knock out.
+        :param solve: function solving knockouts given as (gene_id, reaction_ids),
+            returns the results by gene id.
+        :param objectives: objective results with the wild-type objective.
+        :param reaction_deletions: results of the reaction deletions.
+        :return: results by gene id in order of gene_ids.
+        """
+        # only the GPRs of the knocked out genes are evaluated (e.g. of a shard)
+        model = self.read_model()
+        knockout_reactions = self._knockout_reactions_for_genes(
+            [model.genes.get_by_id(gid) for gid in gene_ids]
+        )
+        groups: Dict[Tuple[str, ...], List[str]] = defaultdict(list)
+        for gid in gene_ids:
+            groups[tuple(sorted(knockout_reactions[gid]))].append(gid)
+
+        reaction_results: Dict[str, KnockoutResult] = {}
+        if reaction_deletions is not None:
+            df = reaction_deletions.df
+            for rid, status, value in zip(df.reaction, df.status, df.value):
+                reaction_results[rid] = self._knockout_result(status, value)
+
+        knockouts: List[Tuple[str, List[str]]] = []
+        group_results: Dict[Tuple[str, ...], KnockoutResult] = {}
+        for reaction_ids, genes in groups.items():
+            if not reaction_ids:
+                group_results[reaction_ids] = self._wildtype_result(objectives)
+            elif len(reaction_ids) == 1 and reaction_ids[0] in reaction_results:
+                group_results[reaction_ids] = reaction_results[reaction_ids[0]]
+            else:
+                knockouts.append((genes[0], knockout_reactions[genes[0]]))
+
+        solved = solve(knockouts) if knockouts else {}
+        for reaction_ids, genes in groups.items():
+            if reaction_ids not in group_results:
+                group_results[reaction_ids] = solved[genes[0]]
+
+        self._set_statistics(
+            CuratorConstants.GENEDELETIONS_KEY,
+            lp_count=len(knockouts),
+            knockout_count=len(gene_ids),
+            iterations={gid: r.iterations for gid, r in solved.items()},
+        )
+        results: Dict[str, KnockoutResult] = {}
+        for gid in gene_ids:
+            result = group_results[tuple(sorted(knockout_reactions[gid]))]
+            # iterations are only reported for solved knockouts
+            results[gid] = result if gid in solved else result._replace(iterations=None)
+        return results
+
+    def _wildtype_result(
+        self, objectives: Optional[FrogObjectives] = None
+    ) -> KnockoutResult:
+        """Get wild-type result from objectives or by solving the model."""
+        if objectives is not None:
+            df = objectives.df
+            for objective, status, value in zip(df.objective, df.status, df.value):
+                if objective == self.objective_id:
+                    return self._knockout_result(status, value)
+
+        with self.session.pristine() as model:
+            reset_basis(model)
+            solution = model.optimize()
+            return self._knockout_result(solution.status, solution.objective_value)
+
     @staticmethod
-    def _read_objective_information(model_path: Path) -> ObjectiveInformation:
-        """Read objective information from SBML file structure."""
-        # read objective information from sbml (multiple objectives)
-        doc = libsbml.SBMLDocument = libsbml.readSBMLFromFile(str(model_path))
-        model: libsbml.Model = doc.getModel()
-        fbc_model: libsbml.FbcModelPlugin = model.getPlugin("fbc")
-        if fbc_model is None:
-            # model is an old SBML model without fbc information (use cobra default)
-            # problems with the automatic up-conversions
-            active_objective = "obj"
-            objective_ids = ["obj"]
-        else:
-            active_objective = fbc_model.getActiveObjective().getId()
-            objective_ids = []
-            objective: libsbml.Objective
-            for objective in fbc_model.getListOfObjectives():
-                objective_ids.append(objective.getId())
-
-        if len(objective_ids) > 1:
-            logger.warning(
-                f"Multiple objectives exist in SBML-fbc ({objective_ids}), "
-                f"only active objective '{active_objective}' results "
-                f"are reported"
+    def _knockout_result(status: str, value: Optional[float]) -> KnockoutResult:
+        """Create result of a knockout without solving."""
+        if status == StatusCode.OPTIMAL and value is not None and not np.isnan(value):
+            return KnockoutResult(
+                status=StatusCode.OPTIMAL, value=value, iterations=None
             )
-        return ObjectiveInformation(
-            active_objective=active_objective, objective_ids=objective_ids
+        return KnockoutResult(
+            status=StatusCode.INFEASIBLE,
+            value=CuratorConstants.VALUE_INFEASIBLE,
+            iterations=None,
+        )
+
+    def _set_statistics(
+        self,
+        stage_key: str,
+        lp_count: int,
+        knockout_count: Optional[int] = None,
+        iterations: Optional[Dict[str, Optional[int]]] = None,
+        pruned: Optional[Dict[str, PruningReason]] = None,
+    ) -> None:
+        """Store solver statistics of a stage for the diagnostics of the report.
+
+        :param stage_key: key of the stage, e.g. 'reaction_deletion'.
+        :param lp_count: number of LPs solved in the stage.
+        :param knockout_count: number of knocked out reactions or genes.
+        :param iterations: simplex iterations by knockout id (if reported by solver).
+        :param pruned: knockouts filled in without solving with reason.
+        """
+        if iterations is not None:
+            iterations = {k: v for k, v in iterations.items() if v is not None}
+        self.statistics[stage_key] = FrogStageStatistics(
+            lp_count=lp_count,
+            knockout_count=knockout_count,
+            iterations=iterations if iterations else None,
+            pruned=pruned if pruned else None,
         )
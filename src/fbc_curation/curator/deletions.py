@@ -0,0 +1,184 @@
+"""Warm-started deletion sweeps.
+
+The deletion engine keeps a single LP alive during a sweep over knockouts.
+The wild-type problem is solved once, afterwards every knockout only changes
+the bounds of the affected flux variables and is re-solved from the wild-type
+optimal basis. For GLPK the dual simplex is used, which is the method of choice
+for bound changes on an optimal basis. Every knockout starts from the same basis
+and a fresh factorization, so results do not depend on the order of knockouts.
+"""
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from cobra.core import Model
+from cobra.util.solver import interface_to_str
+from optlang.interface import OPTIMAL
+from pymetadata import log
+from swiglpk import (
+    GLP_DUALP,
+    GLP_OPT,
+    glp_bf_exists,
+    glp_factorize,
+    glp_get_col_stat,
+    glp_get_it_cnt,
+    glp_get_num_cols,
+    glp_get_num_rows,
+    glp_get_obj_val,
+    glp_get_row_stat,
+    glp_get_status,
+    glp_set_col_stat,
+    glp_set_row_stat,
+    glp_simplex,
+    glp_std_basis,
+)
+
+from fbc_curation.frog import CuratorConstants, StatusCode
+
+
+logger = log.get_logger(__name__)
+
+KnockoutResult = namedtuple("KnockoutResult", "status value iterations")
+
+
+def reset_basis(model: Model) -> None:
+    """Reset the solver to the standard basis.
+
+    GLPK warm starts from the basis of the previous solve, so results depend on
+    the solve history. Solving from the standard basis is reproducible.
+    """
+    if interface_to_str(model.problem.__name__) == "glpk":
+        glp_std_basis(model.solver.problem)
+
+
+class DeletionEngine:
+    """Engine for warm-started knockout sweeps on a single LP.
+
+    Use as context manager on a model, the solver configuration and all bounds
+    are restored on exit:
+
+        with DeletionEngine(model) as engine:
+            result = engine.knockout(["PGI"])
+    """
+
+    def __init__(self, model: Model):
+        """Create engine for model."""
+        self.model: Model = model
+        self.is_glpk: bool = interface_to_str(model.problem.__name__) == "glpk"
+        self.wildtype: Optional[KnockoutResult] = None
+        self._basis: Optional[Tuple[List[int], List[int]]] = None
+        self._meth: Optional[int] = None
+
+    def __enter__(self) -> "DeletionEngine":
+        """Solve the wild type and store the optimal basis."""
+        self.wildtype = self._solve()
+        if self.is_glpk:
+            problem = self.model.solver.problem
+            self._basis = (
+                [glp_get_row_stat(problem, k) for k in self._rows()],
+                [glp_get_col_stat(problem, k) for k in self._cols()],
+            )
+            smcp = self.model.solver.configuration._smcp
+            self._meth = smcp.meth
+            smcp.meth = GLP_DUALP
+        return self
+
+    def __exit__(self, *args) -> None:  # type: ignore
+        """Restore wild-type basis and solver configuration."""
+        if self.is_glpk and self._meth is not None:
+            self._restore_basis()
+            self.model.solver.configuration._smcp.meth = self._meth
+
+    def _rows(self) -> range:
+        """Get GLPK row indices."""
+        return range(1, glp_get_num_rows(self.model.solver.problem) + 1)
+
+    def _cols(self) -> range:
+        """Get GLPK column indices."""
+        return range(1, glp_get_num_cols(self.model.solver.problem) + 1)
+
+    def _restore_basis(self) -> None:
+        """Restore the wild-type optimal basis.
+
+        GLPK corrects the status of non-basic variables whose bounds changed. A
+        still valid factorization stems from previous pivots and is recomputed.
+        """
+        problem = self.model.solver.problem
+        row_stats, col_stats = self._basis  # type: ignore
+        for k, stat in enumerate(row_stats, start=1):
+            glp_set_row_stat(problem, k, stat)
+        for k, stat in enumerate(col_stats, start=1):
+            glp_set_col_stat(problem, k, stat)
+        if glp_bf_exists(problem):
+            glp_factorize(problem)
+
+    def _solve(self) -> KnockoutResult:
+        """Solve the current LP."""
+        iterations: Optional[int] = None
+        value: float = CuratorConstants.VALUE_INFEASIBLE
+        optimal: bool
+        if self.is_glpk and self.wildtype is not None:
+            # simplex on the already scaled problem, fallback to optlang
+            problem = self.model.solver.problem
+            it_start = glp_get_it_cnt(problem)
+            if glp_simplex(problem, self.model.solver.configuration._smcp) == 0:
+                optimal = glp_get_status(problem) == GLP_OPT
+                if optimal:
+                    value = glp_get_obj_val(problem)
+            else:
+                optimal = self.model.solver.optimize() == OPTIMAL
+                if optimal:
+                    value = self.model.solver.objective.value
+            iterations = glp_get_it_cnt(problem) - it_start
+        else:
+            it_start = glp_get_it_cnt(self.model.solver.problem) if self.is_glpk else 0
+            optimal = self.model.solver.optimize() == OPTIMAL
+            if optimal:
+                value = self.model.solver.objective.value
+            if self.is_glpk:
+                iterations = glp_get_it_cnt(self.model.solver.problem) - it_start
+
+        if optimal:
+            return KnockoutResult(
+                status=StatusCode.OPTIMAL,
+                value=value,
+                iterations=iterations,
+            )
+        return KnockoutResult(
+            status=StatusCode.INFEASIBLE,
+            value=CuratorConstants.VALUE_INFEASIBLE,
+            iterations=iterations,
+        )
+
+    def knockout(self, reaction_ids: Sequence[str]) -> KnockoutResult:
+        """Knock out the reactions and solve from the wild-type basis.
+
+        An empty knockout returns the wild-type result without solving.
+        """
+        if self.wildtype is None:
+            raise RuntimeError("DeletionEngine must be used as context manager.")
+        if not reaction_ids:
+            return self.wildtype._replace(iterations=0)
+
+        variables = []
+        for rid in reaction_ids:
+            reaction = self.model.reactions.get_by_id(rid)
+            variables.extend([reaction.forward_variable, reaction.reverse_variable])
+        bounds = [(v.lb, v.ub) for v in variables]
+        try:
+            for v in variables:
+                v.set_bounds(0, 0)
+            if self.is_glpk:
+                self._restore_basis()
+            return self._solve()
+        finally:
+            for v, (lb, ub) in zip(variables, bounds):
+                v.set_bounds(lb, ub)
+
+    def sweep(
+        self, knockouts: Iterable[Tuple[str, Sequence[str]]]
+    ) -> Dict[str, KnockoutResult]:
+        """Run knockouts given as (key, reaction_ids).
+
+        :return: results by key in order of the knockouts.
+        """
+        return {key: self.knockout(reaction_ids) for key, reaction_ids in knockouts}
@@ -0,0 +1,65 @@
+"""Inverted index of genes and the reactions they knock out.
+
+A gene can only knock out reactions whose GPR contains the gene. The index maps
+every gene to these reactions, so every GPR is evaluated only for its own genes
+instead of for all genes of the model.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from cobra.core import Model
+from cobra.core.gene import GPR
+
+
+class GeneReactionIndex:
+    """Index of genes to the reactions with the gene in the GPR.
+
+    Knocked out reactions are evaluated lazily per gene and cached. Reactions are
+    in the order of the model reactions.
+    """
+
+    def __init__(self, model: Model):
+        """Create index for the reactions of the model."""
+        self.gprs: Dict[str, GPR] = {}
+        self.reactions_for_gene: Dict[str, List[str]] = defaultdict(list)
+        for reaction in model.reactions:
+            gpr: GPR = reaction.gpr
+            self.gprs[reaction.id] = gpr
+            for gene_id in gpr.genes:
+                self.reactions_for_gene[gene_id].append(reaction.id)
+
+        self._knockouts: Dict[str, List[str]] = {}
+
+    def knockout_reactions(self, gene_id: str) -> List[str]:
+        """Get reactions which are knocked out by the gene.
+
+        A reaction is knocked out if its GPR evaluates to False with the gene
+        knocked out.
+        """
+        reaction_ids = self._knockouts.get(gene_id)
+        if reaction_ids is None:
+            knockouts = {gene_id}
+            reaction_ids = [
+                rid
+                for rid in self.reactions_for_gene.get(gene_id, [])
+                if not self.gprs[rid].eval(knockouts=knockouts)
+            ]
+            self._knockouts[gene_id] = reaction_ids
+        return reaction_ids
+
+    def knockouts(
+        self, gene_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, List[str]]:
+        """Get knocked out reactions for genes.
+
+        :param gene_ids: genes, all genes in a GPR if None.
+        :return: knocked out reactions by gene id for genes with knockouts.
+        """
+        if gene_ids is None:
+            gene_ids = self.reactions_for_gene.keys()
+        knockouts: Dict[str, List[str]] = {}
+        for gene_id in gene_ids:
+            reaction_ids = self.knockout_reactions(gene_id)
+            if reaction_ids:
+                knockouts[gene_id] = reaction_ids
+        return knockouts
@@ -0,0 +1,129 @@
+"""Model session shared by all stages of a curator run.
+
+The SBML file is parsed a single time. All FROG stages (objectives, FVA,
+reaction deletions, gene deletions) work on the same cobra model, changes to
+the model are done within the model context, i.e., are reverted after every
+stage.
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import libsbml
+from cobra.core import Model
+from cobra.io.sbml import CobraSBMLError, _get_doc_from_filename, _sbml_to_model
+from pymetadata import log
+
+from fbc_curation.cache import ModelCache
+from fbc_curation.frog import FrogMetaData
+
+
+ObjectiveInformation = namedtuple(
+    "ObjectiveInformation", "active_objective objective_ids"
+)
+
+logger = log.get_logger(__name__)
+
+
+def read_objective_information(doc: libsbml.SBMLDocument) -> ObjectiveInformation:
+    """Read objective information from SBML document."""
+    # read objective information from sbml (multiple objectives)
+    model: libsbml.Model = doc.getModel()
+    fbc_model: libsbml.FbcModelPlugin = model.getPlugin("fbc")
+    if fbc_model is None:
+        # model is an old SBML model without fbc information (use cobra default)
+        # problems with the automatic up-conversions
+        active_objective = "obj"
+        objective_ids = ["obj"]
+    else:
+        active_objective = fbc_model.getActiveObjective().getId()
+        objective_ids = []
+        objective: libsbml.Objective
+        for objective in fbc_model.getListOfObjectives():
+            objective_ids.append(objective.getId())
+
+    if len(objective_ids) > 1:
+        logger.warning(
+            f"Multiple objectives exist in SBML-fbc ({objective_ids}), "
+            f"only active objective '{active_objective}' results "
+            f"are reported"
+        )
+    return ObjectiveInformation(
+        active_objective=active_objective, objective_ids=objective_ids
+    )
+
+
+class ModelSession:
+    """Parsed model shared between the stages of a curator run.
+
+    The SBML is read lazily on first access and parsed exactly once. The
+    objective information, the cobra model and the GPR trees are all created
+    from this single parse. If a model cache is provided, the parsed model is
+    loaded from the cache and parsing is skipped.
+    """
+
+    def __init__(self, model_path: Path, model_cache: Optional[ModelCache] = None):
+        """Create session for the SBML model at `model_path`."""
+        self.model_path: Path = model_path
+        self.model_cache: Optional[ModelCache] = model_cache
+        self._model: Optional[Model] = None
+        self._objective_information: Optional[ObjectiveInformation] = None
+
+    def _parse(self) -> None:
+        """Parse SBML file into objective information and cobra model."""
+        md5: Optional[str] = None
+        if self.model_cache is not None:
+            md5 = FrogMetaData.md5_for_path(self.model_path)
+            cached = self.model_cache.get(md5)
+            if cached is not None:
+                self._model, self._objective_information = cached
+                return
+
+        logger.debug(f"Parse SBML: '{self.model_path}'")
+        doc: libsbml.SBMLDocument = _get_doc_from_filename(str(self.model_path))
+        # objective information must be read before the cobra conversion,
+        # which can convert the document in place (fbc-v1)
+        self._objective_information = read_objective_information(doc)
+        try:
+            self._model = _sbml_to_model(doc, f_replace={})
+        except Exception as original_error:
+            raise CobraSBMLError(
+                f"Something went wrong reading the SBML model: '{self.model_path}'"
+            ) from original_error
+
+        if self.model_cache is not None and md5 is not None:
+            self.model_cache.put(
+                md5,
+                model=self._model,
+                objective_information=self._objective_information,
+            )
+
+    @property
+    def model(self) -> Model:
+        """Get the parsed cobra model.
+
+        Changes to the model must be done within `pristine` to not leak between
+        stages.
+        """
+        if self._model is None:
+            self._parse()
+        return self._model  # type: ignore
+
+    @property
+    def objective_information(self) -> ObjectiveInformation:
+        """Get objective information of the model."""
+        if self._objective_information is None:
+            self._parse()
+        return self._objective_information  # type: ignore
+
+    @contextmanager
+    def pristine(self) -> Iterator[Model]:
+        """Provide the model within a model context.
+
+        All bound and objective changes done in the context are reverted on exit.
+        """
+        model = self.model
+        with model:
+            yield model
@@ -0,0 +1,50 @@
+"""Sharding of deletion sweeps.
+
+For large models the reaction and gene deletions are split into shards of
+contiguous ranges of the IDs in model order which can be computed on separate workers or processes.
+The partial results are merged with `FrogReactionDeletions.merge` and
+`FrogGeneDeletions.merge`.
+"""
+import math
+from typing import List, Optional
+
+
+# minimal number of knockouts in a shard, smaller sweeps are not split
+MIN_SHARD_SIZE: int = 500
+
+# maximal number of shards of a sweep
+MAX_SHARDS: int = 16
+
+
+def shard_size(
+    n_ids: int, min_size: int = MIN_SHARD_SIZE, max_shards: int = MAX_SHARDS
+) -> int:
+    """Get shard size adapted to the number of knockouts.
+
+    Sweeps up to `min_size` knockouts are a single shard. Larger sweeps are split
+    in up to `max_shards` shards of at least `min_size` knockouts.
+    """
+    if min_size < 1 or max_shards < 1:
+        raise ValueError(
+            f"min_size and max_shards must be >= 1: '{min_size}', '{max_shards}'"
+        )
+    return max(min_size, math.ceil(n_ids / max_shards))
+
+
+def shard_ids(ids: List[str], size: Optional[int] = None) -> List[List[str]]:
+    """Split ids in shards of contiguous ID ranges.
+
+    The order of the ids is kept, so that the merged shards have the order of
+    the unsharded deletions.
+
+    :param ids: ids of the knockouts in model order.
+    :param size: shard size, adapted to the number of ids if None.
+    :return: shards of ids, a single empty shard for no ids.
+    """
+    if not ids:
+        return [[]]
+    if size is None:
+        size = shard_size(len(ids))
+    if size < 1:
+        raise ValueError(f"Shard size must be >= 1: '{size}'")
+    return [ids[k : k + size] for k in range(0, len(ids), size)]
@@ -0,0 +1,86 @@
+"""Digests of model files.
+
+The MD5 of the SBML file content identifies a model, e.g. in the FROG metadata
+and the model cache. Files are hashed in chunks, so large SBML files are never
+read into memory completely. Digests are memoized by path, modification time
+and size, i.e., the curators and stages of a task hash a model file once. Files
+hashed while they are written (e.g. streamed uploads) are memoized with
+`memoize_md5`. The memo is cleared at the end of a task with `clear_digests`.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Tuple, Union
+
+from pymetadata import log
+
+
+logger = log.get_logger(__name__)
+
+# bytes read from the file per update of the hash
+MD5_CHUNK_SIZE: int = 1024**2
+
+# maximal number of memoized digests, least recently used are dropped first
+MD5_MEMO_SIZE: int = 128
+
+_memo: "OrderedDict[Tuple[str, int, int, int], str]" = OrderedDict()
+_memo_lock = Lock()
+
+
+def md5_for_file(path: Union[Path, str], chunk_size: int = MD5_CHUNK_SIZE) -> str:
+    """Calculate MD5 of file content in chunks of `chunk_size` bytes."""
+    md5 = hashlib.md5()
+    with open(path, "rb") as f_check:
+        for chunk in iter(lambda: f_check.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def md5_for_path(path: Union[Path, str]) -> str:
+    """Get MD5 of file content, memoized by path, modification time and size.
+
+    A changed file gets a new key, so a memoized digest is never stale.
+    """
+    key = _memo_key(path)
+    with _memo_lock:
+        md5 = _memo.get(key)
+        if md5 is not None:
+            _memo.move_to_end(key)
+            return md5
+
+    logger.debug(f"MD5: '{path}'")
+    md5 = md5_for_file(path)
+    _memoize(key, md5)
+    return md5
+
+
+def memoize_md5(path: Union[Path, str], md5: str) -> None:
+    """Memoize MD5 of the content of a written file.
+
+    The file must not change after the MD5 was calculated, e.g. the MD5 is
+    updated with every chunk written to the file.
+    """
+    _memoize(_memo_key(path), md5)
+
+
+def _memo_key(path: Union[Path, str]) -> Tuple[str, int, int, int]:
+    """Get memo key of file."""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _memoize(key: Tuple[str, int, int, int], md5: str) -> None:
+    """Memoize MD5, least recently used digests are dropped."""
+    with _memo_lock:
+        _memo[key] = md5
+        _memo.move_to_end(key)
+        while len(_memo) > MD5_MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+def clear_digests() -> None:
+    """Clear memoized digests, e.g. at the end of a task."""
+    with _memo_lock:
+        _memo.clear()
@@ -0,0 +1,328 @@
+"""Progress events of FROG tasks.
+
+The sub-tasks of a FROG task publish an event per finished stage (metadata,
+objectives, FVA, reaction and gene deletions of a curator and SBML entry) with
+the number of finished and total stages, and a final completion event with the
+task status. Clients receive the events pushed as they are published (see the
+`/api/task/events/{task_id}` endpoint) instead of polling the task result.
+
+With a Redis broker events are published via Redis pub/sub to all API
+processes, the counts and the last event of a task are kept in a hash for
+clients subscribing late. Without Redis (e.g. eager execution in tests) events
+are delivered to subscribers in the same process.
+"""
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+import redis
+import redis.asyncio
+from pymetadata import log
+
+
+logger = log.get_logger(__name__)
+
+# prefix of progress hashes and event channels in Redis
+EVENTS_PREFIX: str = "frog:events:"
+
+# event types
+PROGRESS_EVENT: str = "progress"
+COMPLETE_EVENT: str = "complete"
+
+
+class EventSubscription:
+    """Subscription to the events of a task."""
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Get next event, None if no event was published within timeout."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Close subscription."""
+
+
+class TaskEvents:
+    """Progress events of tasks."""
+
+    def __init__(self, ttl: int):
+        """Create events.
+
+        :param ttl: time to live in seconds of the progress of a task.
+        """
+        self.ttl: int = ttl
+
+    def start(self, task_id: str, total: int) -> Dict[str, Any]:
+        """Publish start of task with total number of stages."""
+        return self._start(
+            task_id, {"task_id": task_id, "event": PROGRESS_EVENT, "total": total}
+        )
+
+    def stage_done(self, task_id: str, **info: Any) -> Dict[str, Any]:
+        """Publish finished stage of task, the number of done stages is counted.
+
+        :param info: information on the stage, e.g. location, curator and stage.
+        """
+        return self._stage_done(
+            task_id, {"task_id": task_id, "event": PROGRESS_EVENT, **info}
+        )
+
+    def complete(self, task_id: str, task_status: str, **info: Any) -> Dict[str, Any]:
+        """Publish completion of task with final status, e.g. 'SUCCESS'."""
+        return self._complete(
+            task_id,
+            {
+                "task_id": task_id,
+                "event": COMPLETE_EVENT,
+                "task_status": task_status,
+                **info,
+            },
+        )
+
+    def last(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get last event of task, None if no event was published."""
+        raise NotImplementedError
+
+    async def subscribe(self, task_id: str) -> EventSubscription:
+        """Subscribe to the events of task."""
+        raise NotImplementedError
+
+    def _start(self, task_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Reset progress and publish start event."""
+        raise NotImplementedError
+
+    def _stage_done(self, task_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Count done stage and publish event with counts."""
+        raise NotImplementedError
+
+    def _complete(self, task_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Publish completion event with counts."""
+        raise NotImplementedError
+
+
+class _LocalSubscription(EventSubscription):
+    """Subscription to local events."""
+
+    def __init__(self, events: "LocalTaskEvents", task_id: str):
+        """Subscribe queue in the running event loop."""
+        self.events = events
+        self.task_id: str = task_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Get next event, None if no event was published within timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        """Close subscription."""
+        self.events._unsubscribe(self)
+
+
+class LocalTaskEvents(TaskEvents):
+    """Progress events of tasks in this process.
+
+    Events are published from any thread (e.g. tasks executed in a thread pool)
+    to the subscribers in their event loop.
+    """
+
+    def __init__(self, ttl: int):
+        """Create events."""
+        super().__init__(ttl=ttl)
+        self._lock = threading.Lock()
+        self._progress: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+        self._subscriptions: Dict[str, List[_LocalSubscription]] = {}
+
+    def last(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get last event of task, None if no event was published."""
+        with self._lock:
+            progress = self._progress.get(task_id)
+        return progress[2] if progress else None
+
+    async def subscribe(self, task_id: str) -> EventSubscription:
+        """Subscribe to the events of task."""
+        subscription = _LocalSubscription(self, task_id)
+        with self._lock:
+            self._subscriptions.setdefault(task_id, []).append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: _LocalSubscription) -> None:
+        """Remove subscription."""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.task_id, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.task_id, None)
+
+    def _start(self, task_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Reset progress and publish start event."""
+        event = {**event, "done": 0}
+        return self._publish(task_id, event, done=0, total=event["total"])
+
+    def _stage_done(self, task_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Count done stage and publish event with counts."""
+        with self._lock:
+            done, total, _ = self._progress.get(task_id, (0, 0, {}))
+            event = {**event, "done": done + 1, "total": total}
+            self._progress[task_id] = (done + 1, total, event)
+        return self._publish(task_id, event)
+
+    def _complete(self, task_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Publish completion event with counts."""
+        with self._lock:
+            done, total, _ = self._progress.get(task_id, (0, 0, {}))
+        event = {**event, "done": done, "total": total}
+        return self._publish(task_id, event, done=done, total=total)
+
+    def _publish(
+        self,
+        task_id: str,
+        event: Dict[str, Any],
+        done: Optional[int] = None,
+        total: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Publish event to the subscribers of the task.
+
+        :param done: set number of done stages.
+        :param total: set total number of stages.
+        """
+        with self._lock:
+            if done is not None and total is not None:
+                self._progress[task_id] = (done, total, event)
+            subscriptions = list(self._subscriptions.get(task_id, []))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.queue.put_nowait, event
+                )
+            except RuntimeError:
+                # event loop of subscriber is closed
+                self._unsubscribe(subscription)
+        return event
+
+
+class _RedisSubscription(EventSubscription):
+    """Subscription to events via Redis pub/sub."""
+
+    def __init__(self, client: "redis.asyncio.Redis", channel: str):
+        """Create subscription, subscribed with `subscribe`."""
+        self.client = client
+        self.channel: str = channel
+        self.pubsub = client.pubsub()
+
+    async def subscribe(self) -> None:
+        """Subscribe to channel."""
+        await self.pubsub.subscribe(self.channel)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Get next event, None if no event was published within timeout."""
+        message = await self.pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        if message is None:
+            return None
+        event: Dict[str, Any] = orjson.loads(message["data"])
+        return event
+
+    async def close(self) -> None:
+        """Unsubscribe and close connections."""
+        await self.pubsub.reset()
+        await self.client.connection_pool.disconnect()
+
+
+class RedisTaskEvents(TaskEvents):
+    """Progress events of tasks via Redis shared between processes.
+
+    Counts and the last event of a task are stored in the hash
+    'frog:events:{task_id}', events are published to the channel with the same
+    name.
+    """
+
+    # count done stage, store and publish event (atomic for concurrent stages)
+    _stage_done_script: str = """
+        local done = redis.call('hincrby', KEYS[1], 'done', 1)
+        local total = tonumber(redis.call('hget', KEYS[1], 'total') or '0')
+        local event = cjson.decode(ARGV[1])
+        event['done'] = done
+        event['total'] = total
+        local data = cjson.encode(event)
+        redis.call('hset', KEYS[1], 'last', data)
+        redis.call('expire', KEYS[1], ARGV[2])
+        redis.call('publish', KEYS[1], data)
+        return data
+    """
+
+    # add counts, store and publish event, counts are reset with ARGV[3]
+    _publish_script: str = """
+        if ARGV[3] ~= '' then
+            redis.call('hset', KEYS[1], 'done', 0, 'total', ARGV[3])
+        end
+        local event = cjson.decode(ARGV[1])
+        event['done'] = tonumber(redis.call('hget', KEYS[1], 'done') or '0')
+        event['total'] = tonumber(redis.call('hget', KEYS[1], 'total') or '0')
+        local data = cjson.encode(event)
+        redis.call('hset', KEYS[1], 'last', data)
+        redis.call('expire', KEYS[1], ARGV[2])
+        redis.call('publish', KEYS[1], data)
+        return data
+    """
+
+    def __init__(self, url: str, ttl: int):
+        """Create events for Redis at url."""
+        super().__init__(ttl=ttl)
+        self.url: str = url
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def last(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get last event of task, None if no event was published."""
+        data: Optional[str] = self.client.hget(f"{EVENTS_PREFIX}{task_id}", "last")
+        return orjson.loads(data) if data else None
+
+    async def subscribe(self, task_id: str) -> EventSubscription:
+        """Subscribe to the events of task."""
+        subscription = _RedisSubscription(
+            client=redis.asyncio.Redis.from_url(self.url, decode_responses=True),
+            channel=f"{EVENTS_PREFIX}{task_id}",
+        )
+        await subscription.subscribe()
+        return subscription
+
+    def _start(self, task_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Reset progress and publish start event."""
+        return self._eval(self._publish_script, task_id, event, str(event.pop("total")))
+
+    def _stage_done(self, task_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Count done stage and publish event with counts."""
+        return self._eval(self._stage_done_script, task_id, event)
+
+    def _complete(self, task_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Publish completion event with counts."""
+        return self._eval(self._publish_script, task_id, event, "")
+
+    def _eval(self, script: str, task_id: str, *args: Any) -> Dict[str, Any]:
+        """Evaluate script for task with event as first argument."""
+        event, *other = args
+        data = self.client.eval(
+            script,
+            1,
+            f"{EVENTS_PREFIX}{task_id}",
+            orjson.dumps(event),
+            self.ttl,
+            *other,
+        )
+        result: Dict[str, Any] = orjson.loads(data)
+        return result
+
+
+def task_events(url: Optional[str], ttl: int) -> TaskEvents:
+    """Get events via Redis at url or local events.
+
+    :param url: broker url, events are local if not a Redis url.
+    """
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisTaskEvents(url=url, ttl=ttl)
+    return LocalTaskEvents(ttl=ttl)
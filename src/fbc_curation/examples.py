@@ -44,11 +44,14 @@ def run_examples() -> None:
         run_example(model_filename)
 
 
-def run_example(filename: str) -> Path:
-    """Run single example helper function."""
+def run_example(filename: str, output_dir: Path = EXAMPLE_DIR / "frogs") -> Path:
+    """Run single example helper function.
+
+    :param output_dir: directory of the omex with the FROG reports.
+    """
 
     model_path = EXAMPLE_DIR / "models" / filename
-    omex_path = EXAMPLE_DIR / "frogs" / f"{filename.split('.')[0]}_FROG.omex"
+    omex_path = output_dir / f"{filename.split('.')[0]}_FROG.omex"
 
     run_frog(
         source_path=model_path,
@@ -56,7 +59,7 @@ def run_example(filename: str) -> Path:
     )
     model_reports = FrogComparison.read_reports_from_omex(omex_path=omex_path)
     for _, reports in model_reports.items():
-        FrogComparison.compare_reports(reports=reports)
+        FrogComparison.compare_reports(reports=reports).print()
 
     return omex_path
 
@@ -0,0 +1,326 @@
+"""Streaming of uploads and URL downloads into the storage.
+
+Models are streamed in chunks into files in the storage shared with the task
+queue, i.e., uploads and downloads are never held in memory completely. The MD5
+of the content is calculated on the fly and memoized for the file (see
+`digest.memoize_md5`). Streams exceeding the maximal size are aborted and the
+partial file is removed. File uploads as multipart/form-data are parsed
+incrementally, only the content of the file field is streamed into the file.
+
+URLs are fetched with an async HTTP client with connection pooling, timeouts and
+a maximal size. Downloads are cached for a short time by URL and ETag: a repeated
+fetch of the URL is a conditional request, the cached file is reused if the
+content did not change (304 Not Modified).
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import httpx
+from pymetadata import log
+from starlette.concurrency import run_in_threadpool
+
+from fbc_curation.digest import memoize_md5
+
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    from multipart.multipart import (  # type: ignore
+        MultipartParser,
+        parse_options_header,
+    )
+
+
+logger = log.get_logger(__name__)
+
+# bytes per chunk of uploads and downloads
+CHUNK_SIZE: int = 1024**2
+
+
+class SizeLimitError(ValueError):
+    """Stream exceeds the maximal size."""
+
+
+async def stream_to_file(
+    chunks: AsyncIterator[bytes], directory: Union[Path, str], max_size: int
+) -> Tuple[str, str]:
+    """Stream chunks into a new file in directory.
+
+    raises SizeLimitError if the stream exceeds `max_size` bytes, the file is
+    removed.
+
+    :return: path of the persistent temporary file and MD5 of the content.
+    """
+    fd, path = tempfile.mkstemp(dir=directory)
+    md5 = hashlib.md5()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f_out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_size:
+                    raise SizeLimitError(f"Exceeds maximal size of {max_size} bytes.")
+                md5.update(chunk)
+                await run_in_threadpool(f_out.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    memoize_md5(path, md5.hexdigest())
+    return path, md5.hexdigest()
+
+
+class _MultipartField:
+    """Incremental parser of a field of a multipart/form-data body.
+
+    Only the first part of the field is read, other parts are discarded.
+    """
+
+    def __init__(self, boundary: bytes, field: str):
+        """Create parser for field of body with boundary."""
+        self.field: bytes = field.encode()
+        self.found: bool = False
+        self.complete: bool = False
+        self._in_field: bool = False
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._headers: Dict[bytes, bytes] = {}
+        self._data: List[bytes] = []
+        self.parser = MultipartParser(
+            boundary,
+            callbacks={
+                "on_part_begin": self._on_part_begin,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+            },
+        )
+
+    def write(self, chunk: bytes) -> List[bytes]:
+        """Parse chunk of the body and get the content of the field in it."""
+        self.parser.write(chunk)
+        data, self._data = self._data, []
+        return data
+
+    def _on_part_begin(self) -> None:
+        """Reset headers of the part."""
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        """Add data of header name."""
+        self._header_field.extend(data[start:end])
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        """Add data of header value."""
+        self._header_value.extend(data[start:end])
+
+    def _on_header_end(self) -> None:
+        """Store header of the part."""
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self) -> None:
+        """Check if the part is the field by its content disposition."""
+        _, options = parse_options_header(
+            self._headers.get(b"content-disposition", b"")
+        )
+        self._in_field = not self.found and options.get(b"name") == self.field
+        self.found = self.found or self._in_field
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        """Collect data of the field."""
+        if self._in_field:
+            self._data.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        """Mark field as complete."""
+        if self._in_field:
+            self.complete = True
+            self._in_field = False
+
+
+async def multipart_file_chunks(
+    chunks: AsyncIterator[bytes], content_type: str, field: str, max_size: int
+) -> AsyncIterator[bytes]:
+    """Stream the content of a file field of a multipart/form-data body.
+
+    The body is parsed incrementally as the chunks arrive, the body is never
+    held in memory completely.
+
+    raises SizeLimitError if the body exceeds `max_size` bytes, ValueError if the
+    body is invalid or the field is missing.
+
+    :param chunks: chunks of the body, e.g. `Request.stream()`.
+    :param content_type: content type header with the boundary of the body.
+    """
+    mime_type, options = parse_options_header(content_type)
+    boundary: Optional[bytes] = options.get(b"boundary")
+    if mime_type != b"multipart/form-data" or not boundary:
+        raise ValueError(f"Expected multipart/form-data, got '{content_type}'.")
+
+    multipart_field = _MultipartField(boundary, field=field)
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_size:
+            raise SizeLimitError(f"Exceeds maximal size of {max_size} bytes.")
+        for data in multipart_field.write(chunk):
+            yield data
+    multipart_field.parser.finalize()
+    if not multipart_field.complete:
+        raise ValueError(f"Missing or incomplete field '{field}' in form data.")
+
+
+class _CachedDownload(NamedTuple):
+    """Download of a URL in the cache."""
+
+    etag: str
+    path: str
+    md5: str
+    expires: float
+
+
+class UrlFetcher:
+    """Fetch URLs into files in the storage."""
+
+    def __init__(
+        self,
+        storage_dir: Union[Path, str],
+        max_size: int,
+        timeout: float = 30.0,
+        cache_ttl: float = 300.0,
+        cache_size: int = 32,
+        max_connections: int = 20,
+    ):
+        """Create fetcher.
+
+        :param storage_dir: directory of the fetched files.
+        :param max_size: maximal size of a download in bytes.
+        :param timeout: timeout in seconds for connecting, reading and writing.
+        :param cache_ttl: time in seconds a download is cached by URL and ETag.
+        :param cache_size: maximal number of cached downloads.
+        :param max_connections: maximal number of pooled connections.
+        """
+        self.storage_dir: Path = Path(storage_dir)
+        self.max_size: int = max_size
+        self.timeout: float = timeout
+        self.cache_ttl: float = cache_ttl
+        self.cache_size: int = cache_size
+        self.max_connections: int = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: "OrderedDict[str, _CachedDownload]" = OrderedDict()
+        self._cache_dir: Path = self.storage_dir / "url_cache"
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get HTTP client, connections are pooled between fetches."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close pooled connections and remove cached downloads."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        for url in list(self._cache):
+            self._evict(url)
+
+    async def fetch(self, url: str) -> str:
+        """Fetch URL into a new file in the storage.
+
+        raises httpx.HTTPError (e.g. timeout, error status), SizeLimitError
+
+        :return: path of the persistent temporary file.
+        """
+        self._expire()
+        cached = self._cache.get(url)
+        headers: Dict[str, str] = {"If-None-Match": cached.etag} if cached else {}
+        async with self.client.stream("GET", url, headers=headers) as response:
+            not_modified = bool(cached) and (
+                response.status_code == httpx.codes.NOT_MODIFIED
+            )
+            if not not_modified:
+                response.raise_for_status()
+                content_length = response.headers.get("content-length")
+                if content_length and int(content_length) > self.max_size:
+                    raise SizeLimitError(
+                        f"Exceeds maximal size of {self.max_size} bytes: '{url}'"
+                    )
+                path, md5 = await stream_to_file(
+                    response.aiter_bytes(CHUNK_SIZE),
+                    directory=self.storage_dir,
+                    max_size=self.max_size,
+                )
+
+        if cached and not_modified:
+            logger.info(f"Not modified, cached download: '{url}'")
+            try:
+                return await run_in_threadpool(self._copy_cached, cached)
+            except FileNotFoundError:
+                # evicted by a concurrent fetch
+                self._evict(url)
+                return await self.fetch(url)
+
+        etag = response.headers.get("etag")
+        if etag and self.cache_ttl > 0:
+            cache_path = await run_in_threadpool(self._copy_to_cache, path)
+            self._evict(url)
+            self._cache[url] = _CachedDownload(
+                etag=etag,
+                path=cache_path,
+                md5=md5,
+                expires=time.monotonic() + self.cache_ttl,
+            )
+            while len(self._cache) > self.cache_size:
+                self._evict(next(iter(self._cache)))
+        return path
+
+    def _copy_to_cache(self, path: str) -> str:
+        """Copy download into a new file in the cache directory."""
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, cache_path = tempfile.mkstemp(dir=self._cache_dir)
+        os.close(fd)
+        shutil.copyfile(path, cache_path)
+        return cache_path
+
+    def _copy_cached(self, cached: _CachedDownload) -> str:
+        """Copy cached download into a new file in the storage."""
+        fd, path = tempfile.mkstemp(dir=self.storage_dir)
+        os.close(fd)
+        try:
+            shutil.copyfile(cached.path, path)
+        except BaseException:
+            os.remove(path)
+            raise
+        memoize_md5(path, cached.md5)
+        return path
+
+    def _expire(self) -> None:
+        """Remove expired downloads from the cache."""
+        now = time.monotonic()
+        for url in [url for url, c in self._cache.items() if c.expires <= now]:
+            self._evict(url)
+
+    def _evict(self, url: str) -> None:
+        """Remove download of URL from the cache."""
+        cached = self._cache.pop(url, None)
+        if cached is not None:
+            try:
+                os.remove(cached.path)
+            except FileNotFoundError:
+                pass
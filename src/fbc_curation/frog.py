@@ -2,24 +2,60 @@
 from __future__ import annotations
 
 import hashlib
-import tempfile
+import mmap
+import re
+import zipfile
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
 import orjson
 import pandas as pd
 from pydantic import BaseModel as PydanticBaseModel
-from pydantic import Field, ValidationError, validator
+from pydantic import Field, PrivateAttr, ValidationError, validator
+from pydantic.error_wrappers import ErrorWrapper
 from pymetadata import log
-from pymetadata.omex import EntryFormat, ManifestEntry, Omex
+from pymetadata.omex import EntryFormat, Manifest, ManifestEntry, Omex
 
 from fbc_curation import FROG_PATH_PREFIX
+from fbc_curation.digest import md5_for_path
 
 
 logger = log.get_logger(__name__)
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+def _import_pyarrow() -> Any:
+    """Import optional dependency pyarrow for Arrow IPC files."""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as err:
+        raise ImportError(
+            "Arrow files require 'pyarrow', install via "
+            "'pip install fbc_curation[arrow]'."
+        ) from err
+    return pa
+
 
 class BaseModel(PydanticBaseModel):
     """Base model."""
@@ -46,10 +82,22 @@ class CuratorConstants:
     # output filenames
     FROG_FILENAME = "frog.json"
     METADATA_FILENAME = "metadata.json"
+    DIAGNOSTICS_FILENAME = "diagnostics.json"
     OBJECTIVE_FILENAME = f"01_{OBJECTIVE_KEY}.tsv"
     FVA_FILENAME = f"02_{FVA_KEY}.tsv"
     GENEDELETIONS_FILENAME = f"03_{GENEDELETIONS_KEY}.tsv"
     REACTIONDELETIONS_FILENAME = f"04_{REACTIONDELETIONS_KEY}.tsv"
+    OBJECTIVE_ARROW_FILENAME = f"01_{OBJECTIVE_KEY}.arrow"
+    FVA_ARROW_FILENAME = f"02_{FVA_KEY}.arrow"
+    GENEDELETIONS_ARROW_FILENAME = f"03_{GENEDELETIONS_KEY}.arrow"
+    REACTIONDELETIONS_ARROW_FILENAME = f"04_{REACTIONDELETIONS_KEY}.arrow"
+
+    # format of Arrow IPC files in OMEX (media type of Arrow IPC file format)
+    ARROW_FORMAT = "application/vnd.apache.arrow.file"
+    # key of FROG metadata in the schema metadata of Arrow files
+    ARROW_METADATA_KEY = "frog.metadata"
+    # format of diagnostics files in OMEX (versioned by the format field)
+    DIAGNOSTICS_FORMAT = "application/json"
 
     # special settings for comparison
     VALUE_INFEASIBLE = np.NaN
@@ -156,6 +204,79 @@ class Tool(BaseModel):
         use_enum_values = True
 
 
+class PruningReason(str, Enum):
+    """Reason why a knockout result was obtained without solving an LP."""
+
+    ZERO_FLUX: str = "zero_flux"
+    FVA_RANGE: str = "fva_range"
+
+
+class FrogStageStatistics(BaseModel):
+    """Solver statistics of a FROG stage."""
+
+    lp_count: Optional[int] = Field(description="Number of LPs solved in the stage.")
+    knockout_count: Optional[int] = Field(
+        description="Number of knocked out reactions or genes in the stage."
+    )
+    iterations: Optional[Dict[str, int]] = Field(
+        description="Simplex iterations per knockout, keys are the knocked out "
+        "reaction or gene ids."
+    )
+    pruned: Optional[Dict[str, PruningReason]] = Field(
+        description="Knockouts with the wild-type objective value which were not "
+        "solved, with the reason: zero flux in the wild-type solution "
+        "('zero_flux') or FVA range at optimum containing zero ('fva_range')."
+    )
+
+    class Config:
+        """Pydantic configuration FrogStageStatistics."""
+
+        use_enum_values = True
+
+    @staticmethod
+    def merge(parts: List[FrogStageStatistics]) -> FrogStageStatistics:
+        """Merge statistics of parts of a stage, e.g. of shards."""
+        counts: Dict[str, Optional[int]] = {}
+        for field in ["lp_count", "knockout_count"]:
+            values = [getattr(part, field) for part in parts]
+            counts[field] = (
+                None if any(v is None for v in values) else sum(values)  # type: ignore
+            )
+        iterations: Dict[str, int] = {}
+        pruned: Dict[str, PruningReason] = {}
+        for part in parts:
+            iterations.update(part.iterations or {})
+            pruned.update(part.pruned or {})
+
+        return FrogStageStatistics(
+            **counts,
+            iterations=iterations if iterations else None,
+            pruned=pruned if pruned else None,
+        )
+
+
+# quantization step of the values in fingerprints (absolute comparison tolerance)
+FINGERPRINT_TOLERANCE: float = 1e-3
+
+
+class FrogFingerprints(BaseModel):
+    """Tolerance-aware fingerprints of the FROG tables.
+
+    Values are quantized to multiples of the tolerance before hashing, so equal
+    fingerprints imply that all values agree within the tolerance. Different
+    fingerprints do not imply different tables, e.g. for values close to a
+    quantization boundary.
+    """
+
+    tolerance: float = Field(description="Quantization step of the values.")
+    objectives: str = Field(description="Fingerprint of the objectives.")
+    fva: str = Field(description="Fingerprint of the FVA.")
+    reaction_deletions: str = Field(
+        description="Fingerprint of the reaction deletions."
+    )
+    gene_deletions: str = Field(description="Fingerprint of the gene deletions.")
+
+
 class FrogMetaData(BaseModel):
     """FROG metadata."""
 
@@ -188,6 +309,13 @@ class FrogMetaData(BaseModel):
     environment: Optional[str] = Field(
         description="Execution environment such as Linux."
     )
+    reaction_deletions_pruned: Optional[Dict[str, PruningReason]] = Field(
+        alias="reaction_deletions.pruned",
+        description="Reaction deletions with the wild-type objective value which "
+        "were not solved, by reaction id with the reason: zero flux in the "
+        "wild-type solution ('zero_flux') or FVA range at optimum containing zero "
+        "('fva_range'). All other reaction deletions were solved.",
+    )
 
     class Config:
         """Pydantic configuration FrogMetaData."""
@@ -197,174 +325,610 @@ class FrogMetaData(BaseModel):
 
     @staticmethod
     def md5_for_path(path: Path) -> str:
-        """Calculate MD5 of file content."""
+        """Calculate MD5 of file content.
 
-        # Open,close, read file and calculate MD5 on its contents
-        with open(path, "rb") as f_check:
-            # read contents of the file
-            data = f_check.read()
-            # pipe contents of the file through
-            return hashlib.md5(data).hexdigest()
+        The file is hashed in chunks, digests are memoized (see `digest`).
+        """
+        return md5_for_path(path)
 
 
-class FrogObjectives(BaseModel):
-    """Definition of FROG Objectives."""
+FROG_DIAGNOSTICS_FORMAT_V1 = "frog-diagnostics-version-1"
 
-    objectives: List[FrogObjective]
+
+class FrogDiagnostics(BaseModel):
+    """Diagnostics of a FROG run, not part of the FROG report.
+
+    The solver statistics of the stages (e.g. simplex iterations and pruned
+    knockouts) and the fingerprints of the tables are only written on request
+    (`diagnostics=True`) to the separate file 'diagnostics.json' next to the
+    FROG files.
+    """
+
+    format: str = Field(
+        FROG_DIAGNOSTICS_FORMAT_V1,
+        const=True,
+        description="Format and version of the FROG diagnostics.",
+    )
+    statistics: Dict[str, FrogStageStatistics] = Field(
+        default_factory=dict,
+        description="Solver statistics of the FROG stages by stage key (e.g. "
+        "'reaction_deletion').",
+    )
+    fingerprints: Optional[FrogFingerprints] = Field(
+        description="Fingerprints of the tables, set when the report is written."
+    )
 
     class Config:
-        """Pydantic configuration FrogObjectives."""
+        """Pydantic configuration FrogDiagnostics."""
 
         use_enum_values = True
 
     @staticmethod
-    def from_df(df: pd.DataFrame) -> FrogObjectives:
-        """Parse Objectives from DataFrame."""
-        json = df.to_dict(orient="records")
-        objectives = []
-        for item in json:
-            try:
-                objectives.append(FrogObjective(**item))
-            except ValidationError as e:
-                logger.error(item)
-                logger.error(e.json())
+    def from_path(path: Path) -> FrogDiagnostics:
+        """Read diagnostics from JSON, empty diagnostics if the file is missing."""
+        if not path.exists():
+            return FrogDiagnostics()
+        with open(path, "r+b") as f_json:
+            return FrogDiagnostics.parse_raw(f_json.read())
 
-        return FrogObjectives(objectives=objectives)
+    def write(self, f_json: BinaryIO) -> None:
+        """Write diagnostics as JSON to binary file object."""
+        f_json.write(orjson.dumps(self.dict(), option=orjson.OPT_INDENT_2))
 
-    def to_df(self) -> pd.DataFrame:
-        """Create objectives DataFrame."""
-
-        d: Dict[str, Any] = self.dict()
-        item = list(d.values())[0]
-        df = pd.DataFrame(item)
-        if len(df) > 0:
-            df.sort_values(by=["objective"], inplace=True)
-            df.index = range(len(df))
-            df.loc[
-                df.status == StatusCode.INFEASIBLE.value, "value"
-            ] = CuratorConstants.VALUE_INFEASIBLE
 
-        return df
+class FrogRows(Sequence):
+    """Read-only rows of a FROG table backed by a DataFrame.
 
+    Row models are created on access without validation, changes to the rows
+    are not stored in the table.
+    """
 
-class FrogFVA(BaseModel):
-    """Definition of FROG FVA."""
+    def __init__(self, df: pd.DataFrame, row_cls: Type[BaseModel]):
+        """Create rows for validated DataFrame."""
+        self.df = df
+        self.row_cls = row_cls
 
-    fva: List[FrogFVASingle]
+    def __len__(self) -> int:
+        """Get number of rows."""
+        return len(self.df)
+
+    def __getitem__(self, index: Any) -> Any:
+        """Get row model or list of row models for slice."""
+        if isinstance(index, slice):
+            return [self._row(record) for record in _records(self.df.iloc[index])]
+        return self._row(_records(self.df.iloc[[index]])[0])
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        """Iterate over row models."""
+        for record in self.records():
+            yield self._row(record)
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare rows with rows or list of row models."""
+        if isinstance(other, FrogRows):
+            return self.records() == other.records()
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        """Get representation."""
+        return f"FrogRows({self.row_cls.__name__}, n={len(self)})"
+
+    def _row(self, record: Dict[str, Any]) -> BaseModel:
+        return self.row_cls.construct(**record)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Get rows as list of dictionaries with None for NaN."""
+        return _records(self.df)
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Get records of DataFrame with None for NaN."""
+    if df.isna().values.any():
+        df = df.astype(object).where(df.notna(), None)
+    return df.to_dict(orient="records")  # type: ignore
+
+
+def _validate_table(
+    df: pd.DataFrame, row_cls: Type[BaseModel]
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Validate columns of a FROG table against the fields of the row model.
+
+    Columns are converted to the field types, i.e. float columns to float64 with
+    NaN for missing values, enum columns to the enum values and string columns to
+    str. Columns which are not fields are dropped. The DataFrame is returned
+    without copy if all columns are valid and of the field types.
+
+    :return: validated DataFrame and mask of invalid rows.
+    """
+    invalid = np.zeros(len(df), dtype=bool)
+    columns: Dict[str, Any] = {}
+    converted = list(df.columns) != list(row_cls.__fields__)
+    for name, field in row_cls.__fields__.items():
+        if name not in df.columns:
+            invalid |= field.required
+            columns[name] = np.full(len(df), np.nan if field.type_ is float else None)
+            continue
+
+        column: pd.Series = df[name]
+        values = column
+        if field.type_ is float:
+            if not pd.api.types.is_float_dtype(column.dtype):
+                values = pd.to_numeric(column, errors="coerce").astype(float)
+                invalid |= (values.isna() & column.notna()).values
+        elif isinstance(field.type_, type) and issubclass(field.type_, Enum):
+            mapping = {e: e.value for e in field.type_}
+            mapping.update({e.value: e.value for e in field.type_})
+            if not all(type(v) is str for v in column.unique()):
+                values = column.map(mapping)
+            invalid |= ~values.isin(list(mapping.values())).values
+        else:
+            invalid |= column.isna().values
+            if pd.api.types.infer_dtype(column, skipna=True) not in {"string", "empty"}:
+                values = column.map(str, na_action="ignore")
+
+        converted = converted or values is not column
+        columns[name] = values
+
+    if converted:
+        df = pd.DataFrame(columns, index=df.index)
+    return df, invalid
+
+
+class FrogTable(BaseModel):
+    """Base class of the FROG result tables.
+
+    The rows are stored column-oriented in a DataFrame and validated vectorized.
+    The rows field provides read-only row models (`FrogRows`) for access, the
+    JSON schema is defined by the row models.
+    """
+
+    # name of rows field, row model and column for sorting (set in subclasses)
+    _rows_key: ClassVar[str]
+    _row_cls: ClassVar[Type[BaseModel]]
+    _sort_key: ClassVar[str]
+    # columns set to `CuratorConstants.VALUE_INFEASIBLE` for infeasible rows
+    _infeasible_columns: ClassVar[List[str]] = ["value"]
 
     class Config:
-        """Pydantic configuration FrogFVA."""
+        """Pydantic configuration FrogTable."""
 
         use_enum_values = True
 
-    @staticmethod
-    def from_df(df: pd.DataFrame) -> FrogFVA:
-        """Parse FVA from DataFrame."""
+    def __init__(self, **data: Any) -> None:
+        """Create table from rows (dictionaries or row models) or DataFrame.
 
-        fva = []
-        for item in df.to_dict(orient="records"):
-            try:
-                fva.append(FrogFVASingle(**item))
-            except ValidationError as e:
-                logger.error(item)
-                logger.error(e.json())
-        return FrogFVA(fva=fva)
+        raises ValidationError
+        """
+        rows = data.get(self._rows_key)
+        if isinstance(rows, (list, pd.DataFrame)):
+            if isinstance(rows, list):
+                rows = pd.DataFrame.from_records(
+                    [r.dict() if isinstance(r, BaseModel) else r for r in rows],
+                    columns=list(self._row_cls.__fields__),
+                )
+            df, invalid = _validate_table(rows, self._row_cls)
+            if invalid.any():
+                raise ValidationError(
+                    [
+                        ErrorWrapper(
+                            ValueError(f"invalid rows: {_records(rows[invalid])}"),
+                            loc=self._rows_key,
+                        )
+                    ],
+                    self.__class__,
+                )
+            rows = FrogRows(df, self._row_cls)
+        if not isinstance(rows, FrogRows):
+            # pydantic validation errors
+            super().__init__(**data)
+            return
+
+        object.__setattr__(self, "__dict__", {self._rows_key: rows})
+        object.__setattr__(self, "__fields_set__", {self._rows_key})
+
+    @classmethod
+    def from_df(cls: Type[FrogTableType], df: pd.DataFrame) -> FrogTableType:
+        """Create table from DataFrame without copy.
+
+        Invalid rows are logged and removed.
+        """
+        df, invalid = _validate_table(df, cls._row_cls)
+        if invalid.any():
+            logger.error(f"Invalid rows for '{cls.__name__}':\n{df[invalid]}")
+            df = df[~invalid]
+        return cls(**{cls._rows_key: FrogRows(df, cls._row_cls)})
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Get DataFrame of the rows in order of the rows.
+
+        The DataFrame is not copied and must not be modified.
+        """
+        rows = getattr(self, self._rows_key)
+        if isinstance(rows, FrogRows):
+            return rows.df
+        return _validate_table(
+            pd.DataFrame.from_records(
+                [r.dict() for r in rows], columns=list(self._row_cls.__fields__)
+            ),
+            self._row_cls,
+        )[0]
 
     def to_df(self) -> pd.DataFrame:
-        """Create fva DataFrame."""
-
-        d: Dict[str, Any] = self.dict()
-        item = list(d.values())[0]
-        df = pd.DataFrame(item)
-        if len(df) > 0:
-            df.sort_values(by=["reaction"], inplace=True)
-            df.index = range(len(df))
-            df.loc[
-                df.status == StatusCode.INFEASIBLE.value,
-                ["flux", "minimum", "maximum"],
-            ] = CuratorConstants.VALUE_INFEASIBLE
+        """Create DataFrame sorted by the sort column.
+
+        Values of infeasible rows are set to `CuratorConstants.VALUE_INFEASIBLE`.
+        The DataFrame is only copied if rows must be sorted or values changed.
+        """
+        df = self.df
+        if len(df) == 0:
+            return df
+        shared = True
+        if not df[self._sort_key].is_monotonic_increasing:
+            df = df.sort_values(by=[self._sort_key], ignore_index=True)
+            shared = False
+        elif not df.index.equals(pd.RangeIndex(len(df))):
+            df = df.set_axis(range(len(df)), axis=0, copy=False)
+
+        infeasible = (df.status == StatusCode.INFEASIBLE.value).values
+        columns = self._infeasible_columns
+        if infeasible.any() and df.loc[infeasible, columns].notna().values.any():
+            if shared:
+                df = df.copy()
+            df.loc[infeasible, columns] = CuratorConstants.VALUE_INFEASIBLE
+
+        return df
+
+    def fingerprint(self, tolerance: float = FINGERPRINT_TOLERANCE) -> str:
+        """Get tolerance-aware fingerprint of the table.
+
+        MD5 of the ids and status of the rows in order of the sort column and of
+        the values quantized to multiples of `tolerance`. Values of infeasible
+        rows are missing values, missing and infinite values are hashed as
+        special values.
+        """
+        df = self.to_df()
+        md5 = hashlib.md5()
+        for name in [self._sort_key, "status"]:
+            md5.update(name.encode() + b"\0")
+            md5.update("\0".join(df[name].astype(str)).encode() + b"\0")
+        for name in self._infeasible_columns:
+            values = df[name].values.astype(float)
+            with np.errstate(invalid="ignore", over="ignore"):
+                quantized = np.round(values / tolerance)
+            int64 = np.iinfo(np.int64)
+            quantized = np.clip(quantized, int64.min + 3, int64.max - 1)
+            quantized[np.isposinf(values)] = int64.max
+            quantized[np.isneginf(values)] = int64.min + 2
+            quantized[np.isnan(values)] = int64.min + 1
+            md5.update(name.encode() + b"\0")
+            md5.update(quantized.astype("<i8").tobytes())
+        return md5.hexdigest()
+
+    def to_tsv(self, path: Union[Path, BinaryIO]) -> None:
+        """Write table sorted by the sort column as TSV.
+
+        Missing values are written as 'NaN', floats with round-trip precision.
+        The file is gzip compressed for the suffix '.gz'.
+
+        :param path: path of the TSV or binary file object to write to.
+        """
+        logger.debug(f"{path}")
+        self.to_df().to_csv(
+            path, sep="\t", index=False, na_rep="NaN", compression="infer"
+        )
+
+    @classmethod
+    def from_tsv(
+        cls: Type[FrogTableType], path: Union[Path, BinaryIO]
+    ) -> FrogTableType:
+        """Read table from TSV with the column types of the row model.
+
+        Only 'NaN' and empty values of float columns are missing values, so ids
+        such as 'NA' are read as strings. Floats are parsed with round-trip
+        precision. The file is gzip decompressed for the suffix '.gz'.
+
+        :param path: path of the TSV or binary file object to read from.
+        """
+        dtypes: Dict[str, Any] = {}
+        na_values: Dict[str, List[str]] = {}
+        for name, field in cls._row_cls.__fields__.items():
+            if field.type_ is float:
+                dtypes[name] = np.float64
+                na_values[name] = ["NaN", "nan", ""]
+            else:
+                dtypes[name] = object
+                na_values[name] = []
+        try:
+            df = pd.read_csv(
+                path,
+                sep="\t",
+                dtype=dtypes,
+                keep_default_na=False,
+                na_values=na_values,
+                float_precision="round_trip",
+                compression="infer",
+            )
+        except pd.errors.EmptyDataError:
+            df = pd.DataFrame()
+        return cls.from_df(df)
+
+    def to_arrow(self) -> pa.Table:
+        """Create Arrow table of the rows in order of the rows.
 
+        requires pyarrow
+        """
+        pa = _import_pyarrow()
+        schema = pa.schema(
+            [
+                (name, pa.float64() if field.type_ is float else pa.string())
+                for name, field in self._row_cls.__fields__.items()
+            ]
+        )
+        return pa.Table.from_pandas(self.df, schema=schema, preserve_index=False)
+
+    @classmethod
+    def from_arrow(cls: Type[FrogTableType], table: pa.Table) -> FrogTableType:
+        """Create table from Arrow table.
+
+        requires pyarrow
+        """
+        return cls.from_df(table.to_pandas())
+
+    def _iter(self, to_dict: bool = False, **kwargs: Any) -> Iterator[Tuple[str, Any]]:
+        """Iterate fields with rows as dictionaries for `dict` and `json`."""
+        for key, value in super()._iter(to_dict=to_dict, **kwargs):
+            if to_dict and isinstance(value, FrogRows):
+                options = {
+                    k: kwargs.get(k, False)
+                    for k in ["exclude_unset", "exclude_defaults", "exclude_none"]
+                }
+                if any(options.values()):
+                    value = [row.dict(**options) for row in value]
+                else:
+                    value = value.records()
+            yield key, value
+
+
+FrogTableType = TypeVar("FrogTableType", bound=FrogTable)
+
+
+def _merge_deletions(
+    parts: List[FrogTable], key: str, ids: Optional[List[str]]
+) -> pd.DataFrame:
+    """Merge deletions of parts and validate the ids.
+
+    :param key: id column of the deletions, i.e. 'reaction' or 'gene'.
+    :param ids: expected ids in order of the merged deletions, order of the parts
+        if None.
+    :raises ValueError: if ids are duplicated, missing or not expected.
+    """
+    df = pd.concat([part.df for part in parts], ignore_index=True)
+    keys: pd.Series = df[key]
+    duplicates = keys[keys.duplicated()]
+    if len(duplicates) > 0:
+        raise ValueError(f"Duplicate {key} deletions in parts: {duplicates.tolist()}")
+
+    if ids is None:
         return df
 
+    index = pd.Index(keys)
+    positions = index.get_indexer(ids)
+    missing = [k for k, pos in zip(ids, positions) if pos == -1]
+    if missing:
+        raise ValueError(f"Missing {key} deletions in parts: {missing}")
+    unexpected = keys[~keys.isin(ids)]
+    if len(unexpected) > 0:
+        raise ValueError(
+            f"Unexpected {key} deletions in parts: {sorted(unexpected.tolist())}"
+        )
+    return df.iloc[positions].reset_index(drop=True)
+
+
+class FrogObjectives(FrogTable):
+    """Definition of FROG Objectives."""
+
+    objectives: List[FrogObjective]
+
+    _rows_key = "objectives"
+    _row_cls = FrogObjective
+    _sort_key = "objective"
+
+    class Config:
+        """Pydantic configuration FrogObjectives."""
+
+        use_enum_values = True
+
+
+class FrogFVA(FrogTable):
+    """Definition of FROG FVA."""
+
+    fva: List[FrogFVASingle]
+
+    _rows_key = "fva"
+    _row_cls = FrogFVASingle
+    _sort_key = "reaction"
+    _infeasible_columns = ["flux", "minimum", "maximum"]
+
+    class Config:
+        """Pydantic configuration FrogFVA."""
+
+        use_enum_values = True
+
 
-class FrogReactionDeletions(BaseModel):
+class FrogReactionDeletions(FrogTable):
     """Definition of FROG Reaction deletions."""
 
     deletions: List[FrogReactionDeletion]
 
+    _rows_key = "deletions"
+    _row_cls = FrogReactionDeletion
+    _sort_key = "reaction"
+
     class Config:
         """Pydantic configuration FrogReactionDeletions."""
 
         use_enum_values = True
 
     @staticmethod
-    def from_df(df: pd.DataFrame) -> FrogReactionDeletions:
-        """Parse FVA from DataFrame."""
-        json = df.to_dict(orient="records")
-        deletions = []
-        for item in json:
-            try:
-                deletions.append(FrogReactionDeletion(**item))
-            except ValidationError as e:
-                logger.error(item)
-                logger.error(e.json())
-
-        return FrogReactionDeletions(deletions=deletions)
-
-    def to_df(self) -> pd.DataFrame:
-        """Create reaction deletions DataFrame."""
-
-        d: Dict[str, Any] = self.dict()
-        item = list(d.values())[0]
-        df = pd.DataFrame(item)
-        if len(df) > 0:
-            df.sort_values(by=["reaction"], inplace=True)
-            df.index = range(len(df))
-            df.loc[
-                df.status == StatusCode.INFEASIBLE.value, "value"
-            ] = CuratorConstants.VALUE_INFEASIBLE
-
-        return df
+    def merge(
+        parts: List[FrogReactionDeletions], ids: Optional[List[str]] = None
+    ) -> FrogReactionDeletions:
+        """Merge partial reaction deletions, e.g. of shards.
+
+        :param ids: expected reaction ids in order of the merged deletions, order
+            of the parts if None.
+        :raises ValueError: if reactions are duplicated, missing or not expected.
+        """
+        return FrogReactionDeletions.from_df(
+            _merge_deletions(parts, key="reaction", ids=ids)  # type: ignore
+        )
 
 
-class FrogGeneDeletions(BaseModel):
+class FrogGeneDeletions(FrogTable):
     """Definition of FROG Gene deletions."""
 
     deletions: List[FrogGeneDeletion]
 
+    _rows_key = "deletions"
+    _row_cls = FrogGeneDeletion
+    _sort_key = "gene"
+
     class Config:
         """Pydantic configuration FrogGeneDeletions."""
 
         use_enum_values = True
 
     @staticmethod
-    def from_df(df: pd.DataFrame) -> FrogGeneDeletions:
-        """Parse GeneDeletions from DataFrame."""
-        json = df.to_dict(orient="records")
-        deletions = []
-        for item in json:
-            try:
-                deletions.append(FrogGeneDeletion(**item))
-            except ValidationError as e:
-                logger.error(item)
-                logger.error(e.json())
+    def merge(
+        parts: List[FrogGeneDeletions], ids: Optional[List[str]] = None
+    ) -> FrogGeneDeletions:
+        """Merge partial gene deletions, e.g. of shards.
+
+        :param ids: expected gene ids in order of the merged deletions, order of
+            the parts if None.
+        :raises ValueError: if genes are duplicated, missing or not expected.
+        """
+        return FrogGeneDeletions.from_df(
+            _merge_deletions(parts, key="gene", ids=ids)  # type: ignore
+        )
 
-        return FrogGeneDeletions(deletions=deletions)
 
-    def to_df(self) -> pd.DataFrame:
-        """Create gene deletions DataFrame."""
-
-        d: Dict[str, Any] = self.dict()
-        item = list(d.values())[0]
-        df = pd.DataFrame(item)
-        if len(df) > 0:
-            df.sort_values(by=["gene"], inplace=True)
-            df.index = range(len(df))
-            df.loc[
-                df.status == StatusCode.INFEASIBLE.value, "value"
-            ] = CuratorConstants.VALUE_INFEASIBLE
+# rows of tables serialized at once in `FrogReport.to_json`
+JSON_CHUNK_SIZE: int = 5000
+
+# JSON without brackets and strings, JSON strings
+_JSON_FILL = rb'[^"{}\[\]]*'
+_JSON_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+# objects and arrays without nested objects and arrays, e.g. rows of tables
+_JSON_FLAT = (
+    rb"\{" + _JSON_FILL + rb"(?:" + _JSON_STRING + _JSON_FILL + rb")*\}|"
+    rb"\[" + _JSON_FILL + rb"(?:" + _JSON_STRING + _JSON_FILL + rb")*\]"
+)
+# JSON up to and including the next bracket, brackets in strings are skipped
+_JSON_BRACKET = re.compile(
+    _JSON_FILL + rb"(?:" + _JSON_STRING + _JSON_FILL + rb")*([{}\[\]])"
+)
+# JSON up to and including the next bracket of nested objects and arrays
+_JSON_NESTED_BRACKET = re.compile(
+    _JSON_FILL
+    + rb"(?:(?:"
+    + _JSON_STRING
+    + rb"|"
+    + _JSON_FLAT
+    + rb")"
+    + _JSON_FILL
+    + rb")*([{}\[\]])"
+)
+# key of a value at the end of JSON
+_JSON_KEY = re.compile(rb'"((?:[^"\\]|\\.)*)"\s*:\s*\Z')
+
+
+def _indent_json(json_bytes: bytes, indent: int) -> bytes:
+    """Indent JSON by spaces after every line break.
+
+    Line breaks in JSON strings are escaped, so all line breaks are whitespace.
+    """
+    return json_bytes.replace(b"\n", b"\n" + b" " * indent)
+
+
+def _write_json_table(f_json: BinaryIO, table: FrogTable, chunk_size: int) -> None:
+    """Write table section of FrogReport in chunks of rows."""
+    df = table.df
+    if len(df) == 0:
+        f_json.write(b'{\n    "' + table._rows_key.encode() + b'": []\n  }')
+        return
+
+    f_json.write(b'{\n    "' + table._rows_key.encode() + b'": [')
+    for k in range(0, len(df), chunk_size):
+        if k:
+            f_json.write(b",")
+        rows = orjson.dumps(
+            _records(df.iloc[k : k + chunk_size]), option=orjson.OPT_INDENT_2
+        )
+        # strip brackets of list
+        f_json.write(_indent_json(rows[1:-2], indent=4))
+    f_json.write(b"\n    ]\n  }")
 
-        return df
+
+class _JsonSections:
+    """Byte ranges of the sections of a JSON object.
+
+    Brackets are scanned until all sections of the keys are found, strings and
+    values between the brackets are skipped by the regular expressions, as well
+    as objects and arrays without nesting in the sections (e.g. table rows).
+    Only objects and arrays are supported as section values. The scan is
+    continued if the data is extended, e.g. JSON read in chunks. The scan stops
+    for data which is not a JSON object (`valid`).
+    """
+
+    def __init__(self, keys: List[str]):
+        """Create scan for the sections of keys."""
+        self.keys: List[str] = keys
+        self.spans: Dict[str, Tuple[int, int]] = {}
+        self._pos: int = 0
+        self._depth: int = 0
+        self._key: Optional[str] = None
+        self._start: int = 0
+        self.valid: bool = True
+
+    @property
+    def complete(self) -> bool:
+        """Check if all sections are found."""
+        return all(key in self.spans for key in self.keys)
+
+    def scan(self, data: Any) -> Dict[str, Tuple[int, int]]:
+        """Scan data from the position of the last scan.
+
+        :param data: bytes or memory map of JSON.
+        :return: start and end of the section values by key.
+        """
+        complete = self.complete
+        while self.valid and not complete:
+            pattern = _JSON_BRACKET if self._depth < 2 else _JSON_NESTED_BRACKET
+            match = pattern.match(data, self._pos)
+            if match is None:
+                break
+            self._pos = match.end()
+            bracket = match.start(1)
+            if data[bracket] in (ord("{"), ord("[")):
+                if self._depth == 1:
+                    key_match = _JSON_KEY.search(data, match.start(), bracket)
+                    if key_match is None:
+                        self.valid = False
+                        break
+                    self._key = orjson.loads(b'"' + key_match.group(1) + b'"')
+                    self._start = bracket
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 1 and self._key is not None:
+                    self.spans[self._key] = (self._start, match.end())
+                    self._key = None
+                    complete = self.complete
+        return self.spans
 
 
 class FrogReport(BaseModel):
@@ -376,13 +940,50 @@ class FrogReport(BaseModel):
     reaction_deletions: FrogReactionDeletions
     gene_deletions: FrogGeneDeletions
 
+    # diagnostics are not part of the FROG report (not in JSON and schema)
+    _diagnostics: FrogDiagnostics = PrivateAttr(default_factory=FrogDiagnostics)
+
     class Config:
         """Pydantic configuration FrogReport."""
 
         use_enum_values = True
 
-    def to_json(self, path: Path) -> None:
-        """Write FrogReport to JSON format."""
+    @property
+    def diagnostics(self) -> FrogDiagnostics:
+        """Get diagnostics of the run, e.g. solver statistics and fingerprints."""
+        return self._diagnostics
+
+    def set_diagnostics(self, diagnostics: FrogDiagnostics) -> None:
+        """Set diagnostics of the run."""
+        self._diagnostics = diagnostics
+
+    def set_statistics(self, statistics: Dict[str, FrogStageStatistics]) -> None:
+        """Set solver statistics of the stages in the diagnostics.
+
+        The pruned reaction deletions are recorded in the metadata, so that the
+        values which were not solved can be audited from the report.
+        """
+        self._diagnostics = self._diagnostics.copy(
+            update={"statistics": dict(statistics)}
+        )
+        reaction_statistics = statistics.get(CuratorConstants.REACTIONDELETIONS_KEY)
+        self.metadata = self.metadata.copy(
+            update={
+                "reaction_deletions_pruned": reaction_statistics.pruned
+                if reaction_statistics
+                else None
+            }
+        )
+
+    def to_json(self, path: Path, chunk_size: int = JSON_CHUNK_SIZE) -> None:
+        """Write FrogReport to JSON format.
+
+        The sections are written incrementally, tables in chunks of rows, so the
+        complete JSON is never in memory. The output is identical to the
+        indented JSON of `FrogReport.dict`.
+
+        :param chunk_size: number of table rows serialized at once.
+        """
         if not path.parent.exists():
             logger.warning(f"Creating results path: {path.parent}")
             path.mkdir(parents=True)
@@ -390,8 +991,25 @@ class FrogReport(BaseModel):
         # write FROG
         logger.debug(f"{path}")
         with open(path, "w+b") as f_json:
-            json_bytes = orjson.dumps(self.dict(), option=orjson.OPT_INDENT_2)
-            f_json.write(json_bytes)
+            self._write_json(f_json, chunk_size=chunk_size)
+
+    def _write_json(self, f_json: BinaryIO, chunk_size: int = JSON_CHUNK_SIZE) -> None:
+        """Write FrogReport as JSON to binary file object."""
+        f_json.write(b"{")
+        for k, key in enumerate(self.__fields__):
+            f_json.write(b',\n  "' if k else b'\n  "')
+            f_json.write(key.encode() + b'": ')
+            section: BaseModel = getattr(self, key)
+            if isinstance(section, FrogTable):
+                _write_json_table(f_json, section, chunk_size=chunk_size)
+            else:
+                f_json.write(
+                    _indent_json(
+                        orjson.dumps(section.dict(), option=orjson.OPT_INDENT_2),
+                        indent=2,
+                    )
+                )
+        f_json.write(b"\n}")
 
     @staticmethod
     def from_json(path: Path) -> FrogReport:
@@ -406,6 +1024,141 @@ class FrogReport(BaseModel):
             d = orjson.loads(s_json)
             return FrogReport(**d)
 
+    @classmethod
+    def sections_from_json(
+        cls, path: Path, keys: Optional[Iterable[str]] = None
+    ) -> Dict[str, BaseModel]:
+        """Read selected sections of FrogReport from JSON format.
+
+        Only the selected sections are parsed, the file is scanned until all
+        sections are found. E.g. the metadata and objectives are read without
+        the FVA and deletion tables. The complete JSON is parsed if the sections
+        are not found by the scan.
+
+        raises ValidationError, ValueError
+
+        :param path: path to JSON report file
+        :param keys: section keys, i.e. FrogReport fields such as 'metadata' or
+            'objectives', all sections if None.
+        :return: section models by key in order of the keys.
+        """
+        keys = cls._section_keys(keys)
+        with open(path, "r+b") as f_json, mmap.mmap(
+            f_json.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            spans = _JsonSections(keys=keys).scan(data)
+            return cls._parse_sections(
+                data, spans, keys=keys, source=path, read_all=lambda: data[:]
+            )
+
+    @classmethod
+    def sections_from_json_file(
+        cls,
+        f_json: BinaryIO,
+        keys: Optional[Iterable[str]] = None,
+        chunk_size: int = 2**16,
+    ) -> Dict[str, BaseModel]:
+        """Read selected sections of FrogReport from JSON file object.
+
+        The file is read in chunks of growing size until all sections are found,
+        e.g. the metadata at the beginning is read without the rest of the file.
+        Use for files which cannot be memory-mapped such as archive members. The
+        complete JSON is parsed if the sections are not found by the scan.
+
+        raises ValidationError, ValueError
+
+        :param f_json: binary file object of the JSON report.
+        :param keys: section keys, all sections if None.
+        :param chunk_size: size of the first chunk in bytes, doubled per chunk.
+        :return: section models by key in order of the keys.
+        """
+        keys = cls._section_keys(keys)
+        sections = _JsonSections(keys=keys)
+        data = b""
+        while True:
+            chunk = f_json.read(chunk_size)
+            data += chunk
+            spans = sections.scan(data)
+            if not chunk or sections.complete or not sections.valid:
+                break
+            chunk_size *= 2
+        return cls._parse_sections(
+            data, spans, keys=keys, source=f_json, read_all=lambda: data + f_json.read()
+        )
+
+    @classmethod
+    def _section_keys(cls, keys: Optional[Iterable[str]]) -> List[str]:
+        """Check section keys, all sections if None."""
+        keys = list(cls.__fields__) if keys is None else list(keys)
+        for key in keys:
+            if key not in cls.__fields__:
+                raise ValueError(
+                    f"Unknown FrogReport section '{key}', supported sections: "
+                    f"{list(cls.__fields__)}"
+                )
+        return keys
+
+    @classmethod
+    def _parse_sections(
+        cls,
+        data: Any,
+        spans: Dict[str, Tuple[int, int]],
+        keys: List[str],
+        source: Any,
+        read_all: Callable[[], bytes],
+    ) -> Dict[str, BaseModel]:
+        """Parse sections at the byte ranges of the JSON data.
+
+        If a section is not found by the scan (e.g. JSON written by other tools
+        with a layout not supported by the scan) the complete JSON is parsed.
+
+        :param read_all: function returning the complete JSON data.
+        """
+        values: Optional[Dict[str, Any]] = None
+        if all(key in spans for key in keys):
+            try:
+                values = {
+                    key: orjson.loads(data[spans[key][0] : spans[key][1]])
+                    for key in keys
+                }
+            except orjson.JSONDecodeError:
+                values = None
+        if values is None:
+            logger.debug(f"FROG JSON sections parsed from complete JSON: '{source}'")
+            d = orjson.loads(read_all())
+            values = {}
+            for key in keys:
+                if not isinstance(d, dict) or key not in d:
+                    raise ValueError(f"Section '{key}' not in FROG JSON: '{source}'")
+                values[key] = d[key]
+
+        return {
+            key: cls.__fields__[key].type_.parse_obj(value)
+            for key, value in values.items()
+        }
+
+    def fingerprints(
+        self, tolerance: float = FINGERPRINT_TOLERANCE
+    ) -> FrogFingerprints:
+        """Get tolerance-aware fingerprints of the tables (see `FrogTable`)."""
+        return FrogFingerprints(
+            tolerance=tolerance,
+            objectives=self.objectives.fingerprint(tolerance),
+            fva=self.fva.fingerprint(tolerance),
+            reaction_deletions=self.reaction_deletions.fingerprint(tolerance),
+            gene_deletions=self.gene_deletions.fingerprint(tolerance),
+        )
+
+    def _set_fingerprints(self) -> None:
+        """Set fingerprints of the tables in the diagnostics on writing.
+
+        The diagnostics are replaced by a copy, so diagnostics shared with copies
+        of the report are not changed.
+        """
+        self._diagnostics = self._diagnostics.copy(
+            update={"fingerprints": self.fingerprints()}
+        )
+
     def to_dfs(self) -> Dict[str, pd.DataFrame]:
         """Create report DataFrames."""
 
@@ -416,124 +1169,373 @@ class FrogReport(BaseModel):
             CuratorConstants.REACTIONDELETIONS_KEY: self.reaction_deletions.to_df(),
         }
 
-    def to_tsv(self, output_dir: Path) -> None:
-        """Write Report TSV and metadata to directory."""
+    def to_tsv(
+        self,
+        output_dir: Path,
+        compression: Optional[str] = None,
+        diagnostics: bool = False,
+    ) -> None:
+        """Write Report TSV and metadata to directory.
+
+        :param compression: 'gzip' to write gzip compressed TSVs ('.tsv.gz'),
+            uncompressed if None.
+        :param diagnostics: write the diagnostics (not part of the FROG format)
+        """
+        if compression not in {None, "gzip"}:
+            raise ValueError(f"Unsupported TSV compression: '{compression}'")
         if not output_dir.exists():
             logger.warning(f"Creating results path: {output_dir}")
             output_dir.mkdir(parents=True)
 
         # write metadata file
         logger.debug(f"{output_dir / CuratorConstants.METADATA_FILENAME}")
-        with open(output_dir / CuratorConstants.METADATA_FILENAME, "w") as f_json:
-            # make a copy
-            metadata = FrogMetaData(**self.metadata.dict())
-            metadata.frog_id = f"{metadata.frog_id}_tsv"
-            f_json.write(metadata.json(indent=2))
+        with open(output_dir / CuratorConstants.METADATA_FILENAME, "w+b") as f_json:
+            self._write_tsv_metadata(f_json)
+        if diagnostics:
+            self._write_diagnostics(output_dir)
 
         # write reference files (TSV files)
-        dfs_dict = self.to_dfs()
-        for key, df in dfs_dict.items():
-            if key == CuratorConstants.OBJECTIVE_KEY:
-                filename = CuratorConstants.OBJECTIVE_FILENAME
-            elif key == CuratorConstants.FVA_KEY:
-                filename = CuratorConstants.FVA_FILENAME
-            elif key == CuratorConstants.GENEDELETIONS_KEY:
-                filename = CuratorConstants.GENEDELETIONS_FILENAME
-            elif key == CuratorConstants.REACTIONDELETIONS_KEY:
-                filename = CuratorConstants.REACTIONDELETIONS_FILENAME
-
-            df.to_csv(output_dir / filename, sep="\t", index=False, na_rep="NaN")
+        suffix = ".gz" if compression == "gzip" else ""
+        for table, filename in self._tsv_tables():
+            table.to_tsv(output_dir / f"{filename}{suffix}")
 
     @classmethod
     def from_tsv(cls, path: Path) -> FrogReport:
-        """Read fbc curation files from given directory."""
-
-        path_metadata = path / CuratorConstants.METADATA_FILENAME
-        path_objective = path / CuratorConstants.OBJECTIVE_FILENAME
-        path_fva = path / CuratorConstants.FVA_FILENAME
-        path_reaction_deletion = path / CuratorConstants.REACTIONDELETIONS_FILENAME
-        path_gene_deletion = path / CuratorConstants.GENEDELETIONS_FILENAME
-        df_dict: Dict[str, pd.DataFrame] = dict()
-
-        with open(path_metadata, "r+b") as f_json:
-            json_bytes = f_json.read()
-            df_dict[CuratorConstants.METADATA_KEY] = orjson.loads(json_bytes)
-
-        for key, path in {
-            CuratorConstants.OBJECTIVE_KEY: path_objective,
-            CuratorConstants.FVA_KEY: path_fva,
-            CuratorConstants.REACTIONDELETIONS_KEY: path_reaction_deletion,
-            CuratorConstants.GENEDELETIONS_KEY: path_gene_deletion,
-        }.items():
-            if not path.exists():
-                logger.error(f"Required file for fbc curation does not exist: '{path}'")
+        """Read fbc curation files from given directory.
+
+        Gzip compressed TSVs ('.tsv.gz') are read if the TSV does not exist.
+        """
+        with open(path / CuratorConstants.METADATA_FILENAME, "r+b") as f_json:
+            metadata = FrogMetaData(**orjson.loads(f_json.read()))
+
+        tables: Dict[str, FrogTable] = {}
+        for key, filename in [
+            ("objectives", CuratorConstants.OBJECTIVE_FILENAME),
+            ("fva", CuratorConstants.FVA_FILENAME),
+            ("reaction_deletions", CuratorConstants.REACTIONDELETIONS_FILENAME),
+            ("gene_deletions", CuratorConstants.GENEDELETIONS_FILENAME),
+        ]:
+            table_cls: Type[FrogTable] = cls.__fields__[key].type_
+            tsv_path = path / filename
+            if not tsv_path.exists() and (path / f"{filename}.gz").exists():
+                tsv_path = path / f"{filename}.gz"
+            if not tsv_path.exists():
+                logger.error(
+                    f"Required file for fbc curation does not exist: '{tsv_path}'"
+                )
+                tables[key] = table_cls.from_df(pd.DataFrame())
             else:
-                try:
-                    df_dict[key] = pd.read_csv(path, sep="\t")
-                except pd.errors.EmptyDataError:
-                    df_dict[key] = pd.DataFrame()
+                tables[key] = table_cls.from_tsv(tsv_path)
+
+        report = FrogReport(metadata=metadata, **tables)
+        report.set_diagnostics(
+            FrogDiagnostics.from_path(path / CuratorConstants.DIAGNOSTICS_FILENAME)
+        )
+        return report
+
+    def _write_tsv_metadata(self, f_json: BinaryIO) -> None:
+        """Write metadata of the TSVs as JSON to binary file object."""
+        # make a copy
+        metadata = FrogMetaData(**self.metadata.dict())
+        metadata.frog_id = f"{metadata.frog_id}_tsv"
+        f_json.write(metadata.json(indent=2).encode())
+
+    def _tsv_tables(self) -> List[Tuple[FrogTable, str]]:
+        """Get tables with TSV filenames."""
+        return [
+            (self.objectives, CuratorConstants.OBJECTIVE_FILENAME),
+            (self.fva, CuratorConstants.FVA_FILENAME),
+            (self.gene_deletions, CuratorConstants.GENEDELETIONS_FILENAME),
+            (self.reaction_deletions, CuratorConstants.REACTIONDELETIONS_FILENAME),
+        ]
+
+    def to_arrow(self, output_dir: Path, diagnostics: bool = False) -> None:
+        """Write Report tables as Arrow IPC files to directory.
+
+        The files are uncompressed for memory mapping, the metadata is stored in
+        the schema metadata of every file.
+
+        requires pyarrow
+
+        :param diagnostics: write the diagnostics (not part of the FROG format)
+        """
+        pa = _import_pyarrow()
+        if not output_dir.exists():
+            logger.warning(f"Creating results path: {output_dir}")
+            output_dir.mkdir(parents=True)
+
+        for table, filename in self._arrow_tables():
+            logger.debug(f"{output_dir / filename}")
+            with pa.OSFile(str(output_dir / filename), "wb") as sink:
+                self._write_arrow(sink, table)
+        if diagnostics:
+            self._write_diagnostics(output_dir)
+
+    def _write_diagnostics(self, output_dir: Path) -> None:
+        """Write diagnostics with the fingerprints of the tables to directory."""
+        self._set_fingerprints()
+        path = output_dir / CuratorConstants.DIAGNOSTICS_FILENAME
+        logger.debug(f"{path}")
+        with open(path, "w+b") as f_json:
+            self._diagnostics.write(f_json)
+
+    def _write_arrow(self, sink: Any, table: FrogTable) -> None:
+        """Write table as Arrow IPC file with the metadata to sink.
+
+        requires pyarrow
+
+        :param sink: Arrow output stream or binary file object.
+        """
+        pa = _import_pyarrow()
+        metadata = FrogMetaData(**self.metadata.dict())
+        metadata.frog_id = f"{metadata.frog_id}_arrow"
+        arrow_table = table.to_arrow().replace_schema_metadata(
+            {CuratorConstants.ARROW_METADATA_KEY: metadata.json()}
+        )
+        with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+
+    @staticmethod
+    def read_arrow(path: Path, columns: Optional[List[str]] = None) -> pa.Table:
+        """Read table of Arrow IPC file memory-mapped.
+
+        The columns are not copied or decoded, only the selected columns are read
+        on access, e.g. `columns=["reaction", "maximum"]` of the FVA file.
+
+        requires pyarrow
+
+        :param path: path of Arrow file of a FROG table.
+        :param columns: columns to select, all columns if None.
+        """
+        pa = _import_pyarrow()
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        return table
+
+    @classmethod
+    def from_arrow(cls, path: Path) -> FrogReport:
+        """Read Report from Arrow IPC files in directory.
 
+        requires pyarrow
+        """
+        tables: Dict[str, pa.Table] = {}
+        for key, filename in [
+            ("objectives", CuratorConstants.OBJECTIVE_ARROW_FILENAME),
+            ("fva", CuratorConstants.FVA_ARROW_FILENAME),
+            ("reaction_deletions", CuratorConstants.REACTIONDELETIONS_ARROW_FILENAME),
+            ("gene_deletions", CuratorConstants.GENEDELETIONS_ARROW_FILENAME),
+        ]:
+            tables[key] = cls.read_arrow(path / filename)
+
+        schema_metadata = tables["objectives"].schema.metadata
+        metadata = FrogMetaData.parse_raw(
+            schema_metadata[CuratorConstants.ARROW_METADATA_KEY.encode()]
+        )
         report = FrogReport(
-            metadata=FrogMetaData(**df_dict[CuratorConstants.METADATA_KEY]),
-            objectives=FrogObjectives.from_df(df_dict[CuratorConstants.OBJECTIVE_KEY]),
-            fva=FrogFVA.from_df(df_dict[CuratorConstants.FVA_KEY]),
-            reaction_deletions=FrogReactionDeletions.from_df(
-                df_dict[CuratorConstants.REACTIONDELETIONS_KEY]
-            ),
-            gene_deletions=FrogGeneDeletions.from_df(
-                df_dict[CuratorConstants.GENEDELETIONS_KEY]
-            ),
+            metadata=metadata,
+            **{
+                key: cls.__fields__[key].type_.from_arrow(table)
+                for key, table in tables.items()
+            },
+        )
+        report.set_diagnostics(
+            FrogDiagnostics.from_path(path / CuratorConstants.DIAGNOSTICS_FILENAME)
         )
         return report
 
+    def _arrow_tables(self) -> List[Tuple[FrogTable, str]]:
+        """Get tables with Arrow filenames."""
+        return [
+            (self.objectives, CuratorConstants.OBJECTIVE_ARROW_FILENAME),
+            (self.fva, CuratorConstants.FVA_ARROW_FILENAME),
+            (
+                self.reaction_deletions,
+                CuratorConstants.REACTIONDELETIONS_ARROW_FILENAME,
+            ),
+            (self.gene_deletions, CuratorConstants.GENEDELETIONS_ARROW_FILENAME),
+        ]
+
     def add_to_omex(
-        self, omex: Omex, location_prefix: str = f"./{FROG_PATH_PREFIX}/"
+        self,
+        omex: Omex,
+        location_prefix: str = f"./{FROG_PATH_PREFIX}/",
+        arrow: bool = False,
+        json: bool = True,
+        tsv: bool = True,
+        diagnostics: bool = False,
     ) -> None:
         """Add report to omex.
 
+        The files are written directly to the locations of the archive.
+
         :param omex: OMEX archive to add report to.
         :param location_prefix: prefix to where to write the FROG files in the OMEX
+        :param arrow: add tables as Arrow IPC files (requires pyarrow)
+        :param json: add report as JSON
+        :param tsv: add tables as TSVs with metadata
+        :param diagnostics: add the diagnostics (not part of the FROG format)
         """
-
-        with tempfile.TemporaryDirectory() as f_tmp:
-            tmp_path: Path = Path(f_tmp)
-
-            # write json
-            json_path = tmp_path / CuratorConstants.FROG_FILENAME
-            self.to_json(json_path)
-            omex.add_entry(
-                entry_path=json_path,
-                entry=ManifestEntry(
-                    location=f"{location_prefix}{CuratorConstants.FROG_FILENAME}",
-                    format=EntryFormat.FROG_JSON_V1,
-                ),
-            )
-
-            # write tsvs with metadata
-            self.to_tsv(tmp_path)
-            for filename, format in [
+        for entry, write in self._omex_files(
+            location_prefix, json=json, tsv=tsv, arrow=arrow, diagnostics=diagnostics
+        ):
+            if entry.location in omex.manifest:
+                omex.manifest.remove_entry_for_location(entry.location)
+            omex.manifest.add_entry(entry)
+            path = omex.get_path(entry.location)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            logger.debug(f"{path}")
+            with open(path, "w+b") as f:
+                write(f)
+
+    def _omex_files(
+        self,
+        location_prefix: str,
+        json: bool,
+        tsv: bool,
+        arrow: bool,
+        diagnostics: bool = False,
+    ) -> List[Tuple[ManifestEntry, Callable[[BinaryIO], None]]]:
+        """Get manifest entries of the FROG files with functions writing them.
+
+        The functions write the file to a binary file object.
+        """
+        if not (json or tsv or arrow):
+            raise ValueError("At least one of json, tsv or arrow must be selected.")
+        files: List[Tuple[str, str, Callable[[BinaryIO], None]]] = []
+        if json:
+            files.append(
                 (
-                    CuratorConstants.METADATA_FILENAME,
-                    EntryFormat.FROG_METADATA_V1,
+                    CuratorConstants.FROG_FILENAME,
+                    EntryFormat.FROG_JSON_V1,
+                    self._write_json,
+                )
+            )
+        if tsv:
+            tsv_formats: Dict[str, str] = {
+                CuratorConstants.OBJECTIVE_FILENAME: EntryFormat.FROG_OBJECTIVE_V1,
+                CuratorConstants.FVA_FILENAME: EntryFormat.FROG_FVA_V1,
+                CuratorConstants.REACTIONDELETIONS_FILENAME: (
+                    EntryFormat.FROG_REACTIONDELETION_V1
                 ),
-                (
-                    CuratorConstants.OBJECTIVE_FILENAME,
-                    EntryFormat.FROG_OBJECTIVE_V1,
+                CuratorConstants.GENEDELETIONS_FILENAME: (
+                    EntryFormat.FROG_GENEDELETION_V1
                 ),
-                (CuratorConstants.FVA_FILENAME, EntryFormat.FROG_FVA_V1),
+            }
+            files.append(
                 (
-                    CuratorConstants.REACTIONDELETIONS_FILENAME,
-                    EntryFormat.FROG_REACTIONDELETION_V1,
-                ),
+                    CuratorConstants.METADATA_FILENAME,
+                    EntryFormat.FROG_METADATA_V1,
+                    self._write_tsv_metadata,
+                )
+            )
+            for table, filename in self._tsv_tables():
+                files.append((filename, tsv_formats[filename], table.to_tsv))
+        if arrow:
+            _import_pyarrow()
+            for table, filename in self._arrow_tables():
+                files.append(
+                    (
+                        filename,
+                        CuratorConstants.ARROW_FORMAT,
+                        lambda f, table=table: self._write_arrow(f, table),
+                    )
+                )
+        if diagnostics:
+            self._set_fingerprints()
+            files.append(
                 (
-                    CuratorConstants.GENEDELETIONS_FILENAME,
-                    EntryFormat.FROG_GENEDELETION_V1,
-                ),
-            ]:
-                omex.add_entry(
-                    entry_path=tmp_path / filename,
-                    entry=ManifestEntry(
-                        location=f"{location_prefix}{filename}",
-                        format=format,
-                    ),
+                    CuratorConstants.DIAGNOSTICS_FILENAME,
+                    CuratorConstants.DIAGNOSTICS_FORMAT,
+                    self._diagnostics.write,
                 )
+            )
+
+        return [
+            (
+                ManifestEntry(location=f"{location_prefix}{filename}", format=format),
+                write,
+            )
+            for filename, format, write in files
+        ]
+
+
+def write_omex(
+    omex: Omex,
+    omex_path: Path,
+    reports: Dict[str, FrogReport],
+    json: bool = True,
+    tsv: bool = True,
+    arrow: bool = False,
+    diagnostics: bool = False,
+    compresslevel: Optional[int] = 9,
+) -> None:
+    """Write omex with FROG reports to path.
+
+    The reports are serialized directly into the zip entries of the archive, the
+    omex itself is not changed. Existing files at the location prefixes of the
+    reports (e.g. FROG files of a previous run) are replaced.
+
+    :param omex: OMEX archive with the model files.
+    :param omex_path: path of the OMEX to write.
+    :param reports: reports by location prefix, e.g.
+        './FROG/cobrapy/'.
+    :param json: add reports as JSON
+    :param tsv: add tables as TSVs with metadata
+    :param arrow: add tables as Arrow IPC files (requires pyarrow)
+    :param diagnostics: add the diagnostics of the reports (not part of the FROG
+        format)
+    :param compresslevel: zip deflate compression level (0-9), files are stored
+        uncompressed if None.
+    """
+    if not (json or tsv or arrow):
+        raise ValueError("At least one of json, tsv or arrow must be selected.")
+    if compresslevel is not None and not 0 <= compresslevel <= 9:
+        raise ValueError(f"compresslevel must be in [0, 9] or None: '{compresslevel}'")
+    if omex_path.exists():
+        logger.warning(f"Existing omex is overwritten: '{omex_path}'")
+
+    writers: Dict[str, Callable[[BinaryIO], None]] = {}
+    entries: List[ManifestEntry] = []
+    for location_prefix, report in reports.items():
+        for entry, write in report._omex_files(
+            location_prefix,
+            json=json,
+            tsv=tsv,
+            arrow=arrow,
+            diagnostics=diagnostics,
+        ):
+            writers[entry.location] = write
+            entries.append(entry)
+    prefixes = tuple(reports)
+    manifest = Manifest(
+        entries=[
+            e
+            for e in omex.manifest.entries
+            if not (e.location.startswith(prefixes) or e.location in writers)
+        ]
+        + entries
+    )
+
+    with zipfile.ZipFile(
+        omex_path,
+        mode="w",
+        compression=zipfile.ZIP_STORED
+        if compresslevel is None
+        else zipfile.ZIP_DEFLATED,
+        compresslevel=compresslevel,
+    ) as zf:
+        for entry in manifest.entries:
+            if entry.location == ".":
+                continue
+            # same archive names as `Omex.to_omex`, i.e., without './'
+            arcname = Path(entry.location).as_posix()
+            if entry.location == "./manifest.xml":
+                zf.writestr(arcname, manifest.to_manifest_xml())
+            elif entry.location in writers:
+                logger.debug(f"{omex_path}: {arcname}")
+                with zf.open(arcname, mode="w", force_zip64=True) as f:
+                    writers[entry.location](f)
+            else:
+                zf.write(filename=str(omex.get_path(entry.location)), arcname=arcname)
@@ -0,0 +1,128 @@
+"""Registry of in-flight FROG tasks.
+
+Identical submissions of a model (e.g. a class uploading the same model at the
+same time) attach to the running task instead of creating new work. The
+registry maps the key of the submission (see `worker.result_key`) to the id of
+the running task.
+
+With a Redis broker the registry is shared between all API processes, a key is
+claimed atomically with `SET NX` and expires after a time to live, i.e., keys of
+crashed tasks are not kept forever. Without Redis (e.g. eager execution in
+tests) the registry is local to the process and protected by a lock.
+"""
+import time
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+import redis
+from pymetadata import log
+
+
+logger = log.get_logger(__name__)
+
+# prefix of registry keys in Redis
+INFLIGHT_PREFIX: str = "frog:inflight:"
+
+
+class InflightRegistry:
+    """Registry of in-flight tasks by key."""
+
+    def __init__(self, ttl: int):
+        """Create registry.
+
+        :param ttl: time to live of keys in seconds.
+        """
+        self.ttl: int = ttl
+
+    def claim(
+        self,
+        key: str,
+        task_id: str,
+        is_finished: Callable[[str], bool] = lambda task_id: False,
+    ) -> Optional[str]:
+        """Claim key for task.
+
+        :param is_finished: check if a registered task is finished, the key of a
+            finished task is claimed (e.g. the task failed without release).
+        :return: id of the registered in-flight task or None if the key was
+            claimed for `task_id`.
+        """
+        registered = self._claim(key, task_id)
+        if registered is not None and is_finished(registered):
+            logger.warning(f"Release finished task '{registered}' for '{key}'")
+            self.release(key, registered)
+            registered = self._claim(key, task_id)
+        return registered
+
+    def release(self, key: str, task_id: str) -> None:
+        """Release key if claimed for task."""
+        raise NotImplementedError
+
+    def _claim(self, key: str, task_id: str) -> Optional[str]:
+        """Claim key atomically, get task id if already claimed."""
+        raise NotImplementedError
+
+
+class LocalInflightRegistry(InflightRegistry):
+    """Registry of in-flight tasks in this process."""
+
+    def __init__(self, ttl: int):
+        """Create registry."""
+        super().__init__(ttl=ttl)
+        self._tasks: Dict[str, Tuple[str, float]] = {}
+        self._lock = Lock()
+
+    def release(self, key: str, task_id: str) -> None:
+        """Release key if claimed for task."""
+        with self._lock:
+            if self._tasks.get(key, ("", 0.0))[0] == task_id:
+                del self._tasks[key]
+
+    def _claim(self, key: str, task_id: str) -> Optional[str]:
+        """Claim key atomically, get task id if already claimed."""
+        now = time.monotonic()
+        with self._lock:
+            registered = self._tasks.get(key)
+            if registered is not None and registered[1] > now:
+                return registered[0]
+            self._tasks[key] = (task_id, now + self.ttl)
+            return None
+
+
+class RedisInflightRegistry(InflightRegistry):
+    """Registry of in-flight tasks in Redis shared between processes."""
+
+    # delete key only if claimed for the task (atomic compare and delete)
+    _release_script: str = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) end return 0"
+    )
+
+    def __init__(self, url: str, ttl: int):
+        """Create registry for Redis at url."""
+        super().__init__(ttl=ttl)
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def release(self, key: str, task_id: str) -> None:
+        """Release key if claimed for task."""
+        self.client.eval(self._release_script, 1, f"{INFLIGHT_PREFIX}{key}", task_id)
+
+    def _claim(self, key: str, task_id: str) -> Optional[str]:
+        """Claim key atomically, get task id if already claimed."""
+        name = f"{INFLIGHT_PREFIX}{key}"
+        while not self.client.set(name, task_id, nx=True, ex=self.ttl):
+            registered: Optional[str] = self.client.get(name)
+            if registered is not None:
+                return registered
+            # expired or released in between
+        return None
+
+
+def inflight_registry(url: Optional[str], ttl: int) -> InflightRegistry:
+    """Get registry in Redis at url or local registry.
+
+    :param url: broker url, the registry is local if not a Redis url.
+    """
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisInflightRegistry(url=url, ttl=ttl)
+    return LocalInflightRegistry(ttl=ttl)
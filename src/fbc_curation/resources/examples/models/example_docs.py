@@ -17,7 +17,7 @@ def create_frog(model_path: Path, omex_path: Path) -> None:
     # compare FROG results in created COMBINE archive
     model_reports = FrogComparison.read_reports_from_omex(omex_path=omex_path)
     for _, reports in model_reports.items():
-        FrogComparison.compare_reports(reports=reports)
+        FrogComparison.compare_reports(reports=reports).print()
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ from pymetadata.console import console
 
 from fbc_curation import __citation__, __version__
 from fbc_curation.compare import FrogComparison
-from fbc_curation.worker import run_frog
+from fbc_curation.worker import MODEL_CACHE_SIZE, run_frog
 
 
 logger = log.get_logger(__name__)
@@ -44,6 +44,40 @@ def main() -> None:
         dest="output_path",
         help="(required) omex output path to write FROG",
     )
+    parser.add_option(
+        "-p",
+        "--processes",
+        action="store",
+        dest="processes",
+        type="int",
+        default=1,
+        help="(optional) number of processes for FVA and deletions",
+    )
+    parser.add_option(
+        "-w",
+        "--workers",
+        action="store",
+        dest="workers",
+        type="int",
+        default=1,
+        help="(optional) number of processes running the curators of all SBML "
+        "models concurrently",
+    )
+    parser.add_option(
+        "--cache-dir",
+        action="store",
+        dest="cache_dir",
+        help="(optional) directory for caching parsed models, repeated runs of "
+        "the same model skip SBML parsing",
+    )
+    parser.add_option(
+        "--cache-size",
+        action="store",
+        dest="cache_size",
+        type="int",
+        default=MODEL_CACHE_SIZE // 1024**2,
+        help="(optional) maximal size of the model cache in MB",
+    )
     # parser.add_option(
     #     "-r",
     #     "--reference",
@@ -96,14 +130,25 @@ def main() -> None:
     #             f"valid reference path."
     #         )
 
+    if options.processes < 1:
+        _parser_message(f"--processes '{options.processes}' must be >= 1")
+    if options.workers < 1:
+        _parser_message(f"--workers '{options.workers}' must be >= 1")
+    if options.cache_size <= 0:
+        _parser_message(f"--cache-size '{options.cache_size}' must be positive")
+
     run_frog(
         source_path=input_path,
         omex_path=output_path,
+        model_cache_dir=Path(options.cache_dir) if options.cache_dir else None,
+        model_cache_size=options.cache_size * 1024**2,
+        processes=options.processes,
+        workers=options.workers,
     )
 
     model_reports = FrogComparison.read_reports_from_omex(omex_path=output_path)
     for _, reports in model_reports.items():
-        FrogComparison.compare_reports(reports=reports)
+        FrogComparison.compare_reports(reports=reports).print()
 
 
 if __name__ == "__main__":
@@ -5,13 +5,23 @@ https://json-schema.org/
 """
 from pymetadata.console import console
 
-from fbc_curation import FROG_SCHEMA_VERSION_1
-from fbc_curation.frog import FrogReport
+from fbc_curation import (
+    FROG_COMPACT_SCHEMA_VERSION_1,
+    FROG_DIAGNOSTICS_SCHEMA_VERSION_1,
+    FROG_SCHEMA_VERSION_1,
+)
+from fbc_curation.compact import FrogCompactReport
+from fbc_curation.frog import FrogDiagnostics, FrogReport
 
 
 if __name__ == "__main__":
-    console.rule(style="white")
-    console.print(FrogReport.schema_json(indent=2))
-    console.rule(style="white")
-    with open(FROG_SCHEMA_VERSION_1, "w") as f_schema:
-        f_schema.write(FrogReport.schema_json(indent=2))
+    for model, schema_path in [
+        (FrogReport, FROG_SCHEMA_VERSION_1),
+        (FrogCompactReport, FROG_COMPACT_SCHEMA_VERSION_1),
+        (FrogDiagnostics, FROG_DIAGNOSTICS_SCHEMA_VERSION_1),
+    ]:
+        console.rule(style="white")
+        console.print(model.schema_json(indent=2))
+        console.rule(style="white")
+        with open(schema_path, "w") as f_schema:
+            f_schema.write(model.schema_json(indent=2))
@@ -2,22 +2,53 @@
 
 Here the tasks are defined which are executed in the task queue.
 """
+import hashlib
+import multiprocessing
 import os
+import shutil
 import tempfile
 import time
+from collections import defaultdict
 from pathlib import Path
-from typing import Any, Dict, Optional, Type, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union
 
-from celery import Celery
+import orjson
+from cameo import __version__ as cameo_version
+from celery import Celery, Task, chain, chord, group
+from celery.canvas import Signature
+from celery.result import AsyncResult, allow_join_result
+from celery.utils import uuid
+from cobra import __version__ as cobra_version
+from optlang import __version__ as optlang_version
+from pydantic import BaseModel
 from pymetadata import log
 from pymetadata.console import console
 from pymetadata.omex import EntryFormat, ManifestEntry, Omex
+from swiglpk import GLP_MAJOR_VERSION, GLP_MINOR_VERSION
 
-from fbc_curation import FROG_PATH_PREFIX
+from fbc_curation import FROG_PATH_PREFIX, __version__
+from fbc_curation.cache import ModelCache, ResultCache
+from fbc_curation.compact import FrogCompactReport, FrogCompactTable
 from fbc_curation.curator import Curator
 from fbc_curation.curator.cameo_curator import CuratorCameo
 from fbc_curation.curator.cobrapy_curator import CuratorCobrapy
-from fbc_curation.frog import FrogReport
+from fbc_curation.curator.session import ModelSession
+from fbc_curation.curator.shards import shard_ids
+from fbc_curation.digest import clear_digests, md5_for_path
+from fbc_curation.events import TaskEvents, task_events
+from fbc_curation.frog import (
+    CuratorConstants,
+    FrogFVA,
+    FrogGeneDeletions,
+    FrogMetaData,
+    FrogObjectives,
+    FrogReactionDeletions,
+    FrogReport,
+    FrogStageStatistics,
+    FrogTable,
+    write_omex,
+)
+from fbc_curation.inflight import InflightRegistry, inflight_registry
 
 
 logger = log.get_logger(__name__)
@@ -28,12 +59,104 @@ celery.conf.broker_url = os.environ.get("CELERY_BROKER_URL", "redis://localhost:
 celery.conf.result_backend = os.environ.get(
     "CELERY_RESULT_BACKEND", "redis://localhost:6379"
 )
+# execute tasks locally without broker (e.g. for testing)
+celery.conf.task_always_eager = os.environ.get("CELERY_TASK_ALWAYS_EAGER") == "1"
 
 # storage of data on server, only relevant for server
 FROG_STORAGE = "/frog_data"
 
+# cache of parsed models (disabled if no directory is set), the sub-tasks of
+# `frog_fanout_task` share a cache in the storage if no directory is set
+MODEL_CACHE_DIR: Optional[str] = os.environ.get("FROG_MODEL_CACHE_DIR", None)
+MODEL_CACHE_DIRNAME: str = "FROG_model_cache"
+MODEL_CACHE_SIZE: int = int(os.environ.get("FROG_MODEL_CACHE_SIZE", 2 * 1024**3))
+
+# cache of task results and OMEX (disabled if no directory is set)
+RESULT_CACHE_DIR: Optional[str] = os.environ.get("FROG_RESULT_CACHE_DIR", None)
+RESULT_CACHE_SIZE: int = int(os.environ.get("FROG_RESULT_CACHE_SIZE", 2 * 1024**3))
+
+# processes per curator for FVA and deletions
+FROG_PROCESSES: int = int(os.environ.get("FROG_PROCESSES", 1))
+
+# processes running the curators of all SBML entries concurrently, every
+# process can start `FROG_PROCESSES` processes in addition (opt-in, pools of
+# concurrent celery workers multiply)
+FROG_WORKERS: int = int(os.environ.get("FROG_WORKERS", 1))
+
+# knockouts per deletion sub-task in `frog_fanout_task` (adapted to model if unset)
+FROG_SHARD_SIZE: Optional[int] = (
+    int(os.environ["FROG_SHARD_SIZE"]) if os.environ.get("FROG_SHARD_SIZE") else None
+)
+
+# reports in task results in the compact FROG format
+FROG_COMPACT_RESULTS: bool = os.environ.get("FROG_COMPACT_RESULTS") == "1"
+
+# location of SBML sources from temporary files (e.g. uploads) in the archive,
+# the file names of temporary files are random
+TEMPORARY_SBML_LOCATION: str = "./model.xml"
+
+# FROG files in the OMEX, comma separated subset of 'json', 'tsv' and 'arrow',
+# 'diagnostics' adds the solver statistics (not part of the FROG format)
+FROG_OMEX_FILES: List[str] = os.environ.get("FROG_OMEX_FILES", "json,tsv").split(",")
+
+# zip compression level of the OMEX (0-9), uncompressed if 'stored'
+FROG_OMEX_COMPRESSLEVEL: Optional[int] = (
+    None
+    if os.environ.get("FROG_OMEX_COMPRESSLEVEL") == "stored"
+    else int(os.environ.get("FROG_OMEX_COMPRESSLEVEL", 9))
+)
+
+# time to live of in-flight submissions in seconds (see `frog_submit`)
+FROG_INFLIGHT_TTL: int = int(os.environ.get("FROG_INFLIGHT_TTL", 2 * 3600))
+
+# seconds the progress events of a task are kept for late subscribers
+FROG_EVENTS_TTL: int = int(os.environ.get("FROG_EVENTS_TTL", 2 * 3600))
+
+# celery states of finished tasks
+FINISHED_STATES: Set[str] = {"SUCCESS", "FAILURE", "REVOKED"}
+
+CURATOR_KEYS: List[str] = ["cobrapy", "cameo"]
 
-def run_frog(source_path: Path, omex_path: Path) -> None:
+# versions of software and solver, part of the key of cached results
+SOFTWARE_VERSIONS: Dict[str, str] = {
+    "fbc_curation": __version__,
+    "cobrapy": cobra_version,
+    "cameo": cameo_version,
+    "optlang": optlang_version,
+    "glpk": f"{GLP_MAJOR_VERSION}.{GLP_MINOR_VERSION}",
+}
+
+# stages of a curator which run as chained sub-tasks in `frog_fanout_task`
+FROG_STAGES: List[str] = [
+    CuratorConstants.METADATA_KEY,
+    CuratorConstants.OBJECTIVE_KEY,
+    CuratorConstants.FVA_KEY,
+    CuratorConstants.REACTIONDELETIONS_KEY,
+    CuratorConstants.GENEDELETIONS_KEY,
+]
+
+# report sections of the stages
+STAGE_CLASSES: Dict[str, Type[BaseModel]] = {
+    CuratorConstants.METADATA_KEY: FrogMetaData,
+    CuratorConstants.OBJECTIVE_KEY: FrogObjectives,
+    CuratorConstants.FVA_KEY: FrogFVA,
+    CuratorConstants.REACTIONDELETIONS_KEY: FrogReactionDeletions,
+    CuratorConstants.GENEDELETIONS_KEY: FrogGeneDeletions,
+}
+
+
+def run_frog(
+    source_path: Path,
+    omex_path: Path,
+    model_cache_dir: Optional[Path] = None,
+    model_cache_size: int = MODEL_CACHE_SIZE,
+    processes: int = 1,
+    workers: int = 1,
+    omex_files: List[str] = FROG_OMEX_FILES,
+    omex_compresslevel: Optional[int] = FROG_OMEX_COMPRESSLEVEL,
+    result_cache_dir: Optional[Path] = None,
+    use_result_cache: bool = True,
+) -> None:
     """Create FROG report for given SBML or OMEX source.
 
     This function creates the FROG report and stores the results with the
@@ -43,10 +166,29 @@ def run_frog(source_path: Path, omex_path: Path) -> None:
       (omex) which contains an SBML model.
     :param omex_path: Path for COMBINE archive (omex) with FROG results. The content
       of the file will be overwritten!
+    :param model_cache_dir: Optional directory for caching parsed models.
+    :param model_cache_size: Maximal size of the model cache in bytes.
+    :param processes: Number of processes for FVA and deletions.
+    :param workers: Number of processes running curators concurrently.
+    :param omex_files: FROG files in the archive, subset of 'json', 'tsv' and
+        'arrow', with the diagnostics of the reports for 'diagnostics'.
+    :param omex_compresslevel: zip compression level of the archive (0-9),
+        uncompressed if None.
+    :param result_cache_dir: Optional directory for caching FROG results.
+    :param use_result_cache: Use cached result, a fresh result replaces the
+        cached result if False.
     """
     frog_task(
         source_path_str=str(source_path),
         omex_path_str=str(omex_path),
+        model_cache_dir_str=str(model_cache_dir) if model_cache_dir else None,
+        model_cache_size=model_cache_size,
+        processes=processes,
+        workers=workers,
+        omex_files=omex_files,
+        omex_compresslevel=omex_compresslevel,
+        result_cache_dir_str=str(result_cache_dir) if result_cache_dir else None,
+        use_result_cache=use_result_cache,
     )
 
 
@@ -56,6 +198,16 @@ def frog_task(
     input_is_temporary: bool = False,
     omex_path_str: Optional[str] = None,
     frog_storage_path_str: str = FROG_STORAGE,
+    model_cache_dir_str: Optional[str] = MODEL_CACHE_DIR,
+    model_cache_size: int = MODEL_CACHE_SIZE,
+    processes: int = FROG_PROCESSES,
+    workers: int = FROG_WORKERS,
+    compact: bool = FROG_COMPACT_RESULTS,
+    omex_files: List[str] = FROG_OMEX_FILES,
+    omex_compresslevel: Optional[int] = FROG_OMEX_COMPRESSLEVEL,
+    result_cache_dir_str: Optional[str] = RESULT_CACHE_DIR,
+    result_cache_size: int = RESULT_CACHE_SIZE,
+    use_result_cache: bool = True,
 ) -> Dict[str, Any]:
     """Run FROG task and create JSON for omex path.
 
@@ -65,85 +217,1062 @@ def frog_task(
     :param omex_path_str: Path to OMEX for results. In the celery context 'None' should
         be used and the path is created from the task id.
     :param input_is_temporary: Boolean flag if the input is temporary and will be
-        deleted after execution of FROG.
+        deleted after execution of FROG. An SBML input is added to the archive at
+        `TEMPORARY_SBML_LOCATION`.
+    :param model_cache_dir_str: Directory of the model cache, no caching if 'None'.
+    :param model_cache_size: Maximal size of the model cache in bytes.
+    :param processes: Number of processes for FVA and deletions.
+    :param workers: Number of processes running the curators of all SBML entries
+        concurrently. Reports are added to the archive in a stable order.
+    :param compact: Return the reports in the compact FROG format
+        (`FrogCompactReport`).
+    :param omex_files: FROG files in the archive, subset of 'json', 'tsv' and
+        'arrow', with the diagnostics of the reports for 'diagnostics'.
+    :param omex_compresslevel: zip compression level of the archive (0-9),
+        uncompressed if None.
+    :param result_cache_dir_str: Directory of the result cache, no caching if
+        'None'. Results are cached by model content, curators, software and
+        solver versions and output options (see `result_key`).
+    :param result_cache_size: Maximal size of the result cache in bytes.
+    :param use_result_cache: Return the cached result (and OMEX) if available,
+        a fresh result replaces the cached result if False.
     """
     logger.info(f"Loading '{source_path_str}'")
+    model_cache = _model_cache(model_cache_dir_str, model_cache_size)
+    result_cache = _result_cache(result_cache_dir_str, result_cache_size)
 
     try:
-        omex_path = Path(source_path_str)
-        if not omex_path.exists():
-            raise IOError(f"Path does not exist: '{omex_path}'")
-        if not omex_path.is_file():
-            raise IOError(f"Path is not a file: '{omex_path}'")
+        omex_path = _omex_path(
+            task_id=frog_task.request.id,
+            omex_path_str=omex_path_str,
+            frog_storage_path_str=frog_storage_path_str,
+        )
+        key: Optional[str] = None
+        if result_cache:
+            key = result_key(
+                Path(source_path_str),
+                compact=compact,
+                omex_files=omex_files,
+                omex_compresslevel=omex_compresslevel,
+                input_is_temporary=input_is_temporary,
+            )
+            if use_result_cache:
+                cached = result_cache.get(key, omex_path=omex_path)
+                if cached is not None:
+                    return cached
 
-        # move data for task
+        omex = _read_omex(Path(source_path_str), input_is_temporary=input_is_temporary)
 
-        if Omex.is_omex(omex_path):
-            omex = Omex().from_omex(omex_path)
-        else:
-            # Path is SBML we create a new archive
-            omex = Omex()
-            omex.add_entry(
-                entry_path=omex_path,
-                entry=ManifestEntry(
-                    location=f"./{omex_path.name}", format=EntryFormat.SBML, master=True
-                ),
+        # FROG for all SBML files and curators
+        # TODO: check that SBML model with FBC information
+        locations: List[str] = _sbml_locations(omex)
+        jobs: List[Tuple[Path, str, str]] = [
+            (omex.get_path(location), curator_key, location)
+            for location in locations
+            for curator_key in CURATOR_KEYS
+        ]
+        reports: List[FrogReport] = _frog_reports(
+            jobs, model_cache=model_cache, processes=processes, workers=workers
+        )
+        content = _reports_content(
+            omex, locations=locations, reports=reports, compact=compact
+        )
+
+        # save archive for download
+        console.rule("Write OMEX", style="white")
+        _write_omex(
+            omex,
+            omex_path=omex_path,
+            locations=locations,
+            reports=reports,
+            omex_files=omex_files,
+            omex_compresslevel=omex_compresslevel,
+        )
+        if result_cache and key:
+            result_cache.put(key, content, omex_path=omex_path)
+
+    finally:
+        # cleanup temporary files for celery
+        if input_is_temporary:
+            os.remove(source_path_str)
+        clear_digests()
+
+    return content
+
+
+class _CompleteEventTask(Task):
+    """Task publishing the complete event after its result is stored.
+
+    Clients query the task status when the complete event is received, so the
+    event is published in the handlers called after the result (or error) is
+    stored in the backend. The event is published for the `progress_task_id`
+    argument, or for the task itself if the task has no such argument.
+    """
+
+    # publish complete event on success, not for sub-tasks finishing a stage
+    complete_on_success: bool = True
+
+    def on_success(
+        self, retval: Any, task_id: str, args: Tuple, kwargs: Dict[str, Any]
+    ) -> None:
+        """Publish complete event after the result is stored."""
+        if self.complete_on_success:
+            _publish_event(
+                "complete",
+                kwargs.get("progress_task_id", task_id),
+                task_status="SUCCESS",
             )
 
-        content = {"manifest": omex.manifest.dict(), "frogs": {}}
+    def on_failure(
+        self,
+        exc: Exception,
+        task_id: str,
+        args: Tuple,
+        kwargs: Dict[str, Any],
+        einfo: Any,
+    ) -> None:
+        """Publish complete event after the error is stored."""
+        _publish_event(
+            "complete",
+            kwargs.get("progress_task_id", task_id),
+            task_status="FAILURE",
+            error=str(exc),
+        )
 
-        # Add FROG JSON for all SBML files
-        entry: ManifestEntry
-        for entry in omex.manifest.entries:
-            if entry.is_sbml():
-                # TODO: check that SBML model with FBC information
 
-                report_dict = {}
-                for curator_key in ["cobrapy", "cameo"]:
-                    sbml_path: Path = omex.get_path(entry.location)
-                    report: FrogReport = _frog_for_sbml(
-                        source=sbml_path, curator_key=curator_key
-                    )
+@celery.task(name="frog_fanout_task", bind=True, base=_CompleteEventTask)
+def frog_fanout_task(
+    self: Task,
+    source_path_str: str,
+    input_is_temporary: bool = False,
+    omex_path_str: Optional[str] = None,
+    frog_storage_path_str: str = FROG_STORAGE,
+    model_cache_dir_str: Optional[str] = MODEL_CACHE_DIR,
+    model_cache_size: int = MODEL_CACHE_SIZE,
+    processes: int = FROG_PROCESSES,
+    shard_size: Optional[int] = FROG_SHARD_SIZE,
+    compact: bool = FROG_COMPACT_RESULTS,
+    omex_files: List[str] = FROG_OMEX_FILES,
+    omex_compresslevel: Optional[int] = FROG_OMEX_COMPRESSLEVEL,
+    result_cache_dir_str: Optional[str] = RESULT_CACHE_DIR,
+    result_cache_size: int = RESULT_CACHE_SIZE,
+    use_result_cache: bool = True,
+    inflight_key: Optional[str] = None,
+) -> Any:
+    """Run FROG task as Celery sub-tasks.
 
-                    # add FROG files to archive
-                    report.add_to_omex(
-                        omex, location_prefix=f"./{FROG_PATH_PREFIX}/{curator_key}/"
-                    )
+    The task is replaced by a chord with a chain of `frog_stage_task` per (SBML
+    entry, curator) and the `frog_merge_task`, which assembles the reports and
+    writes the OMEX. The result is the result of the merge task (the same as for
+    `frog_task`), the status is aggregated over the sub-tasks (see `task_status`).
+    The sub-tasks publish progress events with the id of this task (see
+    `events.TaskEvents`).
 
-                    # add JSON to response
-                    report_dict[curator_key] = report.dict()
+    The stages of a curator are chained and pass their results along, i.e., the
+    FVA prunes the reaction deletions, the objectives and reaction deletions are
+    reused by the gene deletions (see `Curator.run`). The chains run in
+    parallel, within a chain only the shards of a stage. The SBML entries are
+    extracted to a working directory in `frog_storage_path_str` which must be
+    shared between the workers.
 
-                # store all reports for SBML entry
-                content["frogs"][entry.location] = report_dict
+    :param model_cache_dir_str: Directory of the model cache shared by the
+        sub-tasks, 'FROG_model_cache' in `frog_storage_path_str` if 'None'.
+    :param shard_size: Number of knockouts per deletion sub-task, adapted to the
+        model size if 'None'. Deletion stages with multiple shards are split in
+        one sub-task per shard of contiguous ID ranges.
+    :param compact: Return the reports in the compact FROG format.
+    :param omex_files: FROG files in the archive (see `frog_task`).
+    :param omex_compresslevel: zip compression level of the archive (see
+        `frog_task`).
+    :param result_cache_dir_str: Directory of the result cache (see `frog_task`),
+        the result is cached by the merge task.
+    :param result_cache_size: Maximal size of the result cache in bytes.
+    :param use_result_cache: Return the cached result if available, no sub-tasks
+        are created.
+    :param inflight_key: Key of the submission in the in-flight registry,
+        released by the merge task (see `frog_submit`).
+    """
+    task_id: Optional[str] = self.request.id
+    omex_path: Path = _omex_path(
+        task_id=task_id,
+        omex_path_str=omex_path_str,
+        frog_storage_path_str=frog_storage_path_str,
+    )
+    work_dir: Path = Path(frog_storage_path_str) / f"FROG_{task_id}_work"
 
-        # save archive for download
-        task_id = frog_task.request.id
-        if (not task_id) and (not omex_path_str):
-            raise ValueError(
-                "The 'omex_path_str' argument must be set (if not executed "
-                "within a celery Task)."
+    logger.info(f"Loading '{source_path_str}'")
+    result_cache = _result_cache(result_cache_dir_str, result_cache_size)
+    key: Optional[str] = None
+    try:
+        if result_cache:
+            key = result_key(
+                Path(source_path_str),
+                compact=compact,
+                omex_files=omex_files,
+                omex_compresslevel=omex_compresslevel,
+                input_is_temporary=input_is_temporary,
             )
-        if omex_path_str is None:
-            # executed in task queue
-            # FIXME: ensure that files are removed from time to time
-            omex_path = Path(frog_storage_path_str) / f"FROG_{task_id}.omex"
-        else:
-            omex_path = Path(omex_path_str)
-        console.rule("Write OMEX", style="white")
-        omex.to_omex(omex_path=omex_path)
+            if use_result_cache:
+                cached = result_cache.get(key, omex_path=omex_path)
+                if cached is not None:
+                    _release_inflight(inflight_key, task_id)
+                    return cached
 
+        omex = _read_omex(Path(source_path_str), input_is_temporary=input_is_temporary)
+        omex.to_directory(work_dir)
+    except Exception:
+        _release_inflight(inflight_key, task_id)
+        raise
     finally:
-        # cleanup temporary files for celery
         if input_is_temporary:
             os.remove(source_path_str)
 
+    if model_cache_dir_str is None:
+        model_cache_dir_str = str(Path(frog_storage_path_str) / MODEL_CACHE_DIRNAME)
+    model_cache = _model_cache(model_cache_dir_str, model_cache_size)
+    stage_tasks: List[Signature] = []
+    curator_chains: List[Signature] = []
+    for location in _sbml_locations(omex):
+        shards = _stage_shards(
+            work_dir / location, model_cache=model_cache, size=shard_size
+        )
+        for curator_key in CURATOR_KEYS:
+            steps: List[Signature] = []
+            for stage in FROG_STAGES:
+                # results of the preceding stage are passed by the chain
+                preceding: Tuple[Any, ...] = () if steps else ([],)
+                shard_tasks: List[Signature] = [
+                    frog_stage_task.s(
+                        *preceding,
+                        str(work_dir / location),
+                        location=location,
+                        curator_key=curator_key,
+                        stage=stage,
+                        model_cache_dir_str=model_cache_dir_str,
+                        model_cache_size=model_cache_size,
+                        processes=processes,
+                        ids=ids,
+                        shard=k,
+                        shards=len(shards[stage]),
+                        progress_task_id=task_id,
+                    )
+                    for k, ids in enumerate(shards[stage])
+                ]
+                for signature in shard_tasks:
+                    signature.freeze()
+                stage_tasks.extend(shard_tasks)
+                steps.append(
+                    shard_tasks[0] if len(shard_tasks) == 1 else group(shard_tasks)
+                )
+            curator_chains.append(chain(steps))
+    workflow = chord(
+        curator_chains,
+        frog_merge_task.s(
+            work_dir_str=str(work_dir),
+            omex_path_str=str(omex_path),
+            compact=compact,
+            omex_files=omex_files,
+            omex_compresslevel=omex_compresslevel,
+            result_cache_dir_str=result_cache_dir_str if key else None,
+            result_cache_size=result_cache_size,
+            result_key_str=key,
+            inflight_key=inflight_key,
+            inflight_task_id=task_id,
+            # the eager task publishes the complete event with its own result
+            progress_task_id=None if self.request.is_eager else task_id,
+        ),
+    )
+    _publish_event("start", task_id, total=len(stage_tasks))
+    if self.request.is_eager:
+        # executed locally (e.g. testing), sub-tasks run in this process
+        try:
+            with allow_join_result():
+                return workflow.apply().get()
+        finally:
+            _release_inflight(inflight_key, task_id)
+
+    self.update_state(
+        state="PROGRESS",
+        meta={"subtasks": [signature.id for signature in stage_tasks]},
+    )
+    return self.replace(workflow)
+
+
+@celery.task(name="frog_stage_task", base=_CompleteEventTask, complete_on_success=False)
+def frog_stage_task(
+    preceding_results: List[Any],
+    sbml_path_str: str,
+    location: str,
+    curator_key: str,
+    stage: str,
+    model_cache_dir_str: Optional[str] = MODEL_CACHE_DIR,
+    model_cache_size: int = MODEL_CACHE_SIZE,
+    processes: int = FROG_PROCESSES,
+    ids: Optional[List[str]] = None,
+    shard: int = 0,
+    shards: int = 1,
+    progress_task_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run a single FROG stage of a curator for an SBML entry.
+
+    The stages of a curator are chained, i.e., the results of the preceding
+    stages are passed on and reused (see `frog_fanout_task`).
+
+    :param preceding_results: results of the preceding stages of the curator,
+        nested lists after a stage with multiple shards.
+    :param stage: stage key, one of `FROG_STAGES`.
+    :param ids: reaction or gene ids of the shard for deletion stages, all ids
+        if None.
+    :param shard: index of the shard.
+    :param shards: number of shards of the stage.
+    :param progress_task_id: id of the task the progress event of the finished
+        stage (and the complete event on failure) is published for (see
+        `frog_fanout_task`), no event if None.
+    :return: JSON of the preceding results (passed on by the first shard) and of
+        the stage result with solver statistics. Tables are in the compact format
+        (`FrogCompactTable`).
+    """
+    preceding: List[Dict[str, Any]] = _flatten_stage_results(preceding_results)
+    stage_result = _run_stage(
+        sbml_path_str,
+        location=location,
+        curator_key=curator_key,
+        stage=stage,
+        model_cache_dir_str=model_cache_dir_str,
+        model_cache_size=model_cache_size,
+        processes=processes,
+        ids=ids,
+        shard=shard,
+        shards=shards,
+        preceding=_stage_results_by_stage(preceding),
+    )
+
+    _publish_event(
+        "stage_done",
+        progress_task_id,
+        location=location,
+        curator=curator_key,
+        stage=stage,
+        shard=shard,
+        shards=shards,
+    )
+    # shards of a stage share the preceding results
+    return (preceding if shard == 0 else []) + [stage_result]
+
+
+def _run_stage(
+    sbml_path_str: str,
+    location: str,
+    curator_key: str,
+    stage: str,
+    model_cache_dir_str: Optional[str],
+    model_cache_size: int,
+    processes: int,
+    ids: Optional[List[str]],
+    shard: int,
+    shards: int,
+    preceding: Dict[str, List[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """Run stage of a curator, see `frog_stage_task`.
+
+    :param preceding: results of the preceding stages by stage.
+    """
+    curator = _curator_for_sbml(
+        sbml_path=Path(sbml_path_str),
+        curator_key=curator_key,
+        model_cache=_model_cache(model_cache_dir_str, model_cache_size),
+        processes=processes,
+        model_location=location,
+    )
+    logger.info(f"* {stage}: {curator_key} '{location}'")
+    result: BaseModel
+    if stage == CuratorConstants.METADATA_KEY:
+        result = curator.set_metadata()
+    elif stage == CuratorConstants.OBJECTIVE_KEY:
+        result = curator.objectives()
+    elif stage == CuratorConstants.FVA_KEY:
+        result = curator.fva()
+    elif stage == CuratorConstants.REACTIONDELETIONS_KEY:
+        sections = _stage_sections(preceding, stages=[CuratorConstants.FVA_KEY])
+        result = curator.reaction_deletions(
+            fva=sections[CuratorConstants.FVA_KEY],  # type: ignore
+            reaction_ids=ids,
+        )
+    elif stage == CuratorConstants.GENEDELETIONS_KEY:
+        sections = _stage_sections(
+            preceding,
+            stages=[
+                CuratorConstants.OBJECTIVE_KEY,
+                CuratorConstants.REACTIONDELETIONS_KEY,
+            ],
+        )
+        result = curator.gene_deletions(
+            objectives=sections[CuratorConstants.OBJECTIVE_KEY],  # type: ignore
+            reaction_deletions=sections[  # type: ignore
+                CuratorConstants.REACTIONDELETIONS_KEY
+            ],
+            gene_ids=ids,
+        )
+    else:
+        raise ValueError(f"Unsupported stage: {stage}")
+
+    if isinstance(result, FrogTable):
+        result = FrogCompactTable.from_table(result)
+    return {
+        "location": location,
+        "curator": curator_key,
+        "stage": stage,
+        "ids": ids,
+        "shard": shard,
+        "shards": shards,
+        "result": result.dict(by_alias=True),
+        "statistics": {k: v.dict() for k, v in curator.statistics.items()},
+    }
+
+
+@celery.task(name="frog_merge_task", base=_CompleteEventTask)
+def frog_merge_task(
+    stage_results: List[Any],
+    work_dir_str: str,
+    omex_path_str: str,
+    compact: bool = FROG_COMPACT_RESULTS,
+    omex_files: List[str] = FROG_OMEX_FILES,
+    omex_compresslevel: Optional[int] = FROG_OMEX_COMPRESSLEVEL,
+    result_cache_dir_str: Optional[str] = None,
+    result_cache_size: int = RESULT_CACHE_SIZE,
+    result_key_str: Optional[str] = None,
+    inflight_key: Optional[str] = None,
+    inflight_task_id: Optional[str] = None,
+    progress_task_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Merge the stage results into reports and write the OMEX.
+
+    :param stage_results: results of the chains of `frog_stage_task` sub-tasks.
+    :param work_dir_str: working directory with the extracted archive, removed
+        after the OMEX is written.
+    :param compact: Return the reports in the compact FROG format.
+    :param omex_files: FROG files in the archive (see `frog_task`).
+    :param omex_compresslevel: zip compression level of the archive (see
+        `frog_task`).
+    :param result_cache_dir_str: Directory of the result cache, the result is
+        cached with `result_key_str` (see `frog_fanout_task`).
+    :param result_cache_size: Maximal size of the result cache in bytes.
+    :param result_key_str: Key of the result in the result cache.
+    :param inflight_key: Key of the submission in the in-flight registry,
+        released for `inflight_task_id` after the merge.
+    :param progress_task_id: id of the task the completion event is published
+        for after the result is stored (see `frog_fanout_task`), no event if None.
+    :return: manifest and reports as JSON (see `frog_task`).
+    """
+    try:
+        return _merge_stage_results(
+            stage_results,
+            work_dir=Path(work_dir_str),
+            omex_path=Path(omex_path_str),
+            compact=compact,
+            omex_files=omex_files,
+            omex_compresslevel=omex_compresslevel,
+            result_cache=_result_cache(result_cache_dir_str, result_cache_size),
+            result_key_str=result_key_str,
+        )
+    finally:
+        _release_inflight(inflight_key, inflight_task_id)
+
+
+def _merge_stage_results(
+    stage_results: List[Any],
+    work_dir: Path,
+    omex_path: Path,
+    compact: bool,
+    omex_files: List[str],
+    omex_compresslevel: Optional[int],
+    result_cache: Optional[ResultCache],
+    result_key_str: Optional[str],
+) -> Dict[str, Any]:
+    """Merge stage results, write the OMEX and cache the result."""
+    results: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+    for stage_result in _flatten_stage_results(stage_results):
+        key = (stage_result["location"], stage_result["curator"])
+        results[key].append(stage_result)
+
+    omex = Omex.from_directory(work_dir)
+    locations = _sbml_locations(omex)
+    reports: List[FrogReport] = [
+        _report_from_stage_results(
+            _stage_results_by_stage(results[(location, curator_key)])
+        )
+        for location in locations
+        for curator_key in CURATOR_KEYS
+    ]
+    content = _reports_content(
+        omex, locations=locations, reports=reports, compact=compact
+    )
+
+    console.rule("Write OMEX", style="white")
+    _write_omex(
+        omex,
+        omex_path=omex_path,
+        locations=locations,
+        reports=reports,
+        omex_files=omex_files,
+        omex_compresslevel=omex_compresslevel,
+    )
+    if result_cache and result_key_str:
+        result_cache.put(result_key_str, content, omex_path=omex_path)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    clear_digests()
+
     return content
 
 
-def _frog_for_sbml(source: Union[Path, str, bytes], curator_key: str) -> FrogReport:
+def task_status(task_id: str) -> Dict[str, Any]:
+    """Get status and result of a FROG task.
+
+    For a `frog_fanout_task` the status is aggregated over its sub-tasks: the
+    task is 'FAILURE' if a sub-task failed, otherwise 'PROGRESS' with the number
+    of finished sub-tasks until the merge task succeeded.
+    """
+    task_result = AsyncResult(task_id, app=celery)
+    status: str = task_result.status
+    result: Any = task_result.result
+    if status == "PROGRESS" and isinstance(result, dict) and "subtasks" in result:
+        subtask_results = [
+            AsyncResult(subtask_id, app=celery) for subtask_id in result["subtasks"]
+        ]
+        failed = [r for r in subtask_results if r.status == "FAILURE"]
+        if failed:
+            status = "FAILURE"
+            result = {"errors": [str(r.result) for r in failed]}
+        else:
+            result = {
+                "done": sum(1 for r in subtask_results if r.status == "SUCCESS"),
+                "total": len(subtask_results),
+            }
+
+    return {
+        "task_id": task_id,
+        "task_status": status,
+        "task_result": result,
+    }
+
+
+def frog_submit(
+    source_path_str: str,
+    compact: bool = FROG_COMPACT_RESULTS,
+    omex_files: List[str] = FROG_OMEX_FILES,
+    omex_compresslevel: Optional[int] = FROG_OMEX_COMPRESSLEVEL,
+) -> str:
+    """Submit `frog_fanout_task` for a temporary source file.
+
+    Identical submissions (see `result_key`) attach to the in-flight task, i.e.,
+    the id of the running task is returned and the source is removed. Otherwise
+    the source is removed by the task. The result cache is not checked (see
+    `frog_from_cache`).
+
+    :return: id of the task.
+    """
+    key = result_key(
+        Path(source_path_str),
+        compact=compact,
+        omex_files=omex_files,
+        omex_compresslevel=omex_compresslevel,
+        input_is_temporary=True,
+    )
+    task_id: str = uuid()
+    registry = _inflight_registry()
+    registered = registry.claim(key, task_id, is_finished=_is_finished)
+    if registered is not None:
+        logger.info(f"Attach to in-flight task '{registered}'")
+        os.remove(source_path_str)
+        return registered
+
+    try:
+        frog_fanout_task.apply_async(
+            args=(source_path_str,),
+            kwargs=dict(
+                input_is_temporary=True,
+                compact=compact,
+                omex_files=omex_files,
+                omex_compresslevel=omex_compresslevel,
+                use_result_cache=False,
+                inflight_key=key,
+            ),
+            task_id=task_id,
+        )
+    except Exception:
+        registry.release(key, task_id)
+        raise
+    return task_id
+
+
+def frog_from_cache(
+    source_path_str: str,
+    compact: bool = FROG_COMPACT_RESULTS,
+    omex_files: List[str] = FROG_OMEX_FILES,
+    omex_compresslevel: Optional[int] = FROG_OMEX_COMPRESSLEVEL,
+    frog_storage_path_str: str = FROG_STORAGE,
+    result_cache_dir_str: Optional[str] = RESULT_CACHE_DIR,
+    result_cache_size: int = RESULT_CACHE_SIZE,
+    input_is_temporary: bool = True,
+) -> Optional[str]:
+    """Get finished FROG task for the cached result of the source.
+
+    No task is executed. The cached result is stored as result of a new task id
+    and the OMEX is copied to the storage, i.e., status and OMEX are available
+    as for an executed task.
+
+    :param input_is_temporary: Boolean flag if the source is a temporary file
+        (see `frog_submit`), i.e. an SBML source is at `TEMPORARY_SBML_LOCATION`
+        in the archive.
+    :return: id of the finished task, None if no result is cached.
+    """
+    result_cache = _result_cache(result_cache_dir_str, result_cache_size)
+    if not result_cache:
+        return None
+    key = result_key(
+        Path(source_path_str),
+        compact=compact,
+        omex_files=omex_files,
+        omex_compresslevel=omex_compresslevel,
+        input_is_temporary=input_is_temporary,
+    )
+    task_id: str = uuid()
+    content = result_cache.get(
+        key,
+        omex_path=_omex_path(
+            task_id=task_id,
+            omex_path_str=None,
+            frog_storage_path_str=frog_storage_path_str,
+        ),
+    )
+    if content is None:
+        return None
+    celery.backend.store_result(task_id, content, "SUCCESS")
+    return task_id
+
+
+def result_key(
+    source_path: Path,
+    compact: bool = FROG_COMPACT_RESULTS,
+    omex_files: List[str] = FROG_OMEX_FILES,
+    omex_compresslevel: Optional[int] = FROG_OMEX_COMPRESSLEVEL,
+    input_is_temporary: bool = False,
+) -> str:
+    """Get key of the FROG result for an SBML or OMEX source in the result cache.
+
+    The key is the digest of the file content, the location of an SBML source in
+    the archive, the curators, the software and solver versions
+    (`SOFTWARE_VERSIONS`) and the options of the task result and OMEX. The
+    locations of the SBML entries of an OMEX source are part of its content.
+
+    :param input_is_temporary: Boolean flag if the source is a temporary file
+        (see `_read_omex`).
+    """
+    data = orjson.dumps(
+        {
+            "md5": md5_for_path(source_path),
+            "location": None
+            if Omex.is_omex(source_path)
+            else _sbml_location(source_path, input_is_temporary=input_is_temporary),
+            "curators": CURATOR_KEYS,
+            "versions": SOFTWARE_VERSIONS,
+            "compact": compact,
+            "omex_files": sorted(omex_files),
+            "omex_compresslevel": omex_compresslevel,
+        }
+    )
+    return hashlib.sha256(data).hexdigest()
+
+
+_inflight: Optional[InflightRegistry] = None
+
+
+def _inflight_registry() -> InflightRegistry:
+    """Get registry of in-flight tasks.
+
+    The registry is shared via the Redis broker, local to the process for eager
+    execution or other brokers.
+    """
+    global _inflight
+    if _inflight is None:
+        _inflight = inflight_registry(
+            url=None if celery.conf.task_always_eager else celery.conf.broker_url,
+            ttl=FROG_INFLIGHT_TTL,
+        )
+    return _inflight
+
+
+def _release_inflight(key: Optional[str], task_id: Optional[str]) -> None:
+    """Release in-flight submission of task, errors are only logged."""
+    if not (key and task_id):
+        return
+    try:
+        _inflight_registry().release(key, task_id)
+    except Exception as err:
+        logger.error(f"In-flight task '{task_id}' not released: {err}")
+
+
+_events: Optional[TaskEvents] = None
+
+
+def progress_events() -> TaskEvents:
+    """Get progress events of tasks.
+
+    Events are published via the Redis broker, local to the process for eager
+    execution or other brokers.
+    """
+    global _events
+    if _events is None:
+        _events = task_events(
+            url=None if celery.conf.task_always_eager else celery.conf.broker_url,
+            ttl=FROG_EVENTS_TTL,
+        )
+    return _events
+
+
+def _publish_event(kind: str, task_id: Optional[str], **info: Any) -> None:
+    """Publish progress event of task, errors are only logged.
+
+    :param kind: 'start', 'stage_done' or 'complete' (see `events.TaskEvents`).
+    """
+    if not task_id:
+        return
+    try:
+        getattr(progress_events(), kind)(task_id, **info)
+    except Exception as err:
+        logger.error(f"Event '{kind}' of task '{task_id}' not published: {err}")
+
+
+def _is_finished(task_id: str) -> bool:
+    """Check if task is finished, e.g. failed without release."""
+    return task_status(task_id)["task_status"] in FINISHED_STATES
+
+
+def _model_cache(
+    model_cache_dir_str: Optional[str], model_cache_size: int
+) -> Optional[ModelCache]:
+    """Get model cache for directory, no caching if 'None'."""
+    if not model_cache_dir_str:
+        return None
+    return ModelCache(cache_dir=Path(model_cache_dir_str), max_size=model_cache_size)
+
+
+def _result_cache(
+    result_cache_dir_str: Optional[str], result_cache_size: int
+) -> Optional[ResultCache]:
+    """Get result cache for directory, no caching if 'None'."""
+    if not result_cache_dir_str:
+        return None
+    return ResultCache(cache_dir=Path(result_cache_dir_str), max_size=result_cache_size)
+
+
+def _read_omex(source_path: Path, input_is_temporary: bool = False) -> Omex:
+    """Read COMBINE archive or create archive for SBML file.
+
+    :param input_is_temporary: Boolean flag if the source is a temporary file,
+        an SBML source is added at `TEMPORARY_SBML_LOCATION` instead of its
+        (random) file name.
+    """
+    if not source_path.exists():
+        raise IOError(f"Path does not exist: '{source_path}'")
+    if not source_path.is_file():
+        raise IOError(f"Path is not a file: '{source_path}'")
+
+    if Omex.is_omex(source_path):
+        return Omex().from_omex(source_path)
+
+    # Path is SBML we create a new archive
+    omex = Omex()
+    omex.add_entry(
+        entry_path=source_path,
+        entry=ManifestEntry(
+            location=_sbml_location(source_path, input_is_temporary),
+            format=EntryFormat.SBML,
+            master=True,
+        ),
+    )
+    return omex
+
+
+def _sbml_location(source_path: Path, input_is_temporary: bool = False) -> str:
+    """Get location of an SBML source in the created archive."""
+    if input_is_temporary:
+        return TEMPORARY_SBML_LOCATION
+    return f"./{source_path.name}"
+
+
+def _sbml_locations(omex: Omex) -> List[str]:
+    """Get locations of SBML entries in the archive."""
+    return [entry.location for entry in omex.manifest.entries if entry.is_sbml()]
+
+
+def _omex_path(
+    task_id: Optional[str], omex_path_str: Optional[str], frog_storage_path_str: str
+) -> Path:
+    """Get path of the OMEX with FROG results."""
+    if (not task_id) and (not omex_path_str):
+        raise ValueError(
+            "The 'omex_path_str' argument must be set (if not executed "
+            "within a celery Task)."
+        )
+    if omex_path_str is None:
+        # executed in task queue
+        # FIXME: ensure that files are removed from time to time
+        return Path(frog_storage_path_str) / f"FROG_{task_id}.omex"
+    return Path(omex_path_str)
+
+
+def _reports_content(
+    omex: Omex, locations: List[str], reports: List[FrogReport], compact: bool = False
+) -> Dict[str, Any]:
+    """Get manifest and reports as JSON.
+
+    :param reports: reports for every location and curator in order.
+    :param compact: reports as JSON in the compact FROG format.
+    :return: manifest and reports as JSON.
+    """
+    content: Dict[str, Any] = {"manifest": omex.manifest.dict(), "frogs": {}}
+    for k, location in enumerate(locations):
+        report_dict = {}
+        for i, curator_key in enumerate(CURATOR_KEYS):
+            report = reports[k * len(CURATOR_KEYS) + i]
+            if compact:
+                report_dict[curator_key] = FrogCompactReport.from_report(report).dict()
+            else:
+                report_dict[curator_key] = report.dict()
+
+        # store all reports for SBML entry
+        content["frogs"][location] = report_dict
+
+    return content
+
+
+def _write_omex(
+    omex: Omex,
+    omex_path: Path,
+    locations: List[str],
+    reports: List[FrogReport],
+    omex_files: List[str],
+    omex_compresslevel: Optional[int],
+) -> None:
+    """Write archive with the FROG files of the reports.
+
+    :param reports: reports for every location and curator in order.
+    :param omex_files: FROG files in the archive, subset of 'json', 'tsv' and
+        'arrow', with the diagnostics of the reports for 'diagnostics'.
+    :param omex_compresslevel: zip compression level, uncompressed if None.
+    """
+    unsupported = set(omex_files) - {"json", "tsv", "arrow", "diagnostics"}
+    if unsupported:
+        raise ValueError(f"Unsupported FROG files in OMEX: {sorted(unsupported)}")
+    write_omex(
+        omex,
+        omex_path=omex_path,
+        reports={
+            _report_location_prefix(location, curator_key, locations): reports[
+                k * len(CURATOR_KEYS) + i
+            ]
+            for k, location in enumerate(locations)
+            for i, curator_key in enumerate(CURATOR_KEYS)
+        },
+        json="json" in omex_files,
+        tsv="tsv" in omex_files,
+        arrow="arrow" in omex_files,
+        diagnostics="diagnostics" in omex_files,
+        compresslevel=omex_compresslevel,
+    )
+
+
+def _report_location_prefix(
+    location: str, curator_key: str, locations: List[str]
+) -> str:
+    """Get location of the FROG files of a curator for an SBML entry.
+
+    The FROG files of archives with a single SBML entry are in the curator
+    directory, e.g. './FROG/cobrapy/'. For multiple SBML entries every entry has
+    its own directory, e.g. './FROG/e_coli_core.xml/cobrapy/' for the entry
+    './e_coli_core.xml'.
+
+    :param locations: locations of all SBML entries of the archive.
+    """
+    if len(locations) == 1:
+        return f"./{FROG_PATH_PREFIX}/{curator_key}/"
+    entry = location[2:] if location.startswith("./") else location
+    return f"./{FROG_PATH_PREFIX}/{entry}/{curator_key}/"
+
+
+def _stage_shards(
+    sbml_path: Path, model_cache: Optional[ModelCache], size: Optional[int] = None
+) -> Dict[str, List[Optional[List[str]]]]:
+    """Get shards of the stages for SBML file.
+
+    Deletion stages are split in shards of reaction or gene ids, all other stages
+    and deletion stages with a single shard are not split (shard 'None').
+    """
+    shards: Dict[str, List[Optional[List[str]]]] = {
+        stage: [None] for stage in FROG_STAGES
+    }
+    session = ModelSession(model_path=sbml_path, model_cache=model_cache)
+    for stage, ids in [
+        (
+            CuratorConstants.REACTIONDELETIONS_KEY,
+            [r.id for r in session.model.reactions],
+        ),
+        (CuratorConstants.GENEDELETIONS_KEY, [g.id for g in session.model.genes]),
+    ]:
+        stage_shards = shard_ids(ids, size=size)
+        if len(stage_shards) > 1:
+            shards[stage] = stage_shards  # type: ignore
+    return shards
+
+
+def _flatten_stage_results(results: List[Any]) -> List[Dict[str, Any]]:
+    """Flatten stage results of chained sub-tasks.
+
+    The results of the shards of a stage (a group) are nested lists.
+    """
+    flat: List[Dict[str, Any]] = []
+    for result in results:
+        if isinstance(result, list):
+            flat.extend(_flatten_stage_results(result))
+        else:
+            flat.append(result)
+    return flat
+
+
+def _stage_results_by_stage(
+    results: List[Dict[str, Any]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Group stage results of a curator by stage."""
+    by_stage: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for result in results:
+        by_stage[result["stage"]].append(result)
+    return by_stage
+
+
+def _stage_sections(
+    results: Dict[str, List[Dict[str, Any]]], stages: List[str]
+) -> Dict[str, BaseModel]:
+    """Get report sections of the stages from the results of a curator.
+
+    Results of sharded stages are merged, missing shards or missing and
+    duplicate ids raise a ValueError.
+    """
+    sections: Dict[str, BaseModel] = {}
+    for stage in stages:
+        stage_cls = STAGE_CLASSES[stage]
+        shard_results = sorted(results.get(stage, []), key=lambda r: r["shard"])
+        shards = [r["shard"] for r in shard_results]
+        n_shards = shard_results[0]["shards"] if shard_results else 1
+        if shards != list(range(n_shards)):
+            raise ValueError(
+                f"Invalid shards for stage '{stage}': {shards}, expected "
+                f"{n_shards} shards."
+            )
+
+        parts = [
+            FrogCompactTable.parse_obj(r["result"]).to_table(stage_cls)
+            if issubclass(stage_cls, FrogTable)
+            else stage_cls.parse_obj(r["result"])
+            for r in shard_results
+        ]
+        if n_shards == 1:
+            sections[stage] = parts[0]
+        else:
+            sections[stage] = stage_cls.merge(  # type: ignore
+                parts, ids=[k for r in shard_results for k in r["ids"]]
+            )
+    return sections
+
+
+def _report_from_stage_results(results: Dict[str, List[Dict[str, Any]]]) -> FrogReport:
+    """Create report from the results of the stages of a curator.
+
+    Results of sharded stages are merged, missing shards or missing and
+    duplicate ids raise a ValueError.
+    """
+    sections = _stage_sections(results, stages=FROG_STAGES)
+    statistics: Dict[str, List[FrogStageStatistics]] = defaultdict(list)
+    for stage in FROG_STAGES:
+        for r in sorted(results[stage], key=lambda r: r["shard"]):
+            for key, value in r["statistics"].items():
+                statistics[key].append(FrogStageStatistics.parse_obj(value))
+
+    report = FrogReport(
+        metadata=sections[CuratorConstants.METADATA_KEY],
+        objectives=sections[CuratorConstants.OBJECTIVE_KEY],
+        fva=sections[CuratorConstants.FVA_KEY],
+        reaction_deletions=sections[CuratorConstants.REACTIONDELETIONS_KEY],
+        gene_deletions=sections[CuratorConstants.GENEDELETIONS_KEY],
+    )
+    report.set_statistics(
+        {
+            key: parts[0] if len(parts) == 1 else FrogStageStatistics.merge(parts)
+            for key, parts in statistics.items()
+        }
+    )
+    return report
+
+
+def _frog_reports(
+    jobs: List[Tuple[Path, str, str]],
+    model_cache: Optional[ModelCache] = None,
+    processes: int = 1,
+    workers: int = 1,
+) -> List[FrogReport]:
+    """Create FROG reports for (sbml_path, curator_key, location) jobs.
+
+    The jobs run concurrently in a pool of at most `workers` processes, the
+    reports are returned in the order of the jobs. Within the pool every curator
+    runs in a single process.
+    """
+    workers = min(workers, len(jobs))
+    if workers > 1 and multiprocessing.current_process().daemon:
+        logger.warning(
+            "Daemonic processes cannot create processes, running curators "
+            "sequentially."
+        )
+        workers = 1
+
+    if workers > 1:
+        # digests are memoized before forking, the curators do not hash again
+        for sbml_path in dict.fromkeys(path for path, _, _ in jobs):
+            md5_for_path(sbml_path)
+        context = multiprocessing.get_context(
+            "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        )
+        with context.Pool(workers) as pool:
+            return pool.starmap(
+                _frog_for_sbml,
+                [(path, key, model_cache, 1, location) for path, key, location in jobs],
+                chunksize=1,
+            )
+
+    return [
+        _frog_for_sbml(
+            path,
+            key,
+            model_cache=model_cache,
+            processes=processes,
+            model_location=location,
+        )
+        for path, key, location in jobs
+    ]
+
+
+def _frog_for_sbml(
+    source: Union[Path, str, bytes],
+    curator_key: str,
+    model_cache: Optional[ModelCache] = None,
+    processes: int = 1,
+    model_location: Optional[str] = None,
+) -> FrogReport:
     """Create FROGReport for given SBML source.
 
     Source is either path to SBML file or SBML string.
+
+    :param model_location: location of the SBML entry in the archive, the file
+        name of the SBML if None.
     """
 
     if isinstance(source, bytes):
@@ -159,18 +1288,12 @@ def _frog_for_sbml(source: Union[Path, str, bytes], curator_key: str) -> FrogRep
             with open(sbml_path, "w") as f_sbml:
                 f_sbml.write(source)
 
-        curator_class: Type[Curator]
-        if curator_key == "cobrapy":
-            curator_class = CuratorCobrapy
-        elif curator_key == "cameo":
-            curator_class = CuratorCameo
-        else:
-            raise ValueError(f"Unsupported curator: {curator_key}")
-
-        curator: Curator = curator_class(
-            model_path=sbml_path,
-            frog_id=curator_key,
-            curators=[],
+        curator: Curator = _curator_for_sbml(
+            sbml_path=sbml_path,
+            curator_key=curator_key,
+            model_cache=model_cache,
+            processes=processes,
+            model_location=model_location,
         )
         report: FrogReport = curator.run()
 
@@ -178,3 +1301,35 @@ def _frog_for_sbml(source: Union[Path, str, bytes], curator_key: str) -> FrogRep
     logger.info(f"FROG created in '{time_elapsed}' [s]")
 
     return report
+
+
+def _curator_for_sbml(
+    sbml_path: Path,
+    curator_key: str,
+    model_cache: Optional[ModelCache] = None,
+    processes: int = 1,
+    model_location: Optional[str] = None,
+) -> Curator:
+    """Create curator for SBML file.
+
+    :param model_location: location of the SBML entry in the archive, the file
+        name of the SBML if None.
+    """
+    curator_class: Type[Curator]
+    if curator_key == "cobrapy":
+        curator_class = CuratorCobrapy
+    elif curator_key == "cameo":
+        curator_class = CuratorCameo
+    else:
+        raise ValueError(f"Unsupported curator: {curator_key}")
+
+    curator = curator_class(
+        model_path=sbml_path,
+        frog_id=curator_key,
+        curators=[],
+        model_cache=model_cache,
+        processes=processes,
+    )
+    if model_location:
+        curator.model_location = model_location
+    return curator
@@ -1,10 +1,16 @@
 """Configuration for pytest."""
+import os
 from pathlib import Path
 from typing import Dict
 
-import pytest
 
-from fbc_curation import EXAMPLE_DIR
+# tasks are executed eagerly in tests, no broker or result backend required
+os.environ.setdefault("CELERY_TASK_ALWAYS_EAGER", "1")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+
+import pytest  # noqa: E402
+
+from fbc_curation import EXAMPLE_DIR  # noqa: E402
 
 
 @pytest.fixture(scope="session")
@@ -1,10 +1,17 @@
 """Test API functionality."""
+import hashlib
 from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
 
+import httpx
+import pytest
 from fastapi.testclient import TestClient
 from starlette.responses import JSONResponse
 
+from fbc_curation import api as api_module
+from fbc_curation import digest
 from fbc_curation.api import api
+from fbc_curation.digest import md5_for_path
 from fbc_curation.frog import FrogReport
 from fbc_curation.worker import _frog_for_sbml
 
@@ -12,6 +19,16 @@ from fbc_curation.worker import _frog_for_sbml
 client = TestClient(api)
 
 
+def _multipart_chunks(
+    files: Dict[str, Tuple[str, bytes]], chunk_size: int
+) -> Tuple[Dict[str, str], Iterator[bytes]]:
+    """Get headers and chunks of multipart form data without declared size."""
+    request = httpx.Request("POST", "http://test", files=files)
+    body = request.read()
+    headers = {"content-type": request.headers["content-type"]}
+    return headers, (body[k : k + chunk_size] for k in range(0, len(body), chunk_size))
+
+
 def test_get_api_information() -> None:
     """Test /api endpoint."""
     response = client.get("/api")
@@ -44,3 +61,74 @@ def test_json_for_ecoli_frog(ecoli_sbml_path: Path) -> None:
     report: FrogReport = _frog_for_sbml(source=ecoli_sbml_path, curator_key="cobrapy")
     response = JSONResponse(report.dict())
     assert response
+
+
+@pytest.fixture
+def storage(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Storage in temporary directory, submitted paths are returned."""
+    submitted: List[str] = []
+
+    def frog_submit(path: str, compact: bool = False) -> str:
+        submitted.append(path)
+        return "task"
+
+    monkeypatch.setattr(api_module, "FROG_STORAGE", str(tmp_path))
+    monkeypatch.setattr(api_module, "frog_submit", frog_submit)
+    return submitted
+
+
+def test_create_frog_from_upload(storage: List[str], ecoli_sbml_path: Path) -> None:
+    """Test that uploads are streamed to the storage and hashed."""
+    content = ecoli_sbml_path.read_bytes()
+    # form data is parsed in chunks, other fields are discarded
+    headers, chunks = _multipart_chunks(
+        {"other": ("other.txt", b"x" * 100), "source": ("model.xml", content)},
+        chunk_size=1000,
+    )
+    for response in [
+        client.post("/api/frog/content", content=content),
+        client.post("/api/frog/file", files={"source": ("model.xml", content)}),
+        client.post("/api/frog/file", content=chunks, headers=headers),
+    ]:
+        assert response.status_code == 200
+        assert response.json() == {"task_id": "task"}
+
+    assert len(storage) == 3
+    for path in storage:
+        assert Path(path).read_bytes() == content
+        assert digest._memo_key(path) in digest._memo
+        assert md5_for_path(path) == hashlib.md5(content).hexdigest()
+
+
+def test_create_frog_upload_too_large(
+    tmp_path: Path, storage: List[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that too large uploads are rejected and removed."""
+    monkeypatch.setattr(api_module, "FROG_MAX_UPLOAD_SIZE", 100)
+    response = client.post("/api/frog/content", content=b"x" * 101)
+    assert response.status_code == 413
+
+    # without declared size the upload is rejected while streaming
+    response = client.post("/api/frog/content", content=(b"x" * 60 for _ in range(2)))
+    assert response.status_code == 413
+    headers, chunks = _multipart_chunks({"source": ("model.xml", b"x" * 101)}, 60)
+    response = client.post("/api/frog/file", content=chunks, headers=headers)
+    assert response.status_code == 413
+    assert not storage
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_create_frog_upload_invalid(tmp_path: Path, storage: List[str]) -> None:
+    """Test that invalid uploads are rejected and removed."""
+    headers, chunks = _multipart_chunks({"model": ("model.xml", b"x" * 100)}, 60)
+    response = client.post("/api/frog/file", content=chunks, headers=headers)
+    assert response.status_code == 400
+    response = client.post("/api/frog/file", content=b"x" * 100)
+    assert response.status_code == 400
+    for endpoint in ["/api/frog/content", "/api/frog/file"]:
+        response = client.post(
+            endpoint, content=b"x" * 100, headers={"Content-Length": "100x"}
+        )
+        assert response.status_code == 400
+    assert not storage
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,101 @@
+"""Test lazy reading of reports from archives."""
+import zipfile
+from pathlib import Path
+
+import orjson
+import pandas as pd
+import pytest
+from pymetadata.omex import Omex
+
+from fbc_curation import EXAMPLE_DIR
+from fbc_curation.archive import FrogArchive
+from fbc_curation.compare import FrogComparison
+from fbc_curation.frog import CuratorConstants, FrogObjectives, FrogReport, write_omex
+
+
+@pytest.fixture
+def report() -> FrogReport:
+    """FROG report of the e_coli_core example."""
+    reports = FrogComparison.read_reports_from_omex(
+        EXAMPLE_DIR / "frogs" / "e_coli_core_FROG.omex"
+    )
+    return reports["./e_coli_core.xml"]["cobrapy"].load()
+
+
+def test_report_proxy_sections(tmp_path: Path, report: FrogReport) -> None:
+    """Test that sections are read on first access."""
+    omex_path = tmp_path / "test.omex"
+    write_omex(Omex(), omex_path, reports={"./FROG/cobrapy/": report})
+
+    for formats, frog_id in [(["json", "tsv"], "cobrapy"), (["tsv"], "cobrapy_tsv")]:
+        (proxy,) = FrogArchive(omex_path).reports(formats=formats)
+        assert proxy.format == formats[0]
+        assert proxy.metadata.frog_id == frog_id
+        assert proxy.objectives == report.objectives
+        assert list(proxy._sections) == ["metadata", "objectives"]
+        for key, df in proxy.load().to_dfs().items():
+            pd.testing.assert_frame_equal(df, report.to_dfs()[key])
+
+
+def test_report_proxy_json_sections(tmp_path: Path, report: FrogReport) -> None:
+    """Test that only the read sections of the JSON report are parsed."""
+    omex_path = tmp_path / "test.omex"
+    write_omex(Omex(), omex_path, reports={"./FROG/cobrapy/": report})
+
+    # invalid gene deletions are not parsed
+    d = report.dict()
+    d["gene_deletions"] = {"deletions": [{"gene": None}]}
+    invalid_path = tmp_path / "invalid.omex"
+    with zipfile.ZipFile(omex_path) as omex, zipfile.ZipFile(
+        invalid_path, "w"
+    ) as invalid:
+        for info in omex.infolist():
+            data = omex.read(info)
+            if info.filename == f"FROG/cobrapy/{CuratorConstants.FROG_FILENAME}":
+                data = orjson.dumps(d, option=orjson.OPT_INDENT_2)
+            invalid.writestr(info, data)
+
+    (proxy,) = FrogArchive(invalid_path).reports(formats=["json"])
+    assert proxy.objectives == report.objectives
+    assert proxy.fva == report.fva
+    with pytest.raises(ValueError):
+        proxy.gene_deletions
+
+
+def test_compare_reports_lazy(tmp_path: Path, report: FrogReport) -> None:
+    """Test that compared sections are read from the archive."""
+    df = report.objectives.to_df().copy()
+    df["value"] += 1.0
+    other = report.copy(update={"objectives": FrogObjectives.from_df(df)})
+    other.metadata = report.metadata.copy(update={"frog_id": "other"})
+    omex_path = tmp_path / "test.omex"
+    write_omex(Omex(), omex_path, reports={"./FROG/a/": report, "./FROG/b/": other})
+
+    model_reports = FrogComparison.read_reports_from_omex(omex_path)
+    reports = model_reports[report.metadata.model_location]
+    assert sorted(reports) == ["cobrapy", "other"]
+    assert not FrogComparison.compare_reports(
+        reports, keys=[CuratorConstants.OBJECTIVE_KEY]
+    )
+    for proxy in reports.values():
+        assert list(proxy._sections) == ["metadata", "objectives"]
+
+    with pytest.raises(ValueError):
+        FrogComparison.compare_reports(reports, keys=["objectives"])
+
+
+def test_compare_reports_fingerprints(tmp_path: Path, report: FrogReport) -> None:
+    """Test that tables with equal fingerprints are not read."""
+    omex_path = tmp_path / "test.omex"
+    write_omex(
+        Omex(),
+        omex_path,
+        reports={"./FROG/a/": report, "./FROG/b/": report},
+        diagnostics=True,
+    )
+    reports = FrogArchive(omex_path).reports()
+    assert FrogComparison.compare_reports(
+        {f"report{k}": proxy for k, proxy in enumerate(reports)}
+    )
+    for proxy in reports:
+        assert list(proxy._sections) == []
@@ -0,0 +1,63 @@
+"""Test model cache."""
+import os
+from pathlib import Path
+
+from fbc_curation.cache import ModelCache, ResultCache
+from fbc_curation.curator.session import ModelSession
+from fbc_curation.frog import FrogMetaData
+
+
+def test_model_cache_session(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test that the session stores and loads the parsed model."""
+    model_cache = ModelCache(cache_dir=tmp_path)
+    session = ModelSession(model_path=ecoli_sbml_path, model_cache=model_cache)
+    model = session.model
+
+    md5 = FrogMetaData.md5_for_path(ecoli_sbml_path)
+    assert model_cache.path_for_md5(md5).exists()
+
+    session2 = ModelSession(model_path=ecoli_sbml_path, model_cache=model_cache)
+    assert len(session2.model.reactions) == len(model.reactions)
+    assert session2.objective_information == session.objective_information
+    assert abs(session2.model.slim_optimize() - model.slim_optimize()) < 1e-9
+
+
+def test_model_cache_eviction(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test that least recently used entries are evicted."""
+    session = ModelSession(model_path=ecoli_sbml_path)
+    model_cache = ModelCache(cache_dir=tmp_path)
+    for k, md5 in enumerate(["a", "b", "c"]):
+        model_cache.put(md5, session.model, session.objective_information)
+        os.utime(model_cache.path_for_md5(md5), (k, k))
+    entry_size = model_cache.path_for_md5("a").stat().st_size
+
+    # access marks entry as recently used
+    assert model_cache.get("a") is not None
+    model_cache.max_size = 2 * entry_size
+    model_cache.evict()
+
+    assert model_cache.path_for_md5("a").exists()
+    assert not model_cache.path_for_md5("b").exists()
+    assert model_cache.path_for_md5("c").exists()
+    assert model_cache.get("b") is None
+
+
+def test_result_cache_eviction(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test that results and OMEX are evicted together."""
+    result_cache = ResultCache(cache_dir=tmp_path / "cache")
+    for k, key in enumerate(["a", "b"]):
+        result_cache.put(key, {"key": key}, omex_path=ecoli_sbml_path)
+        os.utime(result_cache.path_for_key(key), (k, k))
+    assert result_cache.size() == 2 * (
+        result_cache.path_for_key("a").stat().st_size + ecoli_sbml_path.stat().st_size
+    )
+
+    omex_path = tmp_path / "test.omex"
+    assert result_cache.get("a", omex_path=omex_path) == {"key": "a"}
+    assert omex_path.read_bytes() == ecoli_sbml_path.read_bytes()
+    result_cache.max_size = result_cache.size() - 1
+    result_cache.evict()
+
+    assert result_cache.get("b", omex_path=omex_path) is None
+    assert not result_cache.omex_path_for_key("b").exists()
+    assert result_cache.get("a", omex_path=omex_path) == {"key": "a"}
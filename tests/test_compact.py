@@ -0,0 +1,55 @@
+"""Test compact FROG format."""
+from pathlib import Path
+
+import orjson
+import pytest
+from pydantic import ValidationError
+
+from fbc_curation.compact import FrogCompactReport, FrogCompactTable
+from fbc_curation.curator.cobrapy_curator import CuratorCobrapy
+from fbc_curation.frog import FrogReport
+from fbc_curation.worker import frog_task
+
+
+def test_compact_report(ecoli_sbml_path: Path) -> None:
+    """Test lossless conversion of compact report."""
+    report = CuratorCobrapy(model_path=ecoli_sbml_path, frog_id="1", curators=[]).run()
+    compact = FrogCompactReport.from_report(report)
+    assert set(compact.fva.constants) == {
+        "model",
+        "objective",
+        "flux",
+        "fraction_optimum",
+    }
+    assert list(compact.fva.columns) == ["reaction", "minimum", "maximum"]
+
+    json_bytes = orjson.dumps(compact.dict())
+    assert len(json_bytes) < len(orjson.dumps(report.dict())) / 2
+
+    report2 = FrogCompactReport.parse_raw(json_bytes).to_report()
+    assert report2 == report
+    assert isinstance(report2, FrogReport)
+
+
+def test_compact_table_validation() -> None:
+    """Test validation of columns and status bitmap."""
+    FrogCompactTable(
+        rows=2, constants={}, columns={"value": [1.0, None]}, status="wA=="
+    )
+    with pytest.raises(ValidationError):
+        FrogCompactTable(rows=3, constants={}, columns={"value": [1.0]}, status="wA==")
+    with pytest.raises(ValidationError):
+        FrogCompactTable(rows=9, constants={}, columns={}, status="wA==")
+
+
+def test_frog_task_compact(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test compact reports in task results."""
+    content = frog_task(
+        source_path_str=str(ecoli_sbml_path),
+        omex_path_str=str(tmp_path / "test.omex"),
+        workers=1,
+        compact=True,
+    )
+    for report_dict in content["frogs"]["./e_coli_core.xml"].values():
+        report = FrogCompactReport.parse_obj(report_dict).to_report()
+        assert report.metadata.model_location == "./e_coli_core.xml"
@@ -0,0 +1,95 @@
+"""Test comparison of FROG reports."""
+from typing import Dict
+
+import numpy as np
+import pytest
+
+from fbc_curation import EXAMPLE_DIR
+from fbc_curation.compare import FrogComparison, FrogComparisonResult
+from fbc_curation.frog import CuratorConstants, FrogDiagnostics, FrogFVA, FrogReport
+
+
+@pytest.fixture
+def report() -> FrogReport:
+    """FROG report of the e_coli_core example without fingerprints."""
+    reports = FrogComparison.read_reports_from_omex(
+        EXAMPLE_DIR / "frogs" / "e_coli_core_FROG.omex"
+    )
+    report = reports["./e_coli_core.xml"]["cobrapy"].load()
+    report.set_diagnostics(FrogDiagnostics())
+    return report
+
+
+def _with_fva(report: FrogReport, fva: FrogFVA) -> FrogReport:
+    """Copy report with other FVA."""
+    return report.copy(update={"fva": fva})
+
+
+def test_compare_reports_result(report: FrogReport) -> None:
+    """Test structure of equal comparison result."""
+    reports: Dict[str, FrogReport] = {f"r{k}": report for k in range(3)}
+    result = FrogComparison.compare_reports(reports)
+    assert isinstance(result, FrogComparisonResult)
+    assert result.all_equal
+    assert result
+    assert list(result.equal) == [
+        CuratorConstants.OBJECTIVE_KEY,
+        CuratorConstants.FVA_KEY,
+        CuratorConstants.REACTIONDELETIONS_KEY,
+        CuratorConstants.GENEDELETIONS_KEY,
+    ]
+    for key, df_equal in result.equal.items():
+        assert list(df_equal.columns) == list(reports)
+        assert df_equal.values.sum() == 9
+        assert result.differences[key].empty
+
+
+def test_compare_reports_aligned_by_id(report: FrogReport) -> None:
+    """Test that rows are compared by id and not by position."""
+    df = report.fva.df
+    shuffled = _with_fva(report, FrogFVA.from_df(df.iloc[::-1].copy()))
+    result = FrogComparison.compare_reports(
+        {"a": report, "b": shuffled}, keys=[CuratorConstants.FVA_KEY]
+    )
+    assert result.all_equal
+
+    df_changed = df.copy()
+    df_changed.loc[df_changed.index[0], "maximum"] += 1.0
+    reaction = df_changed.reaction.iloc[0]
+    missing = df.reaction.iloc[-1]
+    reports = {
+        "a": report,
+        "b": shuffled,
+        "changed": _with_fva(report, FrogFVA.from_df(df_changed)),
+        "missing": _with_fva(report, FrogFVA.from_df(df.iloc[:-1].copy())),
+    }
+    result = FrogComparison.compare_reports(reports, keys=[CuratorConstants.FVA_KEY])
+    assert not result
+    np.testing.assert_array_equal(
+        result.equal[CuratorConstants.FVA_KEY].values,
+        [[1, 1, 0, 0], [1, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]],
+    )
+
+    df_diff = result.differences[CuratorConstants.FVA_KEY]
+    changed = df_diff[(df_diff.report1 == "a") & (df_diff.report2 == "changed")]
+    assert changed.reaction.tolist() == [reaction]
+    assert changed.field.tolist() == ["maximum"]
+    assert (changed.value2 - changed.value1).tolist() == pytest.approx([1.0])
+
+    # missing rows differ in all fields
+    missed = df_diff[(df_diff.report1 == "b") & (df_diff.report2 == "missing")]
+    assert set(missed.reaction) == {missing}
+    assert missed.value2.isna().all()
+
+
+def test_compare_reports_empty_table(report: FrogReport) -> None:
+    """Test that empty tables are compared."""
+    empty = _with_fva(report, FrogFVA(fva=[]))
+    result = FrogComparison.compare_reports(
+        {"a": empty, "b": empty, "c": report}, keys=[CuratorConstants.FVA_KEY]
+    )
+    np.testing.assert_array_equal(
+        result.equal[CuratorConstants.FVA_KEY].values,
+        [[1, 1, 0], [1, 1, 0], [0, 0, 1]],
+    )
+    result.print()
@@ -0,0 +1,167 @@
+"""Test warm-started deletion engine."""
+from pathlib import Path
+from typing import Type
+
+import numpy as np
+import pandas as pd
+import pytest
+from cobra.flux_analysis import single_reaction_deletion
+
+from fbc_curation.curator import Curator
+from fbc_curation.curator.cameo_curator import CuratorCameo
+from fbc_curation.curator.cobrapy_curator import CuratorCobrapy
+from fbc_curation.curator.deletions import DeletionEngine
+from fbc_curation.curator.session import ModelSession
+from fbc_curation.frog import CuratorConstants, FrogReport, PruningReason, StatusCode
+
+
+def test_deletion_engine(ecoli_sbml_path: Path) -> None:
+    """Test that warm-started knockouts match cobrapy reaction deletions."""
+    session = ModelSession(model_path=ecoli_sbml_path)
+    model = session.model
+    reaction_ids = [r.id for r in model.reactions]
+    bounds = [r.bounds for r in model.reactions]
+
+    with session.pristine() as model:
+        with DeletionEngine(model) as engine:
+            results = engine.sweep((rid, [rid]) for rid in reaction_ids)
+        df = single_reaction_deletion(model, reaction_ids, processes=1)
+    df.index = [set(ids).pop() for ids in df.ids]
+
+    assert list(results.keys()) == reaction_ids
+    for rid, result in results.items():
+        assert result.iterations is not None
+        if df.status[rid] == "optimal":
+            assert result.status == StatusCode.OPTIMAL
+            assert np.isclose(result.value, df.growth[rid], atol=1e-9)
+        else:
+            assert result.status == StatusCode.INFEASIBLE
+            assert np.isnan(result.value)
+    assert [r.bounds for r in model.reactions] == bounds
+
+
+def test_deletion_engine_empty_knockout(ecoli_sbml_path: Path) -> None:
+    """Test that an empty knockout returns the wild type without solving."""
+    session = ModelSession(model_path=ecoli_sbml_path)
+    with session.pristine() as model:
+        with DeletionEngine(model) as engine:
+            result = engine.knockout([])
+            assert result.iterations == 0
+            assert result.value == engine.wildtype.value  # type: ignore
+
+
+def test_deletion_statistics(ecoli_sbml_path: Path) -> None:
+    """Test that simplex iterations per knockout are reported."""
+    curator = CuratorCameo(
+        model_path=ecoli_sbml_path, frog_id="1", curators=[], prune=False
+    )
+    report = curator.run()
+    statistics = report.diagnostics.statistics
+    reaction_statistics = statistics[CuratorConstants.REACTIONDELETIONS_KEY]
+    assert reaction_statistics.lp_count == len(report.reaction_deletions.deletions)
+    assert len(reaction_statistics.iterations) == reaction_statistics.lp_count  # type: ignore
+    assert CuratorConstants.GENEDELETIONS_KEY in statistics
+
+
+def test_cobrapy_warm_start(ecoli_sbml_path: Path) -> None:
+    """Test that warm-started deletions match the cobrapy deletions."""
+    dfs = []
+    for warm_start in [False, True]:
+        curator = CuratorCobrapy(
+            model_path=ecoli_sbml_path, frog_id="1", curators=[], warm_start=warm_start
+        )
+        dfs.append(curator.run().to_dfs())
+
+    for key in [
+        CuratorConstants.REACTIONDELETIONS_KEY,
+        CuratorConstants.GENEDELETIONS_KEY,
+    ]:
+        pd.testing.assert_frame_equal(dfs[0][key], dfs[1][key], atol=1e-9)
+
+
+@pytest.mark.parametrize("curator_class", [CuratorCobrapy, CuratorCameo])
+def test_pruned_reaction_deletions(
+    tmp_path: Path, ecoli_sbml_path: Path, curator_class: Type[Curator]
+) -> None:
+    """Test that pruned reaction deletions match the solved deletions."""
+    reports = []
+    for prune in [False, True]:
+        curator = curator_class(  # type: ignore
+            model_path=ecoli_sbml_path, frog_id="1", curators=[], prune=prune
+        )
+        reports.append(curator.run())
+
+    pd.testing.assert_frame_equal(
+        reports[0].reaction_deletions.to_df(),
+        reports[1].reaction_deletions.to_df(),
+        atol=1e-9,
+    )
+    statistics = reports[1].diagnostics.statistics[
+        CuratorConstants.REACTIONDELETIONS_KEY
+    ]
+    assert statistics.pruned
+    assert set(statistics.pruned.values()) == {
+        PruningReason.ZERO_FLUX,
+        PruningReason.FVA_RANGE,
+    }
+    assert statistics.lp_count + len(statistics.pruned) == len(
+        reports[1].reaction_deletions.deletions
+    )
+
+    # pruned deletions are recorded in the report metadata in reaction order
+    assert reports[0].metadata.reaction_deletions_pruned is None
+    pruned = reports[1].metadata.reaction_deletions_pruned
+    assert pruned == statistics.pruned
+    reaction_ids = [d.reaction for d in reports[1].reaction_deletions.deletions]
+    assert list(pruned) == [rid for rid in reaction_ids if rid in pruned]
+    reports[1].to_json(tmp_path / "frog.json")
+    metadata = FrogReport.from_json(tmp_path / "frog.json").metadata
+    assert metadata.reaction_deletions_pruned == pruned
+
+
+@pytest.mark.parametrize("curator_class", [CuratorCobrapy, CuratorCameo])
+def test_memoized_gene_deletions(
+    ecoli_sbml_path: Path, curator_class: Type[Curator]
+) -> None:
+    """Test that gene deletions reuse wild-type and reaction deletion results."""
+    curator = curator_class(  # type: ignore
+        model_path=ecoli_sbml_path, frog_id="1", curators=[]
+    )
+    report = curator.run()
+    knockout_reactions = curator._knockout_reactions_for_genes()
+    objective_value = report.objectives.objectives[0].value
+    reaction_values = {d.reaction: d.value for d in report.reaction_deletions.deletions}
+    for deletion in report.gene_deletions.deletions:
+        reaction_ids = knockout_reactions[deletion.gene]
+        if not reaction_ids:
+            assert deletion.value == objective_value
+        elif len(reaction_ids) == 1:
+            assert deletion.value == reaction_values[reaction_ids[0]]
+
+    statistics = report.diagnostics.statistics[CuratorConstants.GENEDELETIONS_KEY]
+    assert statistics.knockout_count == len(report.gene_deletions.deletions)
+    assert statistics.lp_count < statistics.knockout_count
+
+    # results without reuse of previous stages
+    df = (
+        curator_class(  # type: ignore
+            model_path=ecoli_sbml_path, frog_id="1", curators=[]
+        )
+        .gene_deletions()
+        .to_df()
+    )
+    pd.testing.assert_frame_equal(report.gene_deletions.to_df(), df, atol=1e-9)
+
+
+@pytest.mark.parametrize("curator_class", [CuratorCobrapy, CuratorCameo])
+def test_memoized_gene_deletions_shard(
+    ecoli_sbml_path: Path, curator_class: Type[Curator]
+) -> None:
+    """Test that gene deletions of a shard only evaluate the GPRs of its genes."""
+    curator = curator_class(  # type: ignore
+        model_path=ecoli_sbml_path, frog_id="1", curators=[]
+    )
+    gene_ids = [g.id for g in curator.read_model().genes][:10]
+    deletions = curator.gene_deletions(gene_ids=gene_ids)
+    assert [d.gene for d in deletions.deletions] == gene_ids
+    assert set(curator.gene_index._knockouts) == set(gene_ids)
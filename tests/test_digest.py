@@ -0,0 +1,41 @@
+"""Test digests of model files."""
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from fbc_curation import digest
+from fbc_curation.digest import clear_digests, md5_for_file, md5_for_path
+
+
+def test_md5_for_file(ecoli_sbml_path: Path) -> None:
+    """Test that chunked MD5 is the MD5 of the file content."""
+    md5 = hashlib.md5(ecoli_sbml_path.read_bytes()).hexdigest()
+    assert md5_for_file(ecoli_sbml_path) == md5
+    assert md5_for_file(ecoli_sbml_path, chunk_size=1000) == md5
+
+
+def test_md5_for_path_memoized(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that digests are memoized until the file changes."""
+    calls = []
+
+    def md5_for_file_counted(path: Path) -> str:
+        calls.append(path)
+        return md5_for_file(path)
+
+    monkeypatch.setattr(digest, "md5_for_file", md5_for_file_counted)
+    path = tmp_path / "model.xml"
+    path.write_text("model")
+    md5 = md5_for_path(path)
+    assert md5_for_path(path) == md5
+    assert len(calls) == 1
+
+    path.write_text("changed model")
+    os.utime(path, ns=(0, 0))
+    assert md5_for_path(path) == hashlib.md5(b"changed model").hexdigest()
+    assert len(calls) == 2
+
+    clear_digests()
+    md5_for_path(path)
+    assert len(calls) == 3
@@ -0,0 +1,163 @@
+"""Test progress events of tasks."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import orjson
+import pytest
+import redis
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+
+from fbc_curation.api import api
+from fbc_curation.events import LocalTaskEvents, RedisTaskEvents, TaskEvents
+from fbc_curation.worker import (
+    CURATOR_KEYS,
+    FROG_STAGES,
+    celery,
+    frog_fanout_task,
+    progress_events,
+    task_status,
+)
+
+
+@pytest.fixture(params=["local", "redis"])
+def events(request: pytest.FixtureRequest) -> TaskEvents:
+    """Local and Redis events, Redis is skipped if not running."""
+    if request.param == "redis":
+        redis_events = RedisTaskEvents(url="redis://localhost:6379", ttl=10)
+        try:
+            redis_events.client.ping()
+        except redis.exceptions.ConnectionError:
+            pytest.skip("Redis is not running")
+        return redis_events
+    return LocalTaskEvents(ttl=10)
+
+
+async def _receive(events: TaskEvents, task_id: str) -> List[Dict[str, Any]]:
+    """Receive events of task until the complete event."""
+    received: List[Dict[str, Any]] = []
+    subscription = await events.subscribe(task_id)
+    try:
+        while not received or received[-1]["event"] != "complete":
+            event = await subscription.get(timeout=5.0)
+            assert event is not None
+            received.append(event)
+    finally:
+        await subscription.close()
+    return received
+
+
+def test_stage_counts(events: TaskEvents) -> None:
+    """Test that concurrently finished stages are counted."""
+    events.start("task", total=32)
+    assert events.last("task") == {
+        "task_id": "task",
+        "event": "progress",
+        "done": 0,
+        "total": 32,
+    }
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        published = list(
+            executor.map(lambda k: events.stage_done("task", shard=k), range(32))
+        )
+    assert sorted(event["done"] for event in published) == list(range(1, 33))
+
+    event = events.complete("task", task_status="SUCCESS")
+    assert event == {
+        "task_id": "task",
+        "event": "complete",
+        "task_status": "SUCCESS",
+        "done": 32,
+        "total": 32,
+    }
+    assert events.last("task") == event
+
+
+def test_subscribe(events: TaskEvents) -> None:
+    """Test that events published in other threads are received."""
+
+    def publish() -> None:
+        events.start("task", total=2)
+        events.stage_done("task", stage="fva")
+        events.stage_done("task", stage="objective")
+        events.complete("task", task_status="SUCCESS")
+
+    async def subscribe_and_publish() -> List[Dict[str, Any]]:
+        subscription = await events.subscribe("other-task")
+        assert await subscription.get(timeout=0.01) is None
+        await subscription.close()
+
+        receiving = asyncio.ensure_future(_receive(events, "task"))
+        await asyncio.sleep(0.1)
+        await run_in_threadpool(publish)
+        return await receiving
+
+    received = asyncio.run(subscribe_and_publish())
+    assert [(e["event"], e["done"], e["total"]) for e in received] == [
+        ("progress", 0, 2),
+        ("progress", 1, 2),
+        ("progress", 2, 2),
+        ("complete", 2, 2),
+    ]
+    assert received[1]["stage"] == "fva"
+
+
+def test_frog_fanout_task_events(
+    tmp_path: Path, ecoli_sbml_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test events of the sub-tasks and the event stream of the API."""
+    assert celery.conf.task_always_eager
+    task_id = "fanout-task-events"
+
+    # status of the task when the complete event is published
+    monkeypatch.setattr(frog_fanout_task, "store_eager_result", True)
+    events = progress_events()
+    complete = events.complete
+    complete_statuses: List[str] = []
+
+    def complete_with_status(task_id: str, **info: Any) -> Dict[str, Any]:
+        complete_statuses.append(task_status(task_id)["task_status"])
+        return complete(task_id, **info)
+
+    monkeypatch.setattr(events, "complete", complete_with_status)
+
+    async def run_and_receive() -> List[Dict[str, Any]]:
+        receiving = asyncio.ensure_future(_receive(progress_events(), task_id))
+        await asyncio.sleep(0.1)
+        await run_in_threadpool(
+            lambda: frog_fanout_task.apply_async(
+                (str(ecoli_sbml_path),),
+                kwargs={
+                    "omex_path_str": str(tmp_path / "test.omex"),
+                    "frog_storage_path_str": str(tmp_path),
+                },
+                task_id=task_id,
+            ).get()
+        )
+        return await receiving
+
+    received = asyncio.run(run_and_receive())
+    start, *progress, complete = received
+    total = start["total"]
+    assert total == len(progress) >= len(CURATOR_KEYS) * len(FROG_STAGES)
+    assert [e["done"] for e in progress] == list(range(1, total + 1))
+    assert {(e["curator"], e["stage"]) for e in progress} == {
+        (curator_key, stage) for curator_key in CURATOR_KEYS for stage in FROG_STAGES
+    }
+    assert complete["task_status"] == "SUCCESS"
+    assert "frogs" not in complete
+    assert complete_statuses == ["SUCCESS"]
+
+    # finished tasks stream the complete event
+    celery.backend.store_result("cached-task", {}, "SUCCESS")
+    with TestClient(api) as client:
+        for tid in [task_id, "cached-task"]:
+            with client.stream("GET", f"/api/task/events/{tid}") as response:
+                assert response.headers["content-type"].startswith("text/event-stream")
+                lines = [line for line in response.iter_lines() if line]
+            assert lines[0] == "event: complete"
+            event = orjson.loads(lines[1][len("data: ") :])
+            assert event["task_id"] == tid
+            assert event["task_status"] == "SUCCESS"
@@ -11,7 +11,7 @@ from fbc_curation.frog import CuratorConstants
 @pytest.mark.parametrize("curator_key", ["cobrapy", "cameo"])
 def test_e_coli_core(tmp_path: Path, curator_key: str) -> None:
     """Test fbc_curation."""
-    omex_path = examples.run_example("e_coli_core.xml")
+    omex_path = examples.run_example("e_coli_core.xml", output_dir=tmp_path)
     omex = Omex.from_omex(omex_path)
     omex.to_directory(tmp_path)
 
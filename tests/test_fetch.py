@@ -0,0 +1,143 @@
+"""Test fetching of models from URLs."""
+import asyncio
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from fbc_curation import api as api_module
+from fbc_curation import digest
+from fbc_curation.api import api
+from fbc_curation.fetch import SizeLimitError, UrlFetcher
+
+
+class ModelHandler(BaseHTTPRequestHandler):
+    """Serve model with ETag, slow and large responses."""
+
+    content: bytes = b""
+    requests: List[Dict[str, Any]] = []
+
+    def do_GET(self) -> None:
+        """Handle GET request."""
+        self.requests.append(
+            {"path": self.path, "if_none_match": self.headers.get("If-None-Match")}
+        )
+        etag = f'"{hashlib.md5(self.content).hexdigest()}"'
+        if self.path == "/slow":
+            time.sleep(1.0)
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.path == "/model.xml" and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        if self.path == "/chunked":
+            # size is not declared
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for k in range(0, len(self.content), 1000):
+                chunk = self.content[k : k + 1000]
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self.send_header("Content-Length", str(len(self.content)))
+        if self.path == "/model.xml":
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(self.content)
+
+    def log_message(self, *args: Any) -> None:
+        """Do not log requests."""
+
+
+@pytest.fixture
+def server(ecoli_sbml_path: Path) -> Iterator[str]:
+    """Local HTTP server serving the e_coli_core model, base URL is returned."""
+    ModelHandler.content = ecoli_sbml_path.read_bytes()
+    ModelHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ModelHandler)
+    httpd.protocol_version = "HTTP/1.1"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _fetch(fetcher: UrlFetcher, *urls: str) -> List[str]:
+    """Fetch URLs in a single event loop."""
+
+    async def fetch_all() -> List[str]:
+        try:
+            return [await fetcher.fetch(url) for url in urls]
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(fetch_all())
+
+
+def test_fetch_etag_cache(tmp_path: Path, server: str) -> None:
+    """Test that unchanged downloads are reused via the ETag."""
+    fetcher = UrlFetcher(storage_dir=tmp_path, max_size=10**7)
+    paths = _fetch(fetcher, f"{server}/model.xml", f"{server}/model.xml")
+    assert len(set(paths)) == 2
+    md5 = hashlib.md5(ModelHandler.content).hexdigest()
+    for path in paths:
+        assert Path(path).read_bytes() == ModelHandler.content
+        assert digest._memo[digest._memo_key(path)] == md5
+    assert ModelHandler.requests[0]["if_none_match"] is None
+    assert ModelHandler.requests[1]["if_none_match"] == f'"{md5}"'
+
+    # cached downloads are removed on close
+    assert list((tmp_path / "url_cache").iterdir()) == []
+
+
+def test_fetch_errors(tmp_path: Path, server: str) -> None:
+    """Test size limit, timeout and error status."""
+    fetcher = UrlFetcher(storage_dir=tmp_path, max_size=1000, timeout=0.2)
+    for path, error in [
+        ("/model.xml", SizeLimitError),
+        ("/chunked", SizeLimitError),
+        ("/slow", httpx.TimeoutException),
+        ("/missing", httpx.HTTPStatusError),
+    ]:
+        with pytest.raises(error):
+            _fetch(fetcher, f"{server}{path}")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_create_frog_from_url(
+    tmp_path: Path, server: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the model is fetched into the storage."""
+    submitted: List[str] = []
+
+    def frog_submit(path: str, compact: bool = False) -> str:
+        submitted.append(path)
+        return "task"
+
+    monkeypatch.setattr(api_module, "frog_submit", frog_submit)
+    monkeypatch.setattr(
+        api_module, "url_fetcher", UrlFetcher(storage_dir=tmp_path, max_size=10**7)
+    )
+    with TestClient(api) as client:
+        response = client.get("/api/frog/url", params={"url": f"{server}/model.xml"})
+        assert response.json() == {"task_id": "task"}
+        assert Path(submitted[0]).read_bytes() == ModelHandler.content
+
+        for url, status_code in [
+            (f"{server}/missing", 502),
+            ("not a url", 400),
+        ]:
+            response = client.get("/api/frog/url", params={"url": url})
+            assert response.status_code == status_code
@@ -0,0 +1,22 @@
+"""Test gene to reaction index."""
+from pathlib import Path
+
+from fbc_curation.curator.cobrapy_curator import CuratorCobrapy
+
+
+def test_gene_index(ecoli_sbml_path: Path) -> None:
+    """Test that the index gives the knockouts of the GPR evaluation."""
+    curator = CuratorCobrapy(model_path=ecoli_sbml_path, frog_id="1", curators=[])
+    model = curator.read_model()
+    knockout_reactions = curator._knockout_reactions_for_genes()
+    for gene in model.genes:
+        expected = [
+            r.id for r in model.reactions if not r.gpr.eval(knockouts={gene.id})
+        ]
+        assert knockout_reactions[gene.id] == expected
+
+        assert curator.gene_index.reactions_for_gene[gene.id] == [
+            r.id for r in model.reactions if gene.id in r.gpr.genes
+        ]
+
+    assert curator.gene_index is curator.gene_index
@@ -0,0 +1,89 @@
+"""Test registry of in-flight tasks."""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import redis
+
+from fbc_curation.inflight import (
+    InflightRegistry,
+    LocalInflightRegistry,
+    RedisInflightRegistry,
+)
+from fbc_curation.worker import _inflight_registry, celery, frog_submit, result_key
+
+
+def _redis_registry() -> RedisInflightRegistry:
+    """Registry in local Redis, skipped if Redis is not running."""
+    registry = RedisInflightRegistry(url="redis://localhost:6379", ttl=10)
+    try:
+        registry.client.ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip("Redis is not running")
+    return registry
+
+
+@pytest.fixture(params=["local", "redis"])
+def registry(request: pytest.FixtureRequest) -> InflightRegistry:
+    """In-flight registries."""
+    if request.param == "redis":
+        return _redis_registry()
+    return LocalInflightRegistry(ttl=10)
+
+
+def test_claim_release(registry: InflightRegistry) -> None:
+    """Test that identical submissions attach to the claimed task."""
+    registry.release("key", "task1")
+    assert registry.claim("key", "task1") is None
+    assert registry.claim("key", "task2") == "task1"
+
+    # only the claiming task releases
+    registry.release("key", "task2")
+    assert registry.claim("key", "task2") == "task1"
+    registry.release("key", "task1")
+    assert registry.claim("key", "task2") is None
+    registry.release("key", "task2")
+
+
+def test_claim_finished(registry: InflightRegistry) -> None:
+    """Test that keys of finished tasks are claimed."""
+    assert registry.claim("key", "task1") is None
+    assert registry.claim("key", "task2", is_finished=lambda t: t == "task1") is None
+    assert registry.claim("key", "task3") == "task2"
+    registry.release("key", "task2")
+
+
+def test_claim_concurrent(registry: InflightRegistry) -> None:
+    """Test that a key is claimed by a single task."""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        registered = list(
+            executor.map(lambda k: registry.claim("key", f"task{k}"), range(32))
+        )
+    claimed = [f"task{k}" for k, task_id in enumerate(registered) if task_id is None]
+    assert len(claimed) == 1
+    assert set(registered) == {None, claimed[0]}
+    registry.release("key", claimed[0])
+
+
+def test_claim_ttl() -> None:
+    """Test that expired keys are claimed."""
+    registry = LocalInflightRegistry(ttl=0)
+    assert registry.claim("key", "task1") is None
+    assert registry.claim("key", "task2") is None
+
+
+def test_frog_submit_inflight(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test that identical submissions attach to the in-flight task."""
+    assert celery.conf.task_always_eager
+    source_path = tmp_path / "upload"
+    source_path.write_bytes(ecoli_sbml_path.read_bytes())
+    key = result_key(source_path, input_is_temporary=True)
+
+    registry = _inflight_registry()
+    assert isinstance(registry, LocalInflightRegistry)
+    assert registry.claim(key, "inflight-task") is None
+    try:
+        assert frog_submit(str(source_path)) == "inflight-task"
+        assert not source_path.exists()
+    finally:
+        registry.release(key, "inflight-task")
@@ -0,0 +1,20 @@
+"""Test multi-process execution of curators."""
+from pathlib import Path
+
+import pandas as pd
+
+from fbc_curation.curator.cobrapy_curator import CuratorCobrapy
+
+
+def test_cobrapy_processes(ecoli_sbml_path: Path) -> None:
+    """Test that results do not depend on the number of processes."""
+    dfs = []
+    for processes in [1, 2]:
+        curator = CuratorCobrapy(
+            model_path=ecoli_sbml_path, frog_id="1", curators=[], processes=processes
+        )
+        curator.chunk_size = 16
+        dfs.append(curator.run().to_dfs())
+
+    for key, df in dfs[0].items():
+        pd.testing.assert_frame_equal(df, dfs[1][key], check_exact=True)
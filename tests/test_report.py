@@ -1,14 +1,31 @@
 """Testing result."""
+import json
+import zipfile
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 import libsbml
+import numpy as np
+import orjson
 import pandas as pd
+import pytest
+from pydantic import ValidationError
+from pymetadata.omex import Omex
 
-from fbc_curation import EXAMPLE_DIR
+from fbc_curation import EXAMPLE_DIR, FROG_SCHEMA_VERSION_1
+from fbc_curation import frog as frog_module
 from fbc_curation.compare import FrogComparison
 from fbc_curation.curator.cobrapy_curator import Creator, CuratorCobrapy
-from fbc_curation.frog import CuratorConstants, FrogReport
+from fbc_curation.frog import (
+    CuratorConstants,
+    FrogDiagnostics,
+    FrogFVA,
+    FrogGeneDeletions,
+    FrogReactionDeletions,
+    FrogReport,
+    StatusCode,
+    write_omex,
+)
 
 
 model_path: Path = EXAMPLE_DIR / "models" / "e_coli_core.xml"
@@ -99,3 +116,287 @@ def test_report_write_read_json_equal(tmp_path: Path) -> None:
     report2 = FrogReport.from_json(path=tmp_path / "frog.json")
 
     assert FrogComparison.compare_reports({"report": report, "report2": report2})
+
+
+def test_table_from_df_no_copy() -> None:
+    """Test that tables are backed by the validated DataFrame."""
+    df = report.fva.df
+    fva = FrogFVA.from_df(df)
+    assert fva.df is df
+    assert len(fva.fva) == len(df)
+    assert fva.fva[0].reaction == df.reaction.iloc[0]
+    assert fva.dict() == report.fva.dict()
+
+
+def test_table_validation() -> None:
+    """Test vectorized validation and NaN handling of tables."""
+    df = pd.DataFrame(
+        {
+            "model": "m",
+            "objective": "o",
+            "reaction": ["R2", "R1", "R3"],
+            "status": [StatusCode.OPTIMAL, "infeasible", "unknown"],
+            "value": [1.0, 2.0, np.nan],
+        }
+    )
+    deletions = FrogReactionDeletions.from_df(df)
+    assert [d.reaction for d in deletions.deletions] == ["R2", "R1"]
+    assert deletions.dict()["deletions"][0]["status"] == "optimal"
+
+    df_sorted = deletions.to_df()
+    assert list(df_sorted.reaction) == ["R1", "R2"]
+    assert np.isnan(df_sorted.value[0])
+
+    with pytest.raises(ValidationError):
+        FrogReactionDeletions(deletions=df.to_dict(orient="records"))
+
+    d = FrogReactionDeletions(deletions=df[:2].to_dict(orient="records")).dict()
+    assert d == deletions.dict()
+    assert FrogReactionDeletions.parse_obj(d) == deletions
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 5000])
+def test_report_json_streaming(tmp_path: Path, chunk_size: int) -> None:
+    """Test that streamed JSON equals the JSON of the report dictionary."""
+    report_empty = report.copy(
+        update={"gene_deletions": FrogGeneDeletions(deletions=[])}
+    )
+    for r in [report, report_empty]:
+        json_path = tmp_path / "frog.json"
+        r.to_json(path=json_path, chunk_size=chunk_size)
+        with open(json_path, "rb") as f_json:
+            assert f_json.read() == orjson.dumps(r.dict(), option=orjson.OPT_INDENT_2)
+
+
+def test_report_json_sections(tmp_path: Path) -> None:
+    """Test reading selected sections of JSON report."""
+    json_path = tmp_path / "frog.json"
+    report.to_json(path=json_path)
+    sections = FrogReport.sections_from_json(json_path, ["objectives", "metadata"])
+    assert list(sections) == ["objectives", "metadata"]
+    assert sections["metadata"] == report.metadata
+    assert sections["objectives"] == report.objectives
+
+    # compact JSON
+    with open(json_path, "wb") as f_json:
+        f_json.write(orjson.dumps(report.dict()))
+    assert FrogReport(**FrogReport.sections_from_json(json_path)) == report
+
+    # brackets and quotes in strings, chunks ending in strings
+    metadata = report.metadata.copy(update={"frog_id": 'frog}]"[{\\'})
+    report_strings = report.copy(update={"metadata": metadata})
+    report_strings.to_json(path=json_path)
+    with open(json_path, "rb") as f_json:
+        sections = FrogReport.sections_from_json_file(
+            f_json, ["metadata", "fva"], chunk_size=7
+        )
+    assert sections["metadata"] == metadata
+    assert sections["fva"] == report.fva
+
+    with pytest.raises(ValueError):
+        FrogReport.sections_from_json(json_path, ["results"])
+
+
+def test_report_json_sections_reformatted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test reading sections of JSON reports written with another layout."""
+    # sorted keys (tables before metadata) with other indentation and separators
+    json_path = tmp_path / "frog.json"
+    json_path.write_text(
+        json.dumps(
+            orjson.loads(orjson.dumps(report.dict())),
+            indent="\t",
+            separators=(" , ", " : "),
+            sort_keys=True,
+        )
+    )
+    keys = ["metadata", "objectives", "reaction_deletions"]
+    with open(json_path, "rb") as f_json:
+        for sections in [
+            FrogReport.sections_from_json(json_path, keys),
+            FrogReport.sections_from_json_file(f_json, keys, chunk_size=7),
+        ]:
+            assert list(sections) == keys
+            for key in keys:
+                assert sections[key] == getattr(report, key)
+
+    # complete JSON is parsed if the sections are not found by the scan
+    monkeypatch.setattr(frog_module._JsonSections, "scan", lambda self, data: {})
+    with open(json_path, "rb") as f_json:
+        for sections in [
+            FrogReport.sections_from_json(json_path, keys),
+            FrogReport.sections_from_json_file(f_json, keys, chunk_size=7),
+        ]:
+            assert list(sections) == keys
+            for key in keys:
+                assert sections[key] == getattr(report, key)
+    with pytest.raises(ValueError):
+        FrogReport.sections_from_json(json_path, ["results"])
+
+    # JSON which is not an object
+    monkeypatch.undo()
+    json_path.write_bytes(orjson.dumps([report.metadata.dict()]))
+    with pytest.raises(ValueError):
+        FrogReport.sections_from_json(json_path, ["metadata"])
+
+
+def test_report_write_read_arrow_equal(tmp_path: Path) -> None:
+    """Test equality of report after writing/reading Arrow files."""
+    pytest.importorskip("pyarrow")
+    report.to_arrow(tmp_path)
+    report2 = FrogReport.from_arrow(tmp_path)
+    assert report2.metadata.frog_id == f"{report.metadata.frog_id}_arrow"
+    assert report2.fva == report.fva
+    assert report2.gene_deletions == report.gene_deletions
+
+    assert FrogComparison.compare_reports({"report": report, "report2": report2})
+
+
+def test_read_arrow_columns(tmp_path: Path) -> None:
+    """Test column-selective reading of memory-mapped Arrow file."""
+    pytest.importorskip("pyarrow")
+    report.to_arrow(tmp_path)
+    table = FrogReport.read_arrow(
+        tmp_path / CuratorConstants.FVA_ARROW_FILENAME, columns=["reaction", "maximum"]
+    )
+    assert table.column_names == ["reaction", "maximum"]
+    assert table.column("maximum").to_pylist() == list(report.fva.df.maximum)
+
+
+def test_report_arrow_omex(tmp_path: Path) -> None:
+    """Test Arrow entries in OMEX."""
+    pytest.importorskip("pyarrow")
+    omex = Omex()
+    report.add_to_omex(omex, location_prefix="./FROG/", arrow=True)
+    omex_path = tmp_path / "test.omex"
+    omex.to_omex(omex_path)
+
+    formats = [entry.format for entry in Omex.from_omex(omex_path).manifest.entries]
+    assert formats.count(CuratorConstants.ARROW_FORMAT) == 4
+    reports = FrogComparison.read_reports_from_omex(omex_path, all_copies=True)
+    assert len(reports[report.metadata.model_location]) == 3
+    reports = FrogComparison.read_reports_from_omex(omex_path, formats=["arrow"])
+    assert list(reports[report.metadata.model_location]) == ["1234_arrow"]
+
+
+def test_report_add_to_omex(tmp_path: Path) -> None:
+    """Test that FROG files are written to the archive."""
+    omex = Omex()
+    report.add_to_omex(omex, location_prefix="./FROG/", tsv=False)
+    assert [entry.location for entry in omex.manifest.entries][2:] == [
+        "./FROG/frog.json",
+    ]
+    assert FrogReport.from_json(omex.get_path("./FROG/frog.json")) == report
+
+
+@pytest.mark.parametrize(
+    "json, tsv, compresslevel",
+    [(True, True, 9), (True, False, 1), (False, True, None)],
+)
+def test_write_omex(
+    tmp_path: Path, json: bool, tsv: bool, compresslevel: Optional[int]
+) -> None:
+    """Test writing FROG files directly into the OMEX."""
+    omex = Omex()
+    report.add_to_omex(omex, location_prefix="./FROG/cobrapy/", tsv=False)
+    omex_path = tmp_path / "test.omex"
+    write_omex(
+        omex,
+        omex_path=omex_path,
+        reports={"./FROG/cobrapy/": report, "./FROG/cameo/": report},
+        json=json,
+        tsv=tsv,
+        compresslevel=compresslevel,
+    )
+
+    locations = [e.location for e in Omex.from_omex(omex_path).manifest.entries]
+    for prefix in ["./FROG/cobrapy/", "./FROG/cameo/"]:
+        assert (f"{prefix}{CuratorConstants.FROG_FILENAME}" in locations) == json
+        assert (f"{prefix}{CuratorConstants.FVA_FILENAME}" in locations) == tsv
+    assert len(locations) == len(set(locations))
+
+    reports = FrogComparison.read_reports_from_omex(omex_path, all_copies=True)
+    frog_ids = {"1234"} if json else set()
+    frog_ids |= {"1234_tsv"} if tsv else set()
+    assert set(reports[report.metadata.model_location]) == frog_ids
+    for report2 in reports[report.metadata.model_location].values():
+        for key, df in report.to_dfs().items():
+            pd.testing.assert_frame_equal(report2.to_dfs()[key], df, check_exact=True)
+
+    with zipfile.ZipFile(omex_path) as zf:
+        compress_types = {info.compress_type for info in zf.infolist()}
+    assert compress_types == (
+        {zipfile.ZIP_STORED} if compresslevel is None else {zipfile.ZIP_DEFLATED}
+    )
+
+    with pytest.raises(ValueError):
+        write_omex(omex, omex_path, reports={}, json=False, tsv=False)
+
+
+def test_report_fingerprints(tmp_path: Path) -> None:
+    """Test tolerance-aware fingerprints written with the report diagnostics."""
+    report.to_tsv(tmp_path, diagnostics=True)
+    fingerprints = report.fingerprints()
+    assert FrogReport.from_tsv(tmp_path).diagnostics.fingerprints == fingerprints
+
+    df = report.fva.to_df()
+    df.loc[0, "flux"] = np.round(df.loc[0, "flux"], 3) + 1e-5
+    fingerprint = FrogFVA.from_df(df).fingerprint()
+    df.loc[0, "flux"] += 1e-5
+    assert FrogFVA.from_df(df).fingerprint() == fingerprint
+    df.loc[0, "flux"] += 0.1
+    assert FrogFVA.from_df(df).fingerprint() != fingerprint
+    df.loc[0, "status"] = StatusCode.INFEASIBLE.value
+    assert FrogFVA.from_df(df).fingerprint() != fingerprint
+
+
+def test_report_diagnostics(tmp_path: Path) -> None:
+    """Test that diagnostics are only written separately on request."""
+    assert FrogReport.schema_json(indent=2) == FROG_SCHEMA_VERSION_1.read_text()
+    assert report.diagnostics.statistics
+
+    omex_path = tmp_path / "test.omex"
+    write_omex(Omex(), omex_path, reports={"./FROG/cobrapy/": report})
+    with zipfile.ZipFile(omex_path) as zf:
+        assert CuratorConstants.DIAGNOSTICS_FILENAME not in {
+            Path(name).name for name in zf.namelist()
+        }
+    report.to_tsv(tmp_path / "tsv")
+    assert not (tmp_path / "tsv" / CuratorConstants.DIAGNOSTICS_FILENAME).exists()
+
+    write_omex(Omex(), omex_path, reports={"./FROG/cobrapy/": report}, diagnostics=True)
+    with zipfile.ZipFile(omex_path) as zf:
+        frog_json = orjson.loads(zf.read("FROG/cobrapy/frog.json"))
+        diagnostics = FrogDiagnostics.parse_raw(
+            zf.read(f"FROG/cobrapy/{CuratorConstants.DIAGNOSTICS_FILENAME}")
+        )
+    assert "statistics" not in frog_json["metadata"]
+    assert diagnostics.statistics == report.diagnostics.statistics
+    assert diagnostics.fingerprints == report.fingerprints()
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_report_tsv_lossless(tmp_path: Path, compression: Optional[str]) -> None:
+    """Test that TSVs are read with types and round-trip precision."""
+    report.to_tsv(tmp_path, compression=compression)
+    suffix = ".gz" if compression else ""
+    assert (tmp_path / f"{CuratorConstants.FVA_FILENAME}{suffix}").exists()
+
+    report2 = FrogReport.from_tsv(tmp_path)
+    for key, df in report.to_dfs().items():
+        pd.testing.assert_frame_equal(report2.to_dfs()[key], df, check_exact=True)
+
+
+def test_table_tsv_types(tmp_path: Path) -> None:
+    """Test that ids are not parsed as missing values or numbers."""
+    tsv_path = tmp_path / "gene_deletion.tsv"
+    with open(tsv_path, "w") as f_tsv:
+        f_tsv.write(
+            "model\tobjective\tgene\tstatus\tvalue\n"
+            "m\to\tNA\toptimal\t0.1\n"
+            "m\to\t1234\tinfeasible\tNaN\n"
+        )
+    deletions = FrogGeneDeletions.from_tsv(tsv_path)
+    assert [d.gene for d in deletions.deletions] == ["NA", "1234"]
+    assert deletions.deletions[1].value is None
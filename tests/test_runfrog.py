@@ -54,3 +54,43 @@ def test_runfrog2(monkeypatch: Any, tmp_path: Path) -> None:
         runfrog.main()
 
         assert output_path.exists()
+
+
+def test_runfrog_model_cache(monkeypatch: Any, tmp_path: Path) -> None:
+    """Run FROG with model cache."""
+    output_path = tmp_path / "test.omex"
+    cache_dir = tmp_path / "cache"
+    with monkeypatch.context() as m:
+        args = [
+            "runfrog",
+            "--input",
+            f"{EXAMPLE_DIR / 'models' / 'e_coli_core.xml'}",
+            "--output",
+            output_path,
+            "--cache-dir",
+            str(cache_dir),
+        ]
+        m.setattr(sys, "argv", args)
+        runfrog.main()
+
+        assert output_path.exists()
+        assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+
+def test_runfrog_processes(monkeypatch: Any, tmp_path: Path) -> None:
+    """Run FROG with multiple processes."""
+    output_path = tmp_path / "test.omex"
+    with monkeypatch.context() as m:
+        args = [
+            "runfrog",
+            "--input",
+            f"{EXAMPLE_DIR / 'models' / 'e_coli_core.xml'}",
+            "--output",
+            output_path,
+            "--processes",
+            "2",
+        ]
+        m.setattr(sys, "argv", args)
+        runfrog.main()
+
+        assert output_path.exists()
@@ -0,0 +1,31 @@
+"""Test model session."""
+from pathlib import Path
+
+from fbc_curation.curator.cobrapy_curator import CuratorCobrapy
+from fbc_curation.curator.session import ModelSession
+
+
+def test_model_session(ecoli_sbml_path: Path) -> None:
+    """Test objective information and model from single parse."""
+    session = ModelSession(model_path=ecoli_sbml_path)
+    assert session.objective_information.active_objective == "obj"
+    assert session.model is session.model
+
+
+def test_model_session_pristine(ecoli_sbml_path: Path) -> None:
+    """Test that bound changes are reverted after the model context."""
+    session = ModelSession(model_path=ecoli_sbml_path)
+    reaction = session.model.reactions[0]
+    bounds = reaction.bounds
+    with session.pristine() as model:
+        model.reactions[0].bounds = (0, 0)
+    assert reaction.bounds == bounds
+
+
+def test_curator_shares_session(ecoli_sbml_path: Path) -> None:
+    """Test that all stages use the model of the session."""
+    curator = CuratorCobrapy(model_path=ecoli_sbml_path, frog_id="1", curators=[])
+    model = curator.read_model()
+    report = curator.run()
+    assert curator.read_model() is model
+    assert len(report.fva.fva) == len(model.reactions)
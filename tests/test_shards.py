@@ -0,0 +1,112 @@
+"""Test sharding of deletion sweeps."""
+from pathlib import Path
+from typing import Type
+
+import pandas as pd
+import pytest
+
+from fbc_curation.compare import FrogComparison
+from fbc_curation.curator import Curator
+from fbc_curation.curator.cameo_curator import CuratorCameo
+from fbc_curation.curator.cobrapy_curator import CuratorCobrapy
+from fbc_curation.curator.shards import shard_ids, shard_size
+from fbc_curation.frog import (
+    FrogGeneDeletions,
+    FrogReactionDeletions,
+    FrogStageStatistics,
+)
+from fbc_curation.worker import frog_fanout_task
+
+
+def test_shard_size() -> None:
+    """Test adaptive shard size."""
+    assert shard_size(100, min_size=500, max_shards=16) == 500
+    assert shard_size(16000, min_size=500, max_shards=16) == 1000
+    with pytest.raises(ValueError):
+        shard_size(100, min_size=0)
+
+
+def test_shard_ids() -> None:
+    """Test contiguous shards of ids in the given order."""
+    assert shard_ids([]) == [[]]
+    assert shard_ids(["c", "a", "b"]) == [["c", "a", "b"]]
+    assert shard_ids(["c", "a", "b", "d", "e"], size=2) == [
+        ["c", "a"],
+        ["b", "d"],
+        ["e"],
+    ]
+    with pytest.raises(ValueError):
+        shard_ids(["a"], size=0)
+
+
+@pytest.mark.parametrize("curator_class", [CuratorCobrapy, CuratorCameo])
+def test_sharded_deletions(ecoli_sbml_path: Path, curator_class: Type[Curator]) -> None:
+    """Test that merged shards match the deletions of all ids."""
+    curator = curator_class(  # type: ignore
+        model_path=ecoli_sbml_path, frog_id="1", curators=[]
+    )
+    model = curator.read_model()
+    for ids, deletions, merge_cls in [
+        (
+            [r.id for r in model.reactions],
+            lambda ids: curator.reaction_deletions(reaction_ids=ids),
+            FrogReactionDeletions,
+        ),
+        (
+            [g.id for g in model.genes],
+            lambda ids: curator.gene_deletions(gene_ids=ids),
+            FrogGeneDeletions,
+        ),
+    ]:
+        shards = shard_ids(ids, size=20)
+        parts = [deletions(shard) for shard in shards]
+        merged = merge_cls.merge(parts, ids=[k for shard in shards for k in shard])
+        unsharded = deletions(None)
+        # merged shards have the order of the unsharded deletions
+        key = merge_cls._sort_key
+        assert merged.df[key].tolist() == unsharded.df[key].tolist() == ids
+        pd.testing.assert_frame_equal(merged.to_df(), unsharded.to_df(), atol=1e-9)
+
+
+def test_merge_validation(ecoli_sbml_path: Path) -> None:
+    """Test that merging detects duplicate, missing and unexpected ids."""
+    curator = CuratorCobrapy(model_path=ecoli_sbml_path, frog_id="1", curators=[])
+    ids = sorted(r.id for r in curator.read_model().reactions)[:6]
+    part1 = curator.reaction_deletions(reaction_ids=ids[:3])
+    part2 = curator.reaction_deletions(reaction_ids=ids[3:])
+
+    merged = FrogReactionDeletions.merge([part2, part1], ids=ids)
+    assert [d.reaction for d in merged.deletions] == ids
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        FrogReactionDeletions.merge([part1, part1, part2], ids=ids)
+    with pytest.raises(ValueError, match="Missing"):
+        FrogReactionDeletions.merge([part1], ids=ids)
+    with pytest.raises(ValueError, match="Unexpected"):
+        FrogReactionDeletions.merge([part1, part2], ids=ids[:3])
+
+
+def test_merge_statistics() -> None:
+    """Test that statistics of shards are summed."""
+    merged = FrogStageStatistics.merge(
+        [
+            FrogStageStatistics(lp_count=2, knockout_count=3, iterations={"a": 1}),
+            FrogStageStatistics(lp_count=1, knockout_count=None, iterations={"b": 2}),
+        ]
+    )
+    assert merged.lp_count == 3
+    assert merged.knockout_count is None
+    assert merged.iterations == {"a": 1, "b": 2}
+
+
+def test_frog_fanout_task_shards(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test FROG with sharded deletion sub-tasks."""
+    omex_path: Path = tmp_path / "test.omex"
+    frog_fanout_task.delay(
+        str(ecoli_sbml_path),
+        omex_path_str=str(omex_path),
+        frog_storage_path_str=str(tmp_path),
+        shard_size=40,
+    ).get()
+    reports = FrogComparison.read_reports_from_omex(omex_path=omex_path)
+    assert FrogComparison.compare_reports(reports=reports["./e_coli_core.xml"])
@@ -1,8 +1,26 @@
 """Testing worker."""
 
 from pathlib import Path
+from typing import Any
 
-from fbc_curation.worker import frog_task
+import pytest
+from pymetadata.omex import EntryFormat, ManifestEntry, Omex
+
+from fbc_curation import worker
+from fbc_curation.cache import ModelCache
+from fbc_curation.compare import FrogComparison
+from fbc_curation.curator.cobrapy_curator import CuratorCobrapy
+from fbc_curation.frog import CuratorConstants
+from fbc_curation.worker import (
+    CURATOR_KEYS,
+    TEMPORARY_SBML_LOCATION,
+    celery,
+    frog_fanout_task,
+    frog_from_cache,
+    frog_task,
+    result_key,
+    task_status,
+)
 
 
 def test_frog_task(tmp_path: Path, ecoli_sbml_path: Path) -> None:
@@ -12,3 +30,211 @@ def test_frog_task(tmp_path: Path, ecoli_sbml_path: Path) -> None:
         source_path_str=str(ecoli_sbml_path), omex_path_str=str(omex_path)
     )
     assert content
+
+
+def test_frog_task_omex_files(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test selection of FROG files in uncompressed archive."""
+    omex_path: Path = tmp_path / "test.omex"
+    frog_task(
+        source_path_str=str(ecoli_sbml_path),
+        omex_path_str=str(omex_path),
+        omex_files=["json"],
+        omex_compresslevel=None,
+    )
+    locations = {e.location for e in Omex.from_omex(omex_path).manifest.entries}
+    assert locations == {
+        ".",
+        "./manifest.xml",
+        "./e_coli_core.xml",
+        "./FROG/cobrapy/frog.json",
+        "./FROG/cameo/frog.json",
+    }
+
+
+def test_frog_task_sbml_entries(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test that the reports of multiple SBML entries are written separately."""
+    source_path: Path = tmp_path / "source.omex"
+    omex = Omex()
+    for location in ["./e_coli_core.xml", "./models/e_coli_core.xml"]:
+        omex.add_entry(
+            entry_path=ecoli_sbml_path,
+            entry=ManifestEntry(location=location, format=EntryFormat.SBML),
+        )
+    omex.to_omex(source_path)
+
+    omex_path: Path = tmp_path / "test.omex"
+    frog_task(
+        source_path_str=str(source_path),
+        omex_path_str=str(omex_path),
+        omex_files=["json"],
+    )
+    locations = {e.location for e in Omex.from_omex(omex_path).manifest.entries}
+    for prefix in ["./FROG/e_coli_core.xml/", "./FROG/models/e_coli_core.xml/"]:
+        for curator_key in CURATOR_KEYS:
+            assert f"{prefix}{curator_key}/frog.json" in locations
+
+    reports = FrogComparison.read_reports_from_omex(omex_path=omex_path)
+    assert sorted(reports) == ["./e_coli_core.xml", "./models/e_coli_core.xml"]
+    for model_reports in reports.values():
+        assert list(model_reports) == CURATOR_KEYS
+
+
+def test_frog_task_workers(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test that concurrent curators give the same archive content."""
+    contents = []
+    for workers in [1, 2]:
+        omex_path: Path = tmp_path / f"test_{workers}.omex"
+        contents.append(
+            frog_task(
+                source_path_str=str(ecoli_sbml_path),
+                omex_path_str=str(omex_path),
+                workers=workers,
+            )
+        )
+    assert contents[0] == contents[1]
+    assert list(contents[1]["frogs"]["./e_coli_core.xml"]) == ["cobrapy", "cameo"]
+
+
+def test_frog_fanout_task(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test FROG with sub-tasks per SBML entry, curator and stage."""
+    omex_path: Path = tmp_path / "test.omex"
+    content = frog_fanout_task.delay(
+        str(ecoli_sbml_path),
+        omex_path_str=str(omex_path),
+        frog_storage_path_str=str(tmp_path),
+        omex_files=["json", "tsv", "diagnostics"],
+    ).get()
+    assert list(content["frogs"]["./e_coli_core.xml"]) == CURATOR_KEYS
+    assert omex_path.exists()
+    # working directory is removed, the shared model cache is kept
+    model_cache_dir = tmp_path / worker.MODEL_CACHE_DIRNAME
+    assert sorted(tmp_path.iterdir()) == [model_cache_dir, omex_path]
+    assert len(list(model_cache_dir.glob("*.pickle"))) == 1
+
+    reports = FrogComparison.read_reports_from_omex(omex_path=omex_path)
+    assert FrogComparison.compare_reports(reports=reports["./e_coli_core.xml"])
+
+    # chained stages reuse the results of the preceding stages
+    statistics = reports["./e_coli_core.xml"]["cobrapy"].diagnostics.statistics
+    run_statistics = (
+        CuratorCobrapy(
+            model_path=ecoli_sbml_path,
+            frog_id="cobrapy",
+            curators=[],
+            model_cache=ModelCache(model_cache_dir),
+        )
+        .run()
+        .diagnostics.statistics
+    )
+    for stage in [
+        CuratorConstants.REACTIONDELETIONS_KEY,
+        CuratorConstants.GENEDELETIONS_KEY,
+    ]:
+        assert statistics[stage].lp_count == run_statistics[stage].lp_count
+    pruned = statistics[CuratorConstants.REACTIONDELETIONS_KEY].pruned
+    assert pruned
+    metadata = reports["./e_coli_core.xml"]["cobrapy"].metadata
+    assert metadata.reaction_deletions_pruned == pruned
+
+
+def test_task_status() -> None:
+    """Test status aggregated over sub-tasks."""
+    celery.backend.store_result("subtask-1", {}, "SUCCESS")
+    celery.backend.store_result(
+        "task", {"subtasks": ["subtask-1", "subtask-2"]}, "PROGRESS"
+    )
+    status = task_status("task")
+    assert status["task_status"] == "PROGRESS"
+    assert status["task_result"] == {"done": 1, "total": 2}
+
+    celery.backend.store_result("subtask-2", ValueError("error"), "FAILURE")
+    assert task_status("task")["task_status"] == "FAILURE"
+
+
+def test_frog_task_result_cache_location(tmp_path: Path, ecoli_sbml_path: Path) -> None:
+    """Test that identical content under other file names is not a cache hit."""
+    cache_dir = tmp_path / "cache"
+    contents = []
+    for filename in ["a.xml", "b.xml"]:
+        source_path = tmp_path / filename
+        source_path.write_bytes(ecoli_sbml_path.read_bytes())
+        omex_path = tmp_path / f"{filename}.omex"
+        contents.append(
+            frog_task(
+                source_path_str=str(source_path),
+                omex_path_str=str(omex_path),
+                result_cache_dir_str=str(cache_dir),
+            )
+        )
+        reports = FrogComparison.read_reports_from_omex(omex_path=omex_path)
+        assert list(reports) == [f"./{filename}"]
+    assert [list(content["frogs"]) for content in contents] == [
+        ["./a.xml"],
+        ["./b.xml"],
+    ]
+    assert result_key(tmp_path / "a.xml") != result_key(tmp_path / "b.xml")
+
+    # temporary files with random names are added at the same location
+    assert result_key(tmp_path / "a.xml", input_is_temporary=True) == result_key(
+        tmp_path / "b.xml", input_is_temporary=True
+    )
+    content = frog_task(
+        source_path_str=str(tmp_path / "a.xml"),
+        input_is_temporary=True,
+        omex_path_str=str(tmp_path / "temporary.omex"),
+        result_cache_dir_str=str(cache_dir),
+    )
+    assert list(content["frogs"]) == [TEMPORARY_SBML_LOCATION]
+    assert frog_from_cache(
+        str(tmp_path / "b.xml"),
+        frog_storage_path_str=str(tmp_path),
+        result_cache_dir_str=str(cache_dir),
+    )
+
+
+def test_frog_task_result_cache(
+    tmp_path: Path, ecoli_sbml_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that cached results are returned without running FROG."""
+    cache_dir = tmp_path / "cache"
+    content = frog_task(
+        source_path_str=str(ecoli_sbml_path),
+        omex_path_str=str(tmp_path / "test.omex"),
+        result_cache_dir_str=str(cache_dir),
+    )
+    assert result_key(ecoli_sbml_path) != result_key(ecoli_sbml_path, compact=True)
+
+    def frog_reports_failing(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("FROG executed for cached result")
+
+    monkeypatch.setattr(worker, "_frog_reports", frog_reports_failing)
+    omex_path = tmp_path / "cached.omex"
+    assert (
+        frog_task(
+            source_path_str=str(ecoli_sbml_path),
+            omex_path_str=str(omex_path),
+            result_cache_dir_str=str(cache_dir),
+        )
+        == content
+    )
+    assert omex_path.read_bytes() == (tmp_path / "test.omex").read_bytes()
+
+    # finished task for the cached result
+    task_id = frog_from_cache(
+        str(ecoli_sbml_path),
+        frog_storage_path_str=str(tmp_path),
+        result_cache_dir_str=str(cache_dir),
+        input_is_temporary=False,
+    )
+    assert task_id
+    assert task_status(task_id)["task_result"] == content
+    assert (tmp_path / f"FROG_{task_id}.omex").exists()
+
+    # bypass of the cache runs FROG
+    with pytest.raises(AssertionError):
+        frog_task(
+            source_path_str=str(ecoli_sbml_path),
+            omex_path_str=str(omex_path),
+            result_cache_dir_str=str(cache_dir),
+            use_result_cache=False,
+        )